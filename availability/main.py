@@ -1,11 +1,10 @@
-import collections
 import functools
 import itertools
 import random
 import string
-from datetime import date, datetime, time, timedelta
+from datetime import datetime, time, timedelta
 from operator import attrgetter
-from typing import Literal, Optional
+from typing import Optional
 
 import discord
 import pytimeparse2 as pytimeparse
@@ -17,6 +16,7 @@ from redbot.core.utils import menus
 from tabulate import SEPARATING_LINE, tabulate
 
 from .paginator import PaginationView
+from .slots import AvailabilityIndex, EventSlots, iter_bits
 from .utils import (
     Attendee,
     Event,
@@ -74,6 +74,7 @@ class Availability(commands.Cog):
         self.config.register_custom("EVENTS", **self.default_event)
 
         self.cev = ConfirmEventView(self.bot, self.config)
+        self.index = AvailabilityIndex()
 
     def cog_unload(self):
         self.cev.stop()
@@ -400,6 +401,7 @@ class Availability(commands.Cog):
             return await ctx.send("No event with that name exists!")
 
         await self.config.custom("EVENTS", ctx.guild.id).clear_raw(event[0])
+        self.index.discard(ctx.guild.id, event[0])
 
         await ctx.send(f"Event {event[1]['name']} ended!", ephemeral=True)
 
@@ -427,37 +429,27 @@ class Availability(commands.Cog):
 
     def generate_common_chart(
         self,
-        attendees: dict[str, Attendee],
+        slots: EventSlots,
         as_timezone: pytz.BaseTzInfo,
     ) -> tuple[dict[str, list[str]], list[datetime]]:
-        parsed, common = self.find_common(attendees, as_timezone)
+        common = slots.common_hours(as_timezone)
         if not common:
             return {}, []
-        dt_boxes: dict[datetime, list[str]] = {
-            datetime.combine(date, _time): cross_merge_lists(
-                ["\u001b[0;30m■\u001b[0m"] * len(attendees),
+        colors = {
+            "optimal": "\u001b[1;32m■\u001b[0m",
+            "suboptimal": "\u001b[1;33m■\u001b[0m",
+        }
+        user_ids = list(slots.attendees)
+        dt_boxes: dict[datetime, list[str]] = {}
+        for slot in iter_bits(common):
+            boxes = cross_merge_lists(
+                ["\u001b[0;30m■\u001b[0m"] * len(user_ids),
                 fillvalue=SEPARATING_LINE,
             )[:-1]
-            for date, data in common.items()
-            for _time in sorted(
-                set[time]().union(
-                    data.get("optimal", {}),
-                    data.get("suboptimal", {}),
-                )
-            )
-        }
-        keys = list(parsed.keys())
-        indices = {
-            int(user_id): keys.index(int(user_id)) * 2 for user_id in attendees
-        }
-
-        for dt, boxes in dt_boxes.items():
-            for user_id, data in parsed.items():
-                if dt.date() in data:
-                    if dt.timetz() in common[dt.date()]["optimal"]:
-                        boxes[indices[user_id]] = "\u001b[1;32m■\u001b[0m"
-                    elif dt.timetz() in common[dt.date()]["suboptimal"]:
-                        boxes[indices[user_id]] = "\u001b[1;33m■\u001b[0m"
+            for index, user_id in enumerate(user_ids):
+                if status := slots.status(user_id, slot):
+                    boxes[index * 2] = colors[status]
+            dt_boxes[slots.to_datetime(slot, as_timezone)] = boxes
 
         return dict(
             map(
@@ -499,7 +491,8 @@ class Availability(commands.Cog):
             error = f"Timezone cog not loaded. Using default timezone: UTC"
             timezone = pytz.UTC
 
-        boxes, times = self.generate_common_chart(signed_up, timezone)
+        slots = self.index.get(ctx.guild.id, key, event)
+        boxes, times = self.generate_common_chart(slots, timezone)
 
         if not boxes:
             return await ctx.send(
@@ -507,10 +500,10 @@ class Availability(commands.Cog):
                 ephemeral=True,
             )
 
+        common = slots.common_hours(timezone)
         indices = [
-            getattr(
-                ctx.guild.get_member(int(i)), "display_name", "User not found"
-            )
+            f"{getattr(ctx.guild.get_member(int(i)), 'display_name', 'User not found')}"
+            f" ({slots.coverage(int(i), common):.0%})"
             for i in signed_up
         ] + [None] * len(boxes)
         tabulated_days = tabulate(
@@ -535,109 +528,31 @@ class Availability(commands.Cog):
                 event,
             )
 
+        embed = discord.Embed(
+            title=f"{event['name']}'s attendee chart (shown in {timezone.zone})",
+            description=cf.box(tabulated_days, lang="ansi"),
+            color=await ctx.embed_color(),
+        )
+        if best := slots.best_hours(timezone):
+            embed.add_field(
+                name="Best times",
+                value="\n".join(
+                    f"{discord.utils.format_dt(slots.to_datetime(slot, timezone), style='F')}"
+                    f" - {available}/{len(signed_up)} available ({optimal} optimally)"
+                    for slot, available, optimal in best
+                ),
+            )
+        embed.set_footer(
+            text="The percentage next to each attendee is how many of the common times they are available for."
+        )
+
         await view.send_initial_message(
             ctx,
             error,
-            embed=discord.Embed(
-                title=f"{event['name']}'s attendee chart (shown in {timezone.zone})",
-                description=cf.box(tabulated_days, lang="ansi"),
-                color=await ctx.embed_color(),
-            ),
+            embed=embed,
             ephemeral=True,
         )
 
-    def get_ranges(
-        self, attendees: dict[str, Attendee], as_timezone: pytz.BaseTzInfo
-    ):
-        temp: dict[
-            int, dict[date, dict[Literal["optimal", "suboptimal"], set[time]]]
-        ] = {}
-        all_dates = set[date]()
-        for user_id, at in attendees.items():
-            data = temp.setdefault(int(user_id), {})
-            for tf1, tf2 in itertools.zip_longest(
-                at.setdefault("optimal", []),
-                at.setdefault("suboptimal", []),
-                fillvalue=None,
-            ):
-                if tf1:
-                    from_time = datetime.fromisoformat(tf1["from"]).astimezone(
-                        as_timezone
-                    )
-                    to_time = datetime.fromisoformat(tf1["to"])
-                    org_tz = to_time.tzinfo
-                    to_time = to_time.astimezone(as_timezone)
-                    day_data = data.setdefault(
-                        from_time.date(),
-                        {"optimal": set(), "suboptimal": set()},
-                    )
-                    day_data["optimal"].update(
-                        [
-                            time(hour, tzinfo=as_timezone)
-                            for hour in range(
-                                from_time.hour
-                                if from_time.minute == 0
-                                else from_time.hour + 1,
-                                to_time.hour,
-                            )
-                        ]
-                    )
-                    all_dates.add(from_time.date())
-                if tf2:
-                    from_time = datetime.fromisoformat(tf2["from"])
-                    org_tz = from_time.tzinfo
-                    from_time = from_time.astimezone(as_timezone)
-                    to_time = datetime.fromisoformat(tf2["to"]).astimezone(
-                        as_timezone
-                    )
-                    day_data = data.setdefault(
-                        to_time.date(), {"optimal": set(), "suboptimal": set()}
-                    )
-                    day_data["suboptimal"].update(
-                        [
-                            time(hour, tzinfo=as_timezone)
-                            for hour in range(
-                                from_time.hour
-                                if from_time.minute == 0
-                                else from_time.hour + 1,
-                                to_time.hour,
-                            )
-                        ]
-                    )
-                    all_dates.add(to_time.date())
-        return temp, all_dates
-
-    def find_common(
-        self, attendees: dict[str, Attendee], as_timezone: pytz.BaseTzInfo
-    ):
-        temp, dates = self.get_ranges(attendees, as_timezone)
-        return temp, {
-            date: {
-                option: list[time](
-                    map(
-                        lambda x: x[0],
-                        filter(
-                            lambda x: x[1] >= 2,
-                            collections.Counter(
-                                itertools.chain.from_iterable(
-                                    v.get(
-                                        date,
-                                        {
-                                            "optimal": set[time](),
-                                            "suboptimal": set[time](),
-                                        },
-                                    ).get(option, set[time]())
-                                    for v in temp.values()
-                                )
-                            ).most_common(),
-                        ),
-                    )
-                )
-                for option in ("optimal", "suboptimal")
-            }
-            for date in dates
-        }
-
 
 # sample input
 users = {
@@ -0,0 +1,196 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytz
+
+from .utils import Attendee, Event, Timeframe
+
+SLOT = 15 * 60  # availability is tracked in quarter hours so every utc offset lines up
+SLOTS_PER_HOUR = 3600 // SLOT
+
+Fingerprint = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yields the index of every set bit, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def timeframes_mask(timeframes: List[Timeframe], base: int) -> int:
+    """The slots, counted from `base`, that are fully covered by any of the timeframes."""
+    mask = 0
+    for timeframe in timeframes:
+        start = math.ceil(datetime.fromisoformat(timeframe["from"]).timestamp() / SLOT)
+        end = math.floor(datetime.fromisoformat(timeframe["to"]).timestamp() / SLOT)
+        start = max(start, base)
+        if end > start:
+            mask |= ((1 << (end - start)) - 1) << (start - base)
+    return mask
+
+
+def whole_hours(mask: int) -> int:
+    """Keeps the slots that start a full hour of availability."""
+    full = mask
+    for shift in range(1, SLOTS_PER_HOUR):
+        full &= mask >> shift
+    return full
+
+
+def at_least_two(masks: List[int]) -> int:
+    """The slots set in at least two of the masks."""
+    once = twice = 0
+    for mask in masks:
+        twice |= once & mask
+        once |= mask
+    return twice
+
+
+def count_planes(masks: List[int]) -> List[int]:
+    """
+    Counts, for every slot, the masks it is set in.
+
+    The counts are kept bit sliced, `planes[i]` holds bit `i` of every slot's count,
+    so adding a mask is a handful of integer operations instead of a loop over its slots."""
+    planes: List[int] = []
+    for mask in masks:
+        carry = mask
+        for i, plane in enumerate(planes):
+            if not carry:
+                break
+            planes[i], carry = plane ^ carry, plane & carry
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def count_at(planes: List[int], slot: int) -> int:
+    return sum(((plane >> slot) & 1) << i for i, plane in enumerate(planes))
+
+
+class AttendeeSlots:
+    """The slots that start a full hour of an attendee's availability, per mode."""
+
+    __slots__ = ("fingerprint", "optimal", "suboptimal")
+
+    def __init__(self, fingerprint: Fingerprint, optimal: int, suboptimal: int):
+        self.fingerprint = fingerprint
+        self.optimal = whole_hours(optimal)
+        self.suboptimal = whole_hours(suboptimal)
+
+    @property
+    def available(self) -> int:
+        return self.optimal | self.suboptimal
+
+    @staticmethod
+    def fingerprint_of(attendee: Attendee) -> Fingerprint:
+        return tuple(
+            tuple(f"{tf['from']}/{tf['to']}" for tf in attendee.get(mode) or [])
+            for mode in ("optimal", "suboptimal")
+        )
+
+    @classmethod
+    def from_attendee(cls, attendee: Attendee, base: int) -> "AttendeeSlots":
+        return cls(
+            cls.fingerprint_of(attendee),
+            timeframes_mask(attendee.get("optimal") or [], base),
+            timeframes_mask(attendee.get("suboptimal") or [], base),
+        )
+
+
+class EventSlots:
+    """
+    The availability of an event's attendees, as bitsets of quarter hour slots.
+
+    Slots are counted from `base`, the slot the event started in. Attendees are only
+    converted again when their timeframes change."""
+
+    def __init__(self, base: int):
+        self.base = base
+        self.attendees: Dict[int, AttendeeSlots] = {}
+
+    def update(self, signed_up: Dict[str, Attendee]):
+        attendees = {}
+        for user_id, attendee in signed_up.items():
+            cached = self.attendees.get(int(user_id))
+            if cached is None or cached.fingerprint != AttendeeSlots.fingerprint_of(attendee):
+                cached = AttendeeSlots.from_attendee(attendee, self.base)
+            attendees[int(user_id)] = cached
+        self.attendees = attendees
+
+    def to_datetime(self, slot: int, tz: pytz.BaseTzInfo) -> datetime:
+        return datetime.fromtimestamp((self.base + slot) * SLOT, tz=pytz.UTC).astimezone(tz)
+
+    def hour_starts(self, mask: int, tz: pytz.BaseTzInfo) -> int:
+        """Keeps the slots that are on the hour in the given timezone."""
+        aligned = 0
+        for slot in iter_bits(mask):
+            if self.to_datetime(slot, tz).minute == 0:
+                aligned |= 1 << slot
+        return aligned
+
+    def common_hours(self, tz: pytz.BaseTzInfo) -> int:
+        """The hours that at least two attendees are available for in the same mode."""
+        common = at_least_two([a.optimal for a in self.attendees.values()])
+        common |= at_least_two([a.suboptimal for a in self.attendees.values()])
+        return self.hour_starts(common, tz)
+
+    def best_hours(self, tz: pytz.BaseTzInfo, n: int = 3) -> List[Tuple[int, int, int]]:
+        """
+        The `n` hours the most attendees are available for, ties broken by optimal availability.
+
+        Returns `(slot, available, optimal)` tuples."""
+        available = count_planes([a.available for a in self.attendees.values()])
+        optimal = count_planes([a.optimal for a in self.attendees.values()])
+        candidates = 0
+        for plane in available:
+            candidates |= plane
+        candidates = self.hour_starts(candidates, tz)
+        ranked = sorted(
+            (
+                (slot, count_at(available, slot), count_at(optimal, slot))
+                for slot in iter_bits(candidates)
+            ),
+            key=lambda x: (-x[1], -x[2], x[0]),
+        )
+        return ranked[:n]
+
+    def coverage(self, user_id: int, slots: int) -> float:
+        """The share of the given slots the attendee is available for."""
+        if not slots or (attendee := self.attendees.get(user_id)) is None:
+            return 0.0
+        return popcount(attendee.available & slots) / popcount(slots)
+
+    def status(self, user_id: int, slot: int) -> Optional[str]:
+        if (attendee := self.attendees.get(user_id)) is None:
+            return None
+        if (attendee.optimal >> slot) & 1:
+            return "optimal"
+        if (attendee.suboptimal >> slot) & 1:
+            return "suboptimal"
+        return None
+
+
+class AvailabilityIndex:
+    """Keeps the `EventSlots` of every event that was queried, by guild and event key."""
+
+    def __init__(self):
+        self._events: Dict[Tuple[int, str], EventSlots] = {}
+
+    def get(self, guild_id: int, key: str, event: Event) -> EventSlots:
+        base = int(event["start_time"] // SLOT)
+        slots = self._events.get((guild_id, key))
+        if slots is None or slots.base != base:
+            slots = self._events[(guild_id, key)] = EventSlots(base)
+        slots.update(event["signed_up"])
+        return slots
+
+    def discard(self, guild_id: int, key: str):
+        self._events.pop((guild_id, key), None)
@@ -1,13 +1,14 @@
+import functools
 import itertools
 import random
+import re
 import string
 from datetime import date, datetime, time, timedelta
-from typing import Dict, List, Literal, TypedDict
+from typing import Dict, List, Literal, Tuple, TypedDict
 
 import dateparser
 import discord
 import pytz
-from fuzzywuzzy import fuzz, process
 from redbot.core import commands
 
 CHARACTERS = string.ascii_letters + string.digits + "-._~"
@@ -45,15 +46,28 @@ def get_next_occurrence(day: int, time: time):
     return to_return
 
 
-def fuzzy_timezone_search(tz: str):
-    fuzzy_results = process.extract(
-        tz.replace(" ", "_"),
-        pytz.common_timezones,
-        limit=500,
-        scorer=fuzz.partial_ratio,
-    )
-    matches = [x for x in fuzzy_results if x[1] > 98]
-    return matches
+_non_alnum = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    return _non_alnum.sub(" ", text.lower()).strip()
+
+
+@functools.lru_cache(maxsize=None)
+def _timezone_names() -> Tuple[Tuple[str, str], ...]:
+    """`pytz.common_timezones` with their normalized names, built the first time it's needed."""
+    return tuple((_normalize(name), name) for name in pytz.common_timezones)
+
+
+@functools.lru_cache(maxsize=512)
+def _search_timezones(query: str) -> Tuple[Tuple[str, int], ...]:
+    return tuple((name, 100) for key, name in _timezone_names() if query in key)
+
+
+def fuzzy_timezone_search(tz: str) -> List[Tuple[str, int]]:
+    """The common timezones whose name contains `tz`, ignoring case and separators."""
+    query = _normalize(tz)
+    return list(_search_timezones(query)) if query else []
 
 
 class TimeConverter(commands.Converter):
@@ -1,14 +1,49 @@
+import asyncio
 import datetime
+import sys
+import time
 from redbot.core.bot import Red
 from redbot.core import commands, Config, modlog
 from redbot.core.utils import chat_formatting as cf
 import discord
 from collections import deque
+from discord.ext import tasks
 from logging import getLogger
 from tabulate import tabulate
 
 log = getLogger("red.bounty.deletecounter")
 
+# windows that haven't seen a deletion for this long (or the guild's duration if longer) are dropped
+IDLE_EVICTION_SECONDS = 3600
+
+
+class DeletionWindow:
+    """The last `threshold` deletions of a single user as (timestamp, channel_id, message_id)."""
+
+    __slots__ = ("entries", "last_active")
+
+    def __init__(self, threshold: int):
+        self.entries: deque[tuple[float, int, int]] = deque(maxlen=threshold)
+        self.last_active = time.monotonic()
+
+    def add(self, message: discord.Message, threshold: int):
+        if self.entries.maxlen != threshold:
+            self.entries = deque(self.entries, maxlen=threshold)
+        self.entries.append(
+            (message.created_at.timestamp(), message.channel.id, message.id)
+        )
+        self.last_active = time.monotonic()
+
+    def within_range(self, duration: int) -> bool:
+        return self.entries[-1][0] - self.entries[0][0] <= duration
+
+    def sizeof(self) -> int:
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.entries)
+            + sum(sys.getsizeof(entry) for entry in self.entries)
+        )
+
 
 class DeleteCounter(commands.Cog):
     def __init__(self, bot: Red):
@@ -26,7 +61,84 @@ class DeleteCounter(commands.Cog):
 
         self.config.register_guild(**default_guild)
 
-        self.guild_cache: dict[int, dict[int, deque[discord.Message]]] = {}
+        self.guild_cache: dict[int, dict[int, DeletionWindow]] = {}
+        # guild settings without the leaderboard, dropped by the setter commands
+        self.settings_cache: dict[int, dict] = {}
+        # guild id -> user id -> leaderboard counters not yet written to config
+        self.pending_leaderboard: dict[int, dict[int, dict[str, int]]] = {}
+        self.flush_leaderboard_task = self.flush_leaderboard_loop.start()
+        self.evict_idle_task = self.evict_idle_loop.start()
+
+    def cog_unload(self):
+        self.flush_leaderboard_task.cancel()
+        self.evict_idle_task.cancel()
+        asyncio.create_task(self.flush_leaderboard())
+
+    async def get_settings(self, guild: discord.Guild) -> dict:
+        if (cached := self.settings_cache.get(guild.id)) is not None:
+            return cached
+
+        cdata = await self.config.guild(guild).all()
+        cdata.pop("leaderboard", None)
+        self.settings_cache[guild.id] = cdata
+        return cdata
+
+    def bump_leaderboard(self, guild_id: int, user_id: int, key: str):
+        counters = self.pending_leaderboard.setdefault(guild_id, {}).setdefault(
+            user_id, {"messages_deleted": 0, "mutes": 0}
+        )
+        counters[key] += 1
+
+    async def flush_leaderboard(self, guild_id: int | None = None):
+        """Merge the pending leaderboard counters into config, one write per guild."""
+        guild_ids = (
+            [guild_id] if guild_id is not None else list(self.pending_leaderboard)
+        )
+        for gid in guild_ids:
+            pending = self.pending_leaderboard.pop(gid, None)
+            if not pending:
+                continue
+
+            try:
+                async with self.config.guild_from_id(gid).leaderboard() as leaderboard:
+                    for user_id, counters in pending.items():
+                        entry = leaderboard.setdefault(
+                            str(user_id), {"messages_deleted": 0, "mutes": 0}
+                        )
+                        for key, value in counters.items():
+                            entry[key] = entry.get(key, 0) + value
+            except Exception:
+                log.exception("Failed to save leaderboard for guild %s", gid)
+                for user_id, counters in pending.items():
+                    for key, value in counters.items():
+                        self.pending_leaderboard.setdefault(gid, {}).setdefault(
+                            user_id, {"messages_deleted": 0, "mutes": 0}
+                        )[key] += value
+
+    @tasks.loop(minutes=1)
+    async def flush_leaderboard_loop(self):
+        await self.flush_leaderboard()
+
+    def evict_idle(self) -> int:
+        """Drop the windows of users who haven't deleted anything in a while."""
+        now = time.monotonic()
+        evicted = 0
+        for guild_id, gdata in list(self.guild_cache.items()):
+            duration = self.settings_cache.get(guild_id, {}).get("duration", 0)
+            cutoff = now - max(duration, IDLE_EVICTION_SECONDS)
+            for user_id in [
+                uid for uid, window in gdata.items() if window.last_active < cutoff
+            ]:
+                del gdata[user_id]
+                evicted += 1
+            if not gdata:
+                del self.guild_cache[guild_id]
+        return evicted
+
+    @tasks.loop(minutes=10)
+    async def evict_idle_loop(self):
+        if evicted := self.evict_idle():
+            log.debug("Evicted %s idle deletion windows", evicted)
 
     @commands.group(name="deletecounter", aliases=["delc"], invoke_without_command=True)
     async def dc(self, ctx: commands.Context):
@@ -37,6 +149,7 @@ class DeleteCounter(commands.Cog):
     async def dc_duration(self, ctx: commands.Context, duration: datetime.timedelta = commands.param(converter=commands.get_timedelta_converter(allowed_units=["seconds", "minutes"]))):  # type: ignore
         """Set the duration in seconds for the delete counter."""
         await self.config.guild(ctx.guild).duration.set(duration.total_seconds())
+        self.settings_cache.pop(ctx.guild.id, None)
         await ctx.send(
             f"The duration has been set to {cf.humanize_timedelta(timedelta=duration)}."
         )
@@ -45,6 +158,7 @@ class DeleteCounter(commands.Cog):
     async def dc_threshold(self, ctx: commands.Context, threshold: int):
         """Set the threshold for the delete counter."""
         await self.config.guild(ctx.guild).threshold.set(threshold)
+        self.settings_cache.pop(ctx.guild.id, None)
         await ctx.send(f"The threshold has been set to {threshold}.")
 
     @dc.command(name="muteduration")
@@ -59,6 +173,7 @@ class DeleteCounter(commands.Cog):
     ):
         """Set the duration in seconds for the mute."""
         await self.config.guild(ctx.guild).mute_duration.set(duration.total_seconds())
+        self.settings_cache.pop(ctx.guild.id, None)
         await ctx.send(
             f"The mute duration has been set to {cf.humanize_timedelta(timedelta=duration)}."
         )
@@ -76,9 +191,11 @@ class DeleteCounter(commands.Cog):
         role_ids = [r.id for r in roles]
         async with self.config.guild(ctx.guild).exempt_roles() as exempt_roles:
             exempt_roles.extend(set(exempt_roles) | set(role_ids))
-            await ctx.send(
-                f"{cf.humanize_list(set(exempt_roles) | set(role_ids))} have been added to the exempt roles list."
-            )
+        # dropped once the new roles are saved, so a delete in between can't cache the old ones
+        self.settings_cache.pop(ctx.guild.id, None)
+        await ctx.send(
+            f"{cf.humanize_list(set(exempt_roles) | set(role_ids))} have been added to the exempt roles list."
+        )
 
     @dc_exempt_roles.command(name="remove")
     async def dc_exempt_roles_remove(self, ctx: commands.Context, *roles: discord.Role):
@@ -92,12 +209,14 @@ class DeleteCounter(commands.Cog):
             er = set(exempt_roles) - set(role_ids)
             exempt_roles.clear()
             exempt_roles.extend(er)
-            await ctx.send(
-                f"{cf.humanize_list(roles)} have been removed from the exempt roles list."
-            )
+        self.settings_cache.pop(ctx.guild.id, None)
+        await ctx.send(
+            f"{cf.humanize_list(roles)} have been removed from the exempt roles list."
+        )
 
     @dc.command(name="leaderboard")
     async def dc_lb(self, ctx: commands.Context):
+        await self.flush_leaderboard(ctx.guild.id)
         lb = await self.config.guild(ctx.guild).leaderboard()
         if not lb:
             return await ctx.send("The leaderboard is empty.")
@@ -123,10 +242,38 @@ class DeleteCounter(commands.Cog):
 
         await ctx.send(f"```\n{tabbed}```")
 
+    @dc.command(name="memory", aliases=["memusage"])
+    @commands.is_owner()
+    async def dc_memory(self, ctx: commands.Context):
+        """Show how much memory the deletion tracker is using."""
+        users = entries = size = 0
+        size += sys.getsizeof(self.guild_cache)
+        for gdata in self.guild_cache.values():
+            size += sys.getsizeof(gdata)
+            users += len(gdata)
+            for window in gdata.values():
+                entries += len(window.entries)
+                size += window.sizeof()
+
+        embed = discord.Embed(
+            title="Delete Counter Memory Usage", color=await ctx.embed_color()
+        )
+        embed.add_field(name="Guilds", value=f"{len(self.guild_cache):,}")
+        embed.add_field(name="Tracked Users", value=f"{users:,}")
+        embed.add_field(name="Tracked Deletions", value=f"{entries:,}")
+        embed.add_field(
+            name="Approximate Size", value=cf.humanize_number(size) + " bytes"
+        )
+        embed.add_field(
+            name="Pending Leaderboard Updates",
+            value=f"{sum(map(len, self.pending_leaderboard.values())):,}",
+        )
+        await ctx.send(embed=embed)
+
     @dc.command(name="showsettings", aliases=["settings"])
     async def dc_show_settings(self, ctx: commands.Context):
         """Show the current delete counter settings."""
-        cdata = await self.config.guild(ctx.guild).all()
+        cdata = await self.get_settings(ctx.guild)
         exempt_roles = [
             ctx.guild.get_role(r).name for r in cdata.get("exempt_roles", [])
         ]
@@ -159,7 +306,7 @@ class DeleteCounter(commands.Cog):
         if guild is None:
             return
 
-        cdata = await self.config.guild(guild).all()
+        cdata = await self.get_settings(guild)
 
         if any(
             message.author.get_role(r) for r in cdata.get("exempt_roles", [])
@@ -168,22 +315,21 @@ class DeleteCounter(commands.Cog):
 
         threshold = cdata.get("threshold")
         gdata = self.guild_cache.setdefault(guild.id, {})
-        udata = gdata.setdefault(message.author.id, deque(maxlen=threshold))
-        udata.append(message)
-        duration = cdata.setdefault("duration")
-        leaderboard = cdata.setdefault("leaderboard", {}).setdefault(
-            str(message.author.id), {"messages_deleted": 0, "mutes": 0}
-        )
-        leaderboard["messages_deleted"] += 1
-        if len(udata) == threshold and self.within_range(udata, duration):
-            udata.clear()
+        udata = gdata.get(message.author.id)
+        if udata is None:
+            udata = gdata[message.author.id] = DeletionWindow(threshold)
+        udata.add(message, threshold)
+        duration = cdata.get("duration")
+        self.bump_leaderboard(guild.id, message.author.id, "messages_deleted")
+        if len(udata.entries) == threshold and udata.within_range(duration):
+            udata.entries.clear()
             until = discord.utils.utcnow() + datetime.timedelta(
                 seconds=cdata.get("mute_duration")
             )
             reason = f"Muted for {cf.humanize_timedelta(seconds=cdata.get('mute_duration'))} for deleting {cdata.get('threshold',0):,} messages in a {cf.humanize_timedelta(seconds=duration)} span."
             try:
                 await message.author.timeout(until, reason=reason)
-                leaderboard["mutes"] += 1
+                self.bump_leaderboard(guild.id, message.author.id, "mutes")
             except Exception:
                 log.exception("Error while timing out user", exc_info=True)
                 return
@@ -199,12 +345,3 @@ class DeleteCounter(commands.Cog):
                 until=until,
                 channel=message.channel,
             )
-
-        await self.config.guild(guild).leaderboard.set_raw(
-            str(message.author.id), value=leaderboard
-        )
-
-    def within_range(self, messages: deque[discord.Message], duration: int):
-        return (
-            messages[-1].created_at - messages[0].created_at
-        ).total_seconds() <= duration
@@ -0,0 +1,195 @@
+import asyncio
+import dataclasses
+import logging
+import re
+import typing
+from io import BytesIO
+
+import discord
+
+try:
+    from PIL import Image, ImageSequence
+except ImportError:  # resizing is skipped, oversized images are reported instead
+    Image = None
+
+log = logging.getLogger("red.emojitools.importer")
+
+MAX_EMOJI_SIZE = 256 * 1024
+EMOJI_DIMENSIONS = (128, 128)
+CREATE_TIMEOUT = 60
+PREPARE_CONCURRENCY = 4
+INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9_]")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+
+
+class ImportFailure(Exception):
+    """An emoji that could not be imported, with a reason shown in the summary."""
+
+
+@dataclasses.dataclass
+class PendingEmoji:
+    name: str
+    read: typing.Callable[[], typing.Awaitable[bytes]]
+
+
+@dataclasses.dataclass
+class PreparedEmoji:
+    name: str
+    image: bytes
+    animated: bool
+
+
+def clean_name(name: str) -> str:
+    name = INVALID_NAME_CHARS.sub("_", name)[:32]
+    if len(name) < 2:
+        raise ImportFailure("the name must be at least 2 characters long")
+    return name
+
+
+def _shrink(data: bytes) -> typing.Tuple[bytes, bool]:
+    with Image.open(BytesIO(data)) as image:
+        animated = getattr(image, "is_animated", False)
+        output = BytesIO()
+        if animated:
+            frames = []
+            for frame in ImageSequence.Iterator(image):
+                frame = frame.copy()
+                frame.thumbnail(EMOJI_DIMENSIONS)
+                frames.append(frame)
+            frames[0].save(
+                output,
+                format="GIF",
+                save_all=True,
+                append_images=frames[1:],
+                loop=image.info.get("loop", 0),
+                duration=image.info.get("duration", 100),
+                disposal=2,
+                optimize=True,
+            )
+        else:
+            image.thumbnail(EMOJI_DIMENSIONS)
+            image.save(output, format="PNG", optimize=True)
+    return output.getvalue(), animated
+
+
+def prepare_image(name: str, data: bytes) -> PreparedEmoji:
+    """Validate an emoji and shrink images over Discord's size limit. This is blocking."""
+    name = clean_name(name)
+    if data.startswith(GIF_SIGNATURES):
+        animated = True
+    elif data.startswith(PNG_SIGNATURE) or data.startswith(JPEG_SIGNATURE):
+        animated = False
+    else:
+        raise ImportFailure("the file is not a PNG, JPG or GIF image")
+
+    if len(data) > MAX_EMOJI_SIZE:
+        if Image is None:
+            raise ImportFailure("the image is larger than 256 KB")
+        try:
+            data, animated = _shrink(data)
+        except Exception as error:
+            raise ImportFailure(f"the image could not be resized: {error}") from None
+        if len(data) > MAX_EMOJI_SIZE:
+            raise ImportFailure(
+                "the image is larger than 256 KB even after resizing"
+            )
+
+    return PreparedEmoji(name, data, animated)
+
+
+@dataclasses.dataclass
+class ImportReport:
+    added: typing.List[discord.Emoji] = dataclasses.field(default_factory=list)
+    failed: typing.List[typing.Tuple[str, str]] = dataclasses.field(default_factory=list)
+
+    def format(self) -> str:
+        lines = []
+        if self.added:
+            lines.append(
+                f"{len(self.added)} emojis were added to this server: {' '.join(map(str, self.added))}"
+            )
+        else:
+            lines.append("No emojis were added to this server.")
+        if self.failed:
+            lines.append(f"{len(self.failed)} emojis could not be added:")
+            lines.extend(f"- `{name}`: {reason}" for name, reason in self.failed)
+        return "\n".join(lines)
+
+
+class EmojiImporter:
+    """Adds a batch of emojis to a guild.
+
+    Images are downloaded and prepared in worker threads ahead of creation, while a single
+    consumer creates them one after another: emoji creation shares one rate limit bucket per
+    guild, which discord.py waits out between requests. A failure is recorded and the rest of
+    the batch carries on."""
+
+    def __init__(self, guild: discord.Guild, reason: str):
+        self.guild = guild
+        self.reason = reason
+        self.report = ImportReport()
+        animated = sum(e.animated for e in guild.emojis)
+        self._slots = {
+            False: guild.emoji_limit - (len(guild.emojis) - animated),
+            True: guild.emoji_limit - animated,
+        }
+
+    async def _prepare(
+        self, pending: PendingEmoji, semaphore: asyncio.Semaphore
+    ) -> typing.Union[PreparedEmoji, ImportFailure]:
+        async with semaphore:
+            try:
+                data = await pending.read()
+                return await asyncio.to_thread(prepare_image, pending.name, data)
+            except ImportFailure as error:
+                return error
+            except discord.HTTPException as error:
+                return ImportFailure(
+                    f"the image could not be downloaded ({error.status})"
+                )
+            except Exception as error:
+                # bad archives, dropped connections, images PIL can't read...
+                # only this emoji fails, the rest of the batch still imports
+                log.exception("Failed to prepare emoji %s", pending.name, exc_info=error)
+                return ImportFailure(str(error) or type(error).__name__)
+
+    async def _create(self, prepared: PreparedEmoji):
+        if self._slots[prepared.animated] <= 0:
+            kind = "animated" if prepared.animated else "static"
+            raise ImportFailure(f"the server has no {kind} emoji slots left")
+        try:
+            emoji = await asyncio.wait_for(
+                self.guild.create_custom_emoji(
+                    name=prepared.name, image=prepared.image, reason=self.reason
+                ),
+                timeout=CREATE_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise ImportFailure("timed out, we may be ratelimited") from None
+        except discord.HTTPException as error:
+            raise ImportFailure(
+                error.text or f"Discord returned {error.status}"
+            ) from None
+        self._slots[prepared.animated] -= 1
+        self.report.added.append(emoji)
+
+    async def run(self, emojis: typing.Iterable[PendingEmoji]) -> ImportReport:
+        emojis = list(emojis)
+        semaphore = asyncio.Semaphore(PREPARE_CONCURRENCY)
+        # preparation runs ahead of creation, results are consumed in the order given
+        tasks = [asyncio.create_task(self._prepare(e, semaphore)) for e in emojis]
+        try:
+            for pending, task in zip(emojis, tasks):
+                try:
+                    result = await task
+                    if isinstance(result, ImportFailure):
+                        raise result
+                    await self._create(result)
+                except ImportFailure as error:
+                    self.report.failed.append((pending.name, str(error)))
+        finally:
+            for task in tasks:
+                task.cancel()
+        return self.report
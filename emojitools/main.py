@@ -24,16 +24,22 @@ SOFTWARE.
 
 import os
 import asyncio
+import functools
 import shutil
 import typing
+import tempfile
 import contextlib
 
+from collections import OrderedDict
 from io import BytesIO
 from zipfile import ZipFile
 from zipstream.aiozipstream import AioZipStream
 
 import discord
 from redbot.core import commands, data_manager
+from redbot.core.utils.chat_formatting import pagify
+
+from .importer import EmojiImporter, ImportReport, PendingEmoji
 
 # Error messages
 TIME_OUT = "The request timed out or we are being ratelimited, please try again after a few moments."
@@ -45,12 +51,56 @@ FILE_SIZE = "Unfortunately, it seems the attachment was too large to be sent."
 SAME_SERVER_ONLY = "I can only edit emojis from this server!"
 ROLE_HIERARCHY = "I cannot perform this action due to the Discord role hierarchy!"
 
+# Zip exports
+ZIP_DOWNLOADS = 8  # emoji downloads in flight at once
+ZIP_SPOOL_SIZE = 8 * 1024 * 1024  # archives larger than this are written to a temporary file
+EMOJI_CACHE_SIZE = 32 * 1024 * 1024  # bytes of downloaded emoji images kept for repeat exports
+
+
+async def _spool(stream: typing.AsyncIterator[bytes]) -> typing.BinaryIO:
+    """Collect a stream in memory, moving it to a temporary file once it grows past `ZIP_SPOOL_SIZE`."""
+    file = BytesIO()
+    async for chunk in stream:
+        file.write(chunk)
+        if isinstance(file, BytesIO) and file.tell() > ZIP_SPOOL_SIZE:
+            spooled = tempfile.TemporaryFile()
+            spooled.write(file.getbuffer())
+            file = spooled
+    file.seek(0)
+    return file
+
+
+class _OrderedDownloads:
+    """Downloads emojis ahead of the zip writer, at most `limit` at a time, handing them out in order."""
+
+    def __init__(self, emojis: list, read: typing.Callable, limit: int):
+        self._emojis = emojis
+        self._read = read
+        self._limit = limit
+        self._tasks: typing.Dict[int, asyncio.Task] = {}
+        self._scheduled = 0
+
+    async def get(self, index: int) -> bytes:
+        while self._scheduled < min(index + self._limit, len(self._emojis)):
+            self._tasks[self._scheduled] = asyncio.create_task(
+                self._read(self._emojis[self._scheduled])
+            )
+            self._scheduled += 1
+        return await self._tasks.pop(index)
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+
 
 class EmojiTools(commands.Cog):
     """Tools for Managing Custom Emojis"""
 
     def __init__(self, bot):
         self.bot = bot
+        # emoji images never change for an id, so downloads can be reused across exports
+        self._emoji_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._emoji_cache_size = 0
 
     @staticmethod
     def _ext(e: typing.Union[discord.Emoji, discord.PartialEmoji]):
@@ -225,13 +275,9 @@ class EmojiTools(commands.Cog):
             stream = AioZipStream(
                 filter(lambda x: x.is_file(), zip_path.glob("**/*.*")), chunksize=32768
             )
-            with BytesIO() as z:
-                async for chunk in stream.stream():
-                    z.write(chunk)
-                z.seek(0)
-                zip_file: discord.File = discord.File(
-                    z, filename=f"{folder_to_zip.name}.zip"
-                )
+            zip_file: discord.File = discord.File(
+                await _spool(stream.stream()), filename=f"{folder_to_zip.name}.zip"
+            )
 
         try:
             return await ctx.send(file=zip_file)
@@ -282,6 +328,21 @@ class EmojiTools(commands.Cog):
             f"All {counter} custom emojis have been removed from this server."
         )
 
+    @staticmethod
+    async def _import_emojis(
+        ctx: commands.Context, emojis: typing.List[PendingEmoji]
+    ) -> ImportReport:
+        importer = EmojiImporter(
+            ctx.guild,
+            reason=f"EmojiTools: emoji added by {ctx.author.name}#{ctx.author.discriminator}",
+        )
+        return await importer.run(emojis)
+
+    @staticmethod
+    async def _send_report(ctx: commands.Context, report: ImportReport):
+        for page in pagify(report.format()):
+            await ctx.send(page)
+
     @commands.bot_has_permissions(manage_emojis=True)
     @_emojitools.group(name="add")
     async def _add(self, ctx: commands.Context):
@@ -319,29 +380,13 @@ class EmojiTools(commands.Cog):
         """Add some emojis to this server."""
 
         async with ctx.typing():
-            added_emojis = []
+            pending = []
             for e in emojis:
                 em = await self._convert_emoji(ctx, e)
-                try:
-                    fe = await asyncio.wait_for(
-                        ctx.guild.create_custom_emoji(
-                            name=em.name,
-                            image=await em.read(),
-                            reason=f"EmojiTools: emoji added by {ctx.author.name}#{ctx.author.discriminator}",
-                        ),
-                        timeout=10,
-                    )
-                    added_emojis.append(fe)
-                except asyncio.TimeoutError:
-                    return await ctx.send(TIME_OUT)
-                except commands.CommandInvokeError:
-                    return await ctx.send(INVOKE_ERROR)
-                except discord.HTTPException:
-                    return await ctx.send(HTTP_EXCEPTION)
+                pending.append(PendingEmoji(em.name, em.read))
+            report = await self._import_emojis(ctx, pending)
 
-        return await ctx.send(
-            f"{len(added_emojis)} emojis were added to this server: {' '.join([str(e) for e in added_emojis])}"
-        )
+        return await self._send_report(ctx, report)
 
     @commands.cooldown(rate=1, per=15)
     @_add.command(name="fromreaction")
@@ -389,30 +434,16 @@ class EmojiTools(commands.Cog):
         """Add emojis to this server from all reactions in a message."""
 
         async with ctx.typing():
-            added_emojis = []
-            for r in message.reactions:
-                if not r.is_custom_emoji():
-                    continue
-                try:
-                    fe = await asyncio.wait_for(
-                        ctx.guild.create_custom_emoji(
-                            name=r.emoji.name,
-                            image=await r.emoji.read(),
-                            reason=f"EmojiTools: emoji added by {ctx.author.name}#{ctx.author.discriminator}",
-                        ),
-                        timeout=10,
-                    )
-                    added_emojis.append(fe)
-                except asyncio.TimeoutError:
-                    return await ctx.send(TIME_OUT)
-                except commands.CommandInvokeError:
-                    return await ctx.send(INVOKE_ERROR)
-                except discord.HTTPException:
-                    return await ctx.send(HTTP_EXCEPTION)
+            report = await self._import_emojis(
+                ctx,
+                [
+                    PendingEmoji(r.emoji.name, r.emoji.read)
+                    for r in message.reactions
+                    if r.is_custom_emoji()
+                ],
+            )
 
-        return await ctx.send(
-            f"{len(added_emojis)} emojis were added to this server: {' '.join([str(e) for e in added_emojis])}"
-        )
+        return await self._send_report(ctx, report)
 
     @commands.cooldown(rate=1, per=15)
     @commands.admin_or_permissions(manage_emojis=True)
@@ -483,39 +514,34 @@ class EmojiTools(commands.Cog):
                     "Please make sure the uploaded file is a `.zip` archive!"
                 )
 
-            added_emojis: list = []
+            pending = []
+            skipped = []
             with ZipFile(BytesIO(await ctx.message.attachments[0].read())) as zip_file:
 
                 for file_info in zip_file.infolist():
 
-                    if not file_info.filename.endswith((".png", ".jpg", ".gif")):
-                        await ctx.send(
-                            f"{file_info.filename} was not added as it is not a `.jpg`, `.png`, or `.gif` file."
-                        )
+                    if file_info.is_dir():
                         continue
 
-                    image = zip_file.read(file_info)
+                    if not file_info.filename.endswith((".png", ".jpg", ".gif")):
+                        skipped.append(file_info.filename)
+                        continue
 
-                    try:
-                        fe = await asyncio.wait_for(
-                            ctx.guild.create_custom_emoji(
-                                name=file_info.filename[:-4],
-                                image=image,
-                                reason=f"EmojiTools: emoji added by {ctx.author.name}#{ctx.author.discriminator}",
+                    pending.append(
+                        PendingEmoji(
+                            os.path.basename(file_info.filename)[:-4],
+                            functools.partial(
+                                asyncio.to_thread, zip_file.read, file_info
                             ),
-                            timeout=10,
                         )
-                        added_emojis.append(fe)
-                    except asyncio.TimeoutError:
-                        return await ctx.send(TIME_OUT)
-                    except commands.CommandInvokeError:
-                        return await ctx.send(INVOKE_ERROR)
-                    except discord.HTTPException:
-                        return await ctx.send(HTTP_EXCEPTION)
+                    )
 
-        return await ctx.send(
-            f"{len(added_emojis)} emojis were added to this server: {' '.join([str(e) for e in added_emojis])}"
+                report = await self._import_emojis(ctx, pending)
+
+        report.failed.extend(
+            (name, "it is not a `.jpg`, `.png`, or `.gif` file") for name in skipped
         )
+        return await self._send_report(ctx, report)
 
     @commands.bot_has_permissions(manage_emojis=True)
     @_emojitools.group(name="edit")
@@ -556,26 +582,43 @@ class EmojiTools(commands.Cog):
     async def _to_zip(self, ctx: commands.Context):
         """Get a `.zip` Archive of Emojis"""
 
+    async def _read_emoji(self, e: typing.Union[discord.Emoji, discord.PartialEmoji]):
+        if (data := self._emoji_cache.get(e.id)) is not None:
+            self._emoji_cache.move_to_end(e.id)
+            return data
+
+        data = await e.read()
+        self._emoji_cache[e.id] = data
+        self._emoji_cache_size += len(data)
+        while self._emoji_cache_size > EMOJI_CACHE_SIZE:
+            _, old = self._emoji_cache.popitem(last=False)
+            self._emoji_cache_size -= len(old)
+        return data
+
     @staticmethod
-    async def _generate_emoji(e):
-        yield await e.read()
+    async def _generate_emoji(downloads: _OrderedDownloads, index: int):
+        yield await downloads.get(index)
 
     async def _zip_emojis(self, emojis: list, file_name: str):
 
+        emojis = list(emojis)
+        downloads = _OrderedDownloads(emojis, self._read_emoji, ZIP_DOWNLOADS)
         emojis_list: list = []
-        for e in emojis:
+        for index, e in enumerate(emojis):
             emojis_list.append(
-                {"stream": self._generate_emoji(e), "name": f"{e.name}{self._ext(e)}"}
+                {
+                    "stream": self._generate_emoji(downloads, index),
+                    "name": f"{e.name}{self._ext(e)}",
+                }
             )
 
         stream = AioZipStream(emojis_list, chunksize=32768)
-        with BytesIO() as z:
-            async for chunk in stream.stream():
-                z.write(chunk)
-            z.seek(0)
-            zip_file: discord.File = discord.File(z, filename=file_name)
+        try:
+            z = await _spool(stream.stream())
+        finally:
+            downloads.cancel()
 
-        return zip_file
+        return discord.File(z, filename=file_name)
 
     @commands.cooldown(rate=1, per=30)
     @_to_zip.command(name="emojis", require_var_positional=True)
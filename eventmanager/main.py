@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, Union
 
@@ -13,6 +14,7 @@ from redbot.core.utils.predicates import MessagePredicate
 
 from .constants import Category, class_spec_dict, emoji_class_dict
 from .model import Event, Flags
+from .schedule import EventSchedule
 from .wrapper import SoftRes, SRFlags
 
 log = logging.getLogger("red.misan-cogs.eventmanager")
@@ -24,6 +26,10 @@ class EventManager(commands.Cog):
     HOUR = 60 * 60
     HALF_HOUR = HOUR / 2
     QUARTER_HOUR = HALF_HOUR / 2
+    # how long before the end of an event each reminder is sent
+    REMINDERS = (HOUR, HALF_HOUR, QUARTER_HOUR)
+    # how long changes to an event are gathered before its message is edited
+    EMBED_EDIT_DELAY = 2
 
     """A cog to create and manage events."""
 
@@ -38,7 +44,10 @@ class EventManager(commands.Cog):
         self.config.register_member(spec_class=())
         self.config.register_guild(history_channel=None, softres_log=None, log=None)
         self.cache: Dict[int, Dict[int, Event]] = {}
-        self.task = self.check_events.start()
+        self.schedule = EventSchedule()
+        self.scheduler: Optional[asyncio.Task] = None
+        self.embed_updates: Dict[Tuple[int, int], asyncio.Task] = {}
+        self.task = self.flush_events.start()
         self.softres = SoftRes(self.bot)
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
@@ -109,21 +118,110 @@ class EventManager(commands.Cog):
         for guild_id, guild_config in all_guilds.items():
             g = self.cache.setdefault(int(guild_id), {})
             for event in guild_config.values():
+                if event["message_id"] in g:
+                    continue
                 try:
-                    g[event["message_id"]] = Event.from_json(self.bot, event)
+                    ev = g[event["message_id"]] = Event.from_json(self.bot, event)
 
                 except Exception as e:
                     log.exception("Error occurred when caching: ", exc_info=e)
 
+                else:
+                    self.schedule_event(ev)
+
     async def to_config(self):
-        for guild_config in self.cache.values():
-            for event in guild_config.values():
-                json = event.json
-                await self.config.custom("events", event.guild_id, event.message_id).set(json)
+        """Save the events that changed since they were last saved."""
+        for guild_config in list(self.cache.values()):
+            for event in list(guild_config.values()):
+                # events removed while earlier ones were being saved must not be written back
+                if not event.dirty or not self.is_cached(event):
+                    continue
+                # cleared before saving so changes made while awaiting are saved next time
+                event.dirty = False
+                group = self.config.custom("events", event.guild_id, event.message_id)
+                try:
+                    await group.set(event.json)
+                    if not self.is_cached(event):
+                        # removed while this write was in flight
+                        await group.clear()
+                except Exception as e:
+                    event.dirty = True
+                    log.exception(f"Failed to save the event {event.message_id}", exc_info=e)
+
+    def is_cached(self, event: Event) -> bool:
+        return self.cache.get(event.guild_id, {}).get(event.message_id) is event
+
+    def add_event(self, event: Event):
+        event.dirty = True
+        self.cache.setdefault(event.guild_id, {})[event.message_id] = event
+        self.schedule_event(event)
+        if task := self.embed_updates.pop((event.guild_id, event.message_id), None):
+            # a pending edit of the event this one replaces, changes from now on schedule their own
+            task.cancel()
+
+    async def remove_event(self, event: Event):
+        self.cache.get(event.guild_id, {}).pop(event.message_id, None)
+        self.schedule.discard((event.guild_id, event.message_id))
+        if task := self.embed_updates.pop((event.guild_id, event.message_id), None):
+            task.cancel()
+        await self.config.custom("events", event.guild_id, event.message_id).clear()
+
+    def schedule_event(self, event: Event):
+        """Schedule an event for its next reminder, or its end once every reminder was sent."""
+        end = event.end_time.timestamp()
+        if event.pings < len(self.REMINDERS):
+            due = end - self.REMINDERS[event.pings]
+        else:
+            due = end
+        self.schedule.schedule((event.guild_id, event.message_id), due)
+
+    def update_event_message(self, event: Event):
+        """
+        Edit the event's message to show its current embed.
+
+        Edits are delayed by `EMBED_EDIT_DELAY` seconds, and every change made in the
+        meantime is shown by that same edit."""
+        key = (event.guild_id, event.message_id)
+        if (task := self.embed_updates.get(key)) and not task.done():
+            return
+        self.embed_updates[key] = asyncio.create_task(self._update_event_message(event))
+
+    async def _update_event_message(self, event: Event):
+        key = (event.guild_id, event.message_id)
+        await asyncio.sleep(self.EMBED_EDIT_DELAY)
+        # changes from here on need another edit
+        self.embed_updates.pop(key, None)
+        # an edit in the meantime replaces the cached event, show whichever is current
+        event = self.cache.get(event.guild_id, {}).get(event.message_id)
+        if event is None:
+            return  # ended in the meantime
+
+        try:
+            msg = await event.message()
+
+        except Exception:
+            log.debug(
+                f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+            )
+            return await self.remove_event(event)
+
+        if not msg:
+            return
+
+        try:
+            await msg.edit(embed=event.embed)
+        except discord.NotFound:
+            event.forget_message()
+        except Exception as e:
+            log.exception(f"Failed to update the message of the event {event.message_id}", exc_info=e)
 
     def cog_unload(self):
         asyncio.create_task(self.to_config())
         self.task.cancel()
+        if self.scheduler:
+            self.scheduler.cancel()
+        for task in self.embed_updates.values():
+            task.cancel()
         asyncio.create_task(self.softres._session.close())
 
     def validate_flags(self, flags: dict):
@@ -184,7 +282,7 @@ class EventManager(commands.Cog):
         start_adding_reactions(
             msg, [i for i in emoji_class_dict.keys()] + ["❌", "🧻", "👑", "🚀", "👻"]
         )
-        self.cache.setdefault(ctx.guild.id, {})[msg.id] = event
+        self.add_event(event)
 
     @event.command(name="edit")
     async def edit(
@@ -221,11 +319,12 @@ class EventManager(commands.Cog):
                 new_msg, [i for i in emoji_class_dict.keys()] + ["❌", "🧻", "👑", "🚀", "👻"]
             )
             await message.delete()
+            await self.remove_event(event)
 
         else:
             await message.edit(embed=new.embed)
 
-        self.cache[ctx.guild.id][new.message_id] = new
+        self.add_event(new)
 
         await ctx.tick()
 
@@ -261,7 +360,7 @@ class EventManager(commands.Cog):
 
             event.remove_entrant(ent)
 
-        await message.edit(embed=event.embed)
+        self.update_event_message(event)
 
         await ctx.send(
             f"Removed given users from the event."
@@ -422,20 +521,6 @@ class EventManager(commands.Cog):
             log.exception("Failed to remove reaction", exc_info=e)
         return
 
-    @commands.Cog.listener()
-    async def on_member_remove(self, member: discord.Member):
-        if member.guild.id not in self.cache:
-            return
-
-        for event in self.cache[member.guild.id].values():
-            if entrant := event.get_entrant(member.id):
-                event.remove_entrant(entrant)
-                msg = await event.message()
-                if not msg:
-                    continue
-
-                await msg.edit(embed=event.embed)
-
     @commands.Cog.listener()
     async def on_raw_reaction_add(
         self, payload: discord.RawReactionActionEvent, name: Optional[str] = None
@@ -549,9 +634,7 @@ class EventManager(commands.Cog):
                 else:
                     await user.send("Alright!")
 
-            embed = event.embed
-
-            await message.edit(embed=embed)
+            self.update_event_message(event)
 
             await self.remove_reactions_safely(message, emoji, user)
 
@@ -596,8 +679,7 @@ class EventManager(commands.Cog):
             else:
                 await message.edit(embed=embed)
 
-            await self.config.custom("events", event.guild_id, event.message_id).clear()
-            del self.cache[event.guild_id][event.message_id]
+            await self.remove_event(event)
 
         elif emoji == "🧻":
             await self.remove_reactions_safely(message, emoji, user)
@@ -607,7 +689,7 @@ class EventManager(commands.Cog):
 
                 await user.send("You have been removed from the event.")
 
-                await message.edit(embed=event.embed)
+                self.update_event_message(event)
 
                 chan = self.bot.get_channel(await self.config.guild(event.guild).log())
 
@@ -669,7 +751,7 @@ class EventManager(commands.Cog):
 
             await user.send("You have successfully been signed up to the event.")
 
-            await message.edit(embed=event.embed)
+            self.update_event_message(event)
 
             chan = self.bot.get_channel(await self.config.guild(event.guild).log())
 
@@ -743,119 +825,96 @@ class EventManager(commands.Cog):
         for event in self.cache[member.guild.id].values():
             if entrant := event.get_entrant(member.id):
                 event.remove_entrant(entrant)
-                try:
-                    msg = await event.message()
-
-                except Exception:
-                    log.debug(
-                        f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                    )
-                    del self.cache[event.guild_id][event.message_id]
-                    await self.config.custom("events", event.guild_id, event.message_id).clear()
-                    continue
-
-                if not msg:
-                    continue
+                self.update_event_message(event)
 
-                await msg.edit(embed=event.embed)
-
-    @tasks.loop(minutes=5)
-    async def check_events(self):
-        await self.to_config()
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if not payload.guild_id:
+            return
 
-        self.cache.clear()
+        if event := self.cache.get(payload.guild_id, {}).get(payload.message_id):
+            event.forget_message()
 
-        await self.to_cache()
+    async def end_event(self, event: Event):
+        embed = event.end()
+        try:
+            msg = await event.message()
 
-        for guild_config in self.cache.copy().values():
-            cop = guild_config.copy()
-            for event in cop.values():
-                if event.end_time <= datetime.now(tz=event.end_time.tzinfo):
-                    embed = event.end()
-                    try:
-                        msg = await event.message()
+        except Exception:
+            log.debug(
+                f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+            )
+            return await self.remove_event(event)
 
-                    except Exception:
-                        log.debug(
-                            f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                        )
+        if not msg:
+            log.debug(
+                f"The message for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+            )
+            return await self.remove_event(event)
 
-                        del self.cache[event.guild_id][event.message_id]
-                        await self.config.custom(
-                            "events", event.guild_id, event.message_id
-                        ).clear()
-                        continue
+        if (chan_id := await self.config.guild_from_id(event.guild_id).history_channel()) and (
+            chan := event.guild.get_channel(int(chan_id))
+        ):
+            await chan.send(embed=embed)
+            try:
+                await msg.delete()
+            except Exception:
+                pass
 
-                    if not msg:
-                        log.debug(
-                            f"The message for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                        )
+        else:
+            await msg.edit(embed=embed)
+            await msg.clear_reactions()
 
-                        await self.config.custom(
-                            "events", event.guild_id, event.message_id
-                        ).clear()
-                        del self.cache[event.guild_id][event.message_id]
-                        continue
-
-                    if (
-                        chan_id := await self.config.guild_from_id(
-                            event.guild_id
-                        ).history_channel()
-                    ) and (chan := event.guild.get_channel(int(chan_id))):
-                        await chan.send(embed=embed)
-                        try:
-                            await msg.delete()
-                        except Exception:
-                            pass
-
-                    else:
-                        await msg.edit(embed=embed)
-                        await msg.clear_reactions()
-
-                    await self.config.custom("events", event.guild_id, event.message_id).clear()
-                    del self.cache[event.guild_id][event.message_id]
-                    continue
+        await self.remove_event(event)
 
-                if not event.entrants:
-                    continue
+    async def remind_event(self, event: Event):
+        td = event.end_time - datetime.now(tz=event.end_time.tzinfo)
+        # reminders that were missed, e.g. while the bot was down, are sent as one
+        reached = sum(td.total_seconds() <= reminder for reminder in self.REMINDERS)
+        if reached > event.pings:
+            if event.entrants:
+                channel = event.channel
 
-                if event.pings >= 3:
-                    continue
+                if not channel:
+                    log.debug(
+                        f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
+                    )
+                    return await self.remove_event(event)
 
-                td = event.end_time - datetime.now(tz=event.end_time.tzinfo)
+                await channel.send(
+                    f"{humanize_list([f'<@{ent.user_id}>' for ent in event.entrants])}\n\nThe event `{event.name}` is about to start <t:{int(event.end_time.timestamp())}:R>",
+                    allowed_mentions=discord.AllowedMentions(users=True),
+                )
 
-                if td.total_seconds() < self.HOUR:
-                    if td.total_seconds() <= self.HALF_HOUR:
-                        if td.total_seconds() <= self.QUARTER_HOUR:
-                            if event.pings >= 3:
-                                continue
+            event.pings = reached
+            event.dirty = True
 
-                        if event.pings >= 2:
-                            continue
+        self.schedule_event(event)
 
-                    if event.pings >= 1:
-                        continue
+    async def run_schedule(self):
+        while True:
+            guild_id, message_id = await self.schedule.next_due()
+            if not (event := self.cache.get(guild_id, {}).get(message_id)):
+                continue
 
-                    channel = event.channel
+            try:
+                if event.end_time <= datetime.now(tz=event.end_time.tzinfo):
+                    await self.end_event(event)
+                else:
+                    await self.remind_event(event)
 
-                    if not channel:
-                        log.debug(
-                            f"The channel for the event {event.name} ({event.message_id}) has been deleted so I'm removing it from storage"
-                        )
-                        del self.cache[event.guild_id][event.message_id]
-                        await self.config.custom(
-                            "events", event.guild_id, event.message_id
-                        ).clear()
-                        continue
-
-                    await channel.send(
-                        f"{humanize_list([f'<@{ent.user_id}>' for ent in event.entrants])}\n\nThe event `{event.name}` is about to start <t:{int(event.end_time.timestamp())}:R>",
-                        allowed_mentions=discord.AllowedMentions(users=True),
-                    )
+            except Exception as e:
+                log.exception(f"Failed to process the event {message_id}", exc_info=e)
+                if self.cache.get(guild_id, {}).get(message_id) is event:
+                    # try again later, like the old polling loop would have
+                    self.schedule.schedule((guild_id, message_id), time.time() + 5 * 60)
 
-                    event.pings += 1
+    @tasks.loop(minutes=1)
+    async def flush_events(self):
+        await self.to_config()
 
-    @check_events.before_loop
+    @flush_events.before_loop
     async def before(self):
         await self.bot.wait_until_red_ready()
         await self.to_cache()
+        self.scheduler = asyncio.create_task(self.run_schedule())
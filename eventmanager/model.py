@@ -44,7 +44,17 @@ class Event:
 
         self.pings = pings or 0
 
-        self.entrants: typing.List[Entrant] = []
+        # entrants by user id, and again per category, both in sign up order
+        self._entrants: typing.Dict[int, Entrant] = {}
+        self._by_category: typing.Dict[Category, typing.Dict[int, Entrant]] = {
+            category: {} for category in Category
+        }
+        # the rendered entrant fields of the embed and the revision they were rendered at
+        self._revision = 0
+        self._entrant_fields: typing.Optional[typing.Tuple[int, typing.List[dict]]] = None
+        self._message: typing.Optional[discord.Message] = None
+        # whether this event changed since it was last saved to config
+        self.dirty = True
 
     @property
     def cog(self):
@@ -67,6 +77,51 @@ class Event:
     def message(self):
         return self._get_message
 
+    @property
+    def entrants(self) -> typing.List["Entrant"]:
+        return list(self._entrants.values())
+
+    def _changed(self):
+        self._revision += 1
+        self.dirty = True
+
+    def _render_entrant_fields(self) -> typing.List[dict]:
+        if self._entrant_fields is not None and self._entrant_fields[0] == self._revision:
+            return self._entrant_fields[1]
+
+        fields = []
+        for category, ent in self._by_category.items():
+            if not ent:
+                continue
+            entrants_str = "\n".join(
+                [
+                    f"{class_spec_dict[i.category_class]['specs'][i.spec]['emoji']} <@{i.user_id}> {f'(**{i.name}**)' if i._name else ''} - <t:{int(i.joined_at.timestamp())}:F>"
+                    for i in ent.values()
+                ]
+            )
+            category_emoji = category.emoji
+            for page in cf.pagify(entrants_str, page_length=1000):
+                fields.append(
+                    {
+                        "name": f"{category_emoji} **{category.value}**:  (**{len(page.splitlines())}/{len(ent)}**)",
+                        "value": page,
+                        "inline": False,
+                    }
+                )
+
+        counts = {category: len(ent) for category, ent in self._by_category.items()}
+        fields.append(
+            {
+                "name": f"**{len(self._entrants)}** Joined Users: ",
+                "value": cf.box(
+                    f"Melee: {counts[Category.MELEE]}\t Ranged: {counts[Category.RANGED]}\nHealer: {counts[Category.HEALER]}\t Tank: {counts[Category.TANK]}"
+                ),
+                "inline": False,
+            }
+        )
+        self._entrant_fields = (self._revision, fields)
+        return fields
+
     @property
     def embed(self) -> discord.Embed:
         """Create the embed for an event."""
@@ -84,37 +139,8 @@ class Event:
             inline=False,
         )
 
-        joined_melee = [i for i in self.entrants if i.category is Category.MELEE]
-        joined_ranged = [i for i in self.entrants if i.category is Category.RANGED]
-        joined_healer = [i for i in self.entrants if i.category is Category.HEALER]
-        joined_tank = [i for i in self.entrants if i.category is Category.TANK]
-
-        if self.entrants:
-            for category in Category:
-                ent = [i for i in self.entrants if i.category is category]
-                if not ent:
-                    continue
-                entrants_str = "\n".join(
-                    [
-                        f"{class_spec_dict[i.category_class]['specs'][i.spec]['emoji']} <@{i.user_id}> {f'(**{i.name}**)' if i._name else ''} - <t:{int(i.joined_at.timestamp())}:F>"
-                        for i in ent
-                    ]
-                )
-                category_emoji = category.emoji
-                for page in cf.pagify(entrants_str, page_length=1000):
-                    embed.add_field(
-                        name=f"{category_emoji} **{category.value}**:  (**{len(page.splitlines())}/{len(ent)}**)",
-                        value=page,
-                        inline=False,
-                    )
-
-        embed.add_field(
-            name=f"**{len(self.entrants)}** Joined Users: ",
-            value=cf.box(
-                f"Melee: {len(joined_melee)}\t Ranged: {len(joined_ranged)}\nHealer: {len(joined_healer)}\t Tank: {len(joined_tank)}"
-            ),
-            inline=False,
-        )
+        for field in self._render_entrant_fields():
+            embed.add_field(**field)
 
         if self.softres:
             embed.add_field(name="Softres link:", value=self.softres, inline=False)
@@ -146,6 +172,7 @@ class Event:
             "author_id": self.author_id,
             "description": self.description,
             "description2": self.description2,
+            "softres": self.softres,
             "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat(),
             "image_url": self.image_url,
@@ -175,6 +202,7 @@ class Event:
         This returns a new instance of the event and
         not the same instance that this method was called on."""
         new = self.copy()
+        new.dirty = True
 
         if name:
             new.name = name
@@ -200,10 +228,8 @@ class Event:
         return new
 
     async def _get_message(self) -> typing.Optional[discord.Message]:
-        msg = list(filter(lambda x: x.id == self.message_id, self.bot.cached_messages))
-
-        if msg:
-            return msg[0]
+        if self._message is not None and self._message.id == self.message_id:
+            return self._message
 
         channel = self.channel
 
@@ -214,12 +240,15 @@ class Event:
             msg = await channel.fetch_message(self.message_id)
         except Exception:
             msg = None
+        self._message = msg
         return msg
 
+    def forget_message(self):
+        """Drop the retained message, so it's fetched again the next time it's needed."""
+        self._message = None
+
     def get_entrant(self, user_id: int) -> typing.Optional["Entrant"]:
-        for entrant in self.entrants:
-            if entrant.user_id == user_id:
-                return entrant
+        return self._entrants.get(user_id)
 
     def add_entrant(
         self,
@@ -230,17 +259,32 @@ class Event:
         spec: str,
     ):
         if entrant := self.get_entrant(user_id):
+            old_category = entrant.category
             entrant._name = user_name
             entrant.category_class = category_class
             entrant.category = category
+            if old_category is not category:
+                del self._by_category[old_category][user_id]
+                # keep the entrant at their original sign up position
+                self._by_category[category] = {
+                    i.user_id: i for i in self._entrants.values() if i.category is category
+                }
             entrant.spec = spec
             entrant.joined_at = datetime.now()
+            self._changed()
             return entrant
         entrant = Entrant(user_name, user_id, self, category, category_class, spec, datetime.now())
-        self.entrants.append(entrant)
+        self._add(entrant)
+        self._changed()
+
+    def _add(self, entrant: "Entrant"):
+        self._entrants[entrant.user_id] = entrant
+        self._by_category[entrant.category][entrant.user_id] = entrant
 
     def remove_entrant(self, entrant: "Entrant"):
-        self.entrants.remove(entrant)
+        del self._entrants[entrant.user_id]
+        del self._by_category[entrant.category][entrant.user_id]
+        self._changed()
 
     @classmethod
     def from_json(cls, bot: Red, json: dict) -> "Event":
@@ -249,7 +293,9 @@ class Event:
         entrants = json["entrants"]
         del json["entrants"]
         self = cls(bot, **json)
-        self.entrants = [Entrant.from_json(self, i) for i in entrants]
+        for i in entrants:
+            self._add(Entrant.from_json(self, i))
+        self.dirty = False
         return self
 
 
@@ -0,0 +1,66 @@
+import asyncio
+import heapq
+import time
+import typing
+
+Key = typing.Tuple[int, int]
+
+
+class EventSchedule:
+    """
+    A time ordered queue of events waiting for their next reminder or their end.
+
+    Each event is kept with a single due time. Rescheduling an event pushes a new
+    heap entry and leaves the old one behind, stale entries are dropped when they
+    reach the top of the heap."""
+
+    def __init__(self):
+        self._heap: typing.List[typing.Tuple[float, Key]] = []
+        self._due: typing.Dict[Key, float] = {}
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._due
+
+    def schedule(self, key: Key, when: float):
+        if self._due.get(key) == when:
+            return
+        self._due[key] = when
+        heapq.heappush(self._heap, (when, key))
+        self._changed.set()
+
+    def discard(self, key: Key):
+        if self._due.pop(key, None) is not None:
+            self._changed.set()
+
+    def clear(self):
+        self._heap.clear()
+        self._due.clear()
+        self._changed.set()
+
+    def _peek(self) -> typing.Optional[typing.Tuple[float, Key]]:
+        while self._heap:
+            when, key = self._heap[0]
+            if self._due.get(key) == when:
+                return when, key
+            heapq.heappop(self._heap)
+        return None
+
+    async def next_due(self) -> Key:
+        """Wait until the earliest scheduled event is due, then unschedule and return it."""
+        while True:
+            self._changed.clear()
+            top = self._peek()
+            if top is not None and top[0] <= time.time():
+                heapq.heappop(self._heap)
+                del self._due[top[1]]
+                return top[1]
+
+            timeout = None if top is None else top[0] - time.time()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
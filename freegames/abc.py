@@ -1,5 +1,5 @@
 from abc import ABC, ABCMeta, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from discord.ext.commands.cog import CogMeta
 
@@ -21,7 +21,7 @@ class MixinMeta(ABC):
         self.db: DB
 
     @abstractmethod
-    async def save(self) -> None:
+    async def save(self, guild_id: Optional[int] = None) -> None:
         raise NotImplementedError
 
     @abstractmethod
@@ -47,7 +47,7 @@ class Settings(MixinMeta):
             conf.freestuff.toggle = toggle = not conf.freestuff.toggle
             await ctx.send(f"FreeStuffAPI toggled {'on' if toggle else 'off'}")
 
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @fsapi.command(name="channel")
     async def fsapi_channel(
@@ -59,7 +59,7 @@ class Settings(MixinMeta):
         conf = self.db.get_conf(ctx.guild)
         conf.freestuff.channel = channel.id
         await ctx.send(f"FreeStuffAPI channel set to {channel.mention}")
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @fsapi.command(name="stores")
     async def fsapi_stores(
@@ -91,7 +91,7 @@ class Settings(MixinMeta):
             if stores
             else "Stores removed."
         )
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @freegames_set.group(name="gamerpowerapi", aliases=["gpapi"])
     async def gpapi(self, ctx: commands.Context):
@@ -116,7 +116,7 @@ class Settings(MixinMeta):
             conf.gamerpower.toggle = toggle = not conf.gamerpower.toggle
             await ctx.send(f"GamerPowerAPI toggled {'on' if toggle else 'off'}")
 
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @gpapi.command(name="channel")
     async def gpapi_channel(
@@ -128,7 +128,7 @@ class Settings(MixinMeta):
         conf = self.db.get_conf(ctx.guild)
         conf.gamerpower.channel = channel.id
         await ctx.send(f"GamerPowerAPI channel set to {channel.mention}")
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @gpapi.command(name="stores")
     async def gpapi_stores(
@@ -156,7 +156,7 @@ class Settings(MixinMeta):
         conf = self.db.get_conf(ctx.guild)
         conf.gamerpower.stores_to_check = set(stores)
         await ctx.send(f"Stores set to {cf.humanize_list(stores)}")
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @freegames_set.group(name="pingroles")
     async def pingroles(self, ctx: commands.Context, *roles: discord.Role):
@@ -180,7 +180,7 @@ class Settings(MixinMeta):
         conf = self.db.get_conf(ctx.guild)
         conf.pingroles = set(map(operator.attrgetter("id"), roles))
         await ctx.send(f"Roles set to {cf.humanize_list(roles)}")
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @freegames_set.group(name="pingme")
     async def pingme(self, ctx: commands.Context):
@@ -198,7 +198,7 @@ class Settings(MixinMeta):
                 "You will no longer be pinged when a new game is posted."
             )
 
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @freegames_set.command(name="reset")
     async def reset(self, ctx: commands.Context):
@@ -207,7 +207,7 @@ class Settings(MixinMeta):
         """
         self.db.configs[ctx.guild.id] = GuildSettings()
         await ctx.send("Settings reset to default.")
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @freegames_set.command(name="showsettings", aliases=["show", "ss"])
     async def show(self, ctx: commands.Context):
@@ -22,6 +22,7 @@ from .common.models import (
     GamerPowerResponse,
     StoreLogos,
 )
+from .common.storage import GuildStorage
 
 log = logging.getLogger("red.craycogs.freegames")
 RequestType = t.Literal["discord_deleted_user", "owner", "user", "user_strict"]
@@ -56,7 +57,7 @@ class FreeGames(Commands, commands.Cog, metaclass=CompositeMetaClass):
         self.config.register_global(db={})
 
         self.db: DB = DB()
-        self.saving = False
+        self.storage = GuildStorage(self.config, lambda: self.db)
 
         self.session = aiohttp.ClientSession()
         self.post_task = self.check_for_freegames.start()
@@ -77,20 +78,14 @@ class FreeGames(Commands, commands.Cog, metaclass=CompositeMetaClass):
         self.db = await asyncio.to_thread(DB.model_validate, data)
         log.info("Config loaded")
 
-    async def save(self) -> None:
-        if self.saving:
-            return
-        try:
-            self.saving = True
-            dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-            await self.config.db.set(dump)
-        except Exception as e:
-            log.exception("Failed to save config", exc_info=e)
-        finally:
-            self.saving = False
+    async def save(self, guild_id: t.Optional[int] = None) -> None:
+        """Mark `guild_id` (or the whole DB when None) as dirty.
+
+        Writes are debounced and coalesced by `GuildStorage`."""
+        self.storage.mark_dirty(guild_id)
 
     async def cog_unload(self) -> None:
-        await self.save()
+        await self.storage.close()
         self.post_task.cancel()
         await self.session.close()
 
@@ -0,0 +1,81 @@
+import heapq
+import typing
+
+import discord
+
+
+class SeenIndex:
+    """
+    Per-guild min-heaps of `(last_seen, user_id)` kept alongside the cog's cache.
+
+    Entries are never removed in place, an entry is only valid while the cache still
+    holds the same timestamp for that user. A user's time is only pushed to the guild
+    it was seen in, walks of the other guilds pick the newer time up from the cache.
+    Reading the heaps in order doesn't pop anything, so the n oldest entries of a guild
+    cost O(n log n) instead of a full sort.
+    """
+
+    def __init__(self, cache: typing.Dict[int, typing.Optional[float]]):
+        self.cache = cache
+        self._heaps: typing.Dict[int, typing.List[typing.Tuple[float, int]]] = {}
+
+    def build(self, guild: discord.Guild):
+        cache = self.cache
+        heap = [
+            (seen, member.id)
+            for member in guild.members
+            if (seen := cache.get(member.id)) is not None
+        ]
+        heapq.heapify(heap)
+        self._heaps[guild.id] = heap
+
+    def push(self, guild: discord.Guild, user_id: int, seen: float):
+        heap = self._heaps.get(guild.id)
+        if heap is None:
+            # built lazily the first time the guild is queried
+            return
+
+        heapq.heappush(heap, (seen, user_id))
+        if len(heap) > 2 * (guild.member_count or len(guild.members)) + 100:
+            # too many stale entries, start over from the cache
+            self.build(guild)
+
+    def remove_guild(self, guild_id: int):
+        self._heaps.pop(guild_id, None)
+
+    def iter_oldest(
+        self, guild: discord.Guild, *, snapshot: bool = False
+    ) -> typing.Iterator[typing.Tuple[int, float]]:
+        """Yield `(user_id, last_seen)` for a guild's members from the oldest last seen time.
+
+        Pass `snapshot=True` when the iterator is consumed across awaits, pushes made
+        in the meantime would otherwise reorder the heap under the walk."""
+        if guild.id not in self._heaps:
+            self.build(guild)
+
+        heap = self._heaps[guild.id]
+        if snapshot:
+            heap = heap.copy()
+        cache = self.cache
+        seen_ids: typing.Set[int] = set()
+        # walk the heap as a tree with a second heap of candidate indexes
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            (seen, user_id), index = heapq.heappop(frontier)
+            if index >= 0:
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+
+            if user_id in seen_ids:
+                continue
+
+            current = cache.get(user_id)
+            if current != seen:
+                if current is not None and current > seen:
+                    # seen again in another guild, walk it again at its new time
+                    heapq.heappush(frontier, ((current, user_id), -1))
+                continue
+
+            seen_ids.add(user_id)
+            yield user_id, seen
@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 import time
 import typing
 from datetime import datetime
@@ -8,6 +9,31 @@ from discord.ext import tasks
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import humanize_list, pagify
+from redbot.vendored.discord.ext import menus
+
+from .index import SeenIndex
+
+FLUSH_BATCH_SIZE = 100  # config writes awaited together during a flush
+
+
+class OfflinePageSource(menus.AsyncIteratorPageSource):
+    def __init__(self, entries: typing.Iterator[typing.Tuple[int, float]]):
+        super().__init__(self._aiter(entries), per_page=15)
+
+    @staticmethod
+    async def _aiter(entries: typing.Iterator[typing.Tuple[int, float]]):
+        for entry in entries:
+            yield entry
+
+    async def format_page(self, menu: menus.MenuPages, entries: typing.List[typing.Tuple[int, float]]):
+        start = menu.current_page * self.per_page
+        description = "\n".join(
+            f"{ind}. <@{user_id}> ({user_id}) - {LastSeen.get_formatted_timestamps(last_seen)}"
+            for ind, (user_id, last_seen) in enumerate(entries, start + 1)
+        )
+        return discord.Embed(
+            title="All Offline Users", description=description, color=discord.Color.dark_purple()
+        )
 
 
 class LastSeen(commands.Cog):
@@ -25,6 +51,9 @@ class LastSeen(commands.Cog):
     def __init__(self, bot: Red):
         self.bot = bot
         self.cache: typing.Dict[int, typing.Optional[float]] = {}
+        # user ids whose cached last seen time hasn't been written to config yet
+        self._dirty: typing.Set[int] = set()
+        self.index = SeenIndex(self.cache)
 
         self._task = self.save_to_config_every_5.start()
 
@@ -37,17 +66,60 @@ class LastSeen(commands.Cog):
         await self.bot.wait_until_red_ready()
         user_data = await self.config.all_users()
         for user_id, data in user_data.items():
-            self.cache[user_id] = data["seen"]
+            # listeners may have already seen this user since the cog loaded
+            self.cache.setdefault(user_id, data["seen"])
 
         for guild in self.bot.guilds:
             for member in guild.members:
                 if member.status is self.offline_status:
                     if member.id not in self.cache:
-                        self.cache.update({member.id: time.time()})
+                        self.cache[member.id] = time.time()
+                        self._dirty.add(member.id)
+
+        for guild in self.bot.guilds:
+            self.index.build(guild)
+
+    def update_seen(self, member: discord.Member):
+        """Update a member's last seen time in the cache and queue it for the next flush.
+
+        Only the index of the guild the event came from is updated, the other guilds
+        pick the new time up from the cache when they're walked."""
+        seen = self.cache[member.id] = time.time()
+        self._dirty.add(member.id)
+        self.index.push(member.guild, member.id, seen)
 
     async def to_config(self):
-        for user_id, seen in self.cache.copy().items():
-            await self.config.user_from_id(user_id).seen.set(seen)
+        """
+        Write every last seen time that changed since the last flush, in batches.
+
+        Config has no public way to write several users in one operation, and writing
+        the whole user group back would cost O(all users) and race with per user writes
+        such as data deletion requests. So only the dirty users are written, one small
+        write each, awaited `FLUSH_BATCH_SIZE` at a time."""
+        if not self._dirty:
+            return
+
+        dirty, self._dirty = list(self._dirty), set()
+        failed: typing.List[int] = []
+        error: typing.Optional[BaseException] = None
+        for start in range(0, len(dirty), FLUSH_BATCH_SIZE):
+            batch = dirty[start : start + FLUSH_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(
+                    self.config.user_from_id(user_id).seen.set(self.cache.get(user_id))
+                    for user_id in batch
+                ),
+                return_exceptions=True,
+            )
+            for user_id, result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    failed.append(user_id)
+                    error = error or result
+
+        if error is not None:
+            # retried on the next flush
+            self._dirty.update(failed)
+            raise error
 
     def cog_unload(self):
         self._task.cancel()
@@ -66,8 +138,6 @@ class LastSeen(commands.Cog):
     @tasks.loop(minutes=5)
     async def save_to_config_every_5(self):
         await self.to_config()
-        self.cache.clear()
-        await self.build_cache()
 
     @commands.Cog.listener()
     async def on_typing(
@@ -87,7 +157,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({user.id: time.time()})
+            self.update_seen(user)
 
     @commands.Cog.listener()
     async def on_reaction_add(
@@ -104,7 +174,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({user.id: time.time()})
+            self.update_seen(user)
 
     @commands.Cog.listener()
     async def on_reaction_remove(
@@ -121,7 +191,7 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({user.id: time.time()})
+            self.update_seen(user)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
@@ -134,7 +204,11 @@ class LastSeen(commands.Cog):
                 # it will be updated in on_member_update
                 return
 
-            self.cache.update({message.author.id: time.time()})
+            self.update_seen(message.author)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.index.remove_guild(guild.id)
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -143,7 +217,7 @@ class LastSeen(commands.Cog):
 
         if before.status != after.status:
             if after.status is self.offline_status or before.status is self.offline_status:
-                self.cache.update({after.id: time.time()})
+                self.update_seen(after)
 
     @staticmethod
     def get_formatted_timestamps(t: float):
@@ -184,21 +258,14 @@ class LastSeen(commands.Cog):
         if not self.cache:
             return await ctx.maybe_send_embed("I haven't tracked any offline users yet.")
 
-        offline_users = dict(
-            sorted(
-                filter(
-                    lambda x: x
-                    and (user := ctx.guild.get_member(x[0]))
-                    and user.status is self.offline_status,
-                    self.cache.copy().items(),
-                ),
-                key=lambda x: x[1],
-            )
-        )
-
         final = ""
+        ind = 0
+        for user_id, lastseen in self.index.iter_oldest(ctx.guild):
+            user = ctx.guild.get_member(user_id)
+            if not user or user.status is not self.offline_status:
+                continue
 
-        for ind, (user_id, lastseen) in enumerate(offline_users.items(), 1):
+            ind += 1
             final += f"{ind}. <@{user_id}> - {self.get_formatted_timestamps(lastseen)}\n"
 
             if ind == x:
@@ -220,27 +287,15 @@ class LastSeen(commands.Cog):
                 "I haven't tracked any users going offline or coming online yet."
             )
 
-        final = ""
-
-        sorted_dict = dict(
-            sorted(
-                filter(
-                    lambda x: x
-                    and (user := ctx.guild.get_member(x[0]))
-                    and user.status is self.offline_status,
-                    self.cache.copy().items(),
-                ),
-                key=lambda x: x[1],
-            )
+        guild = ctx.guild
+        offline = (
+            (user_id, last_seen)
+            for user_id, last_seen in self.index.iter_oldest(guild, snapshot=True)
+            if (user := guild.get_member(user_id)) and user.status is self.offline_status
         )
+        first = next(offline, None)
+        if first is None:
+            return await ctx.maybe_send_embed("There are no offline users I've tracked here.")
 
-        for ind, (user_id, last_seen) in enumerate(sorted_dict.items(), 1):
-            final += (
-                f"{ind}. <@{user_id}> ({user_id}) - {self.get_formatted_timestamps(last_seen)}\n"
-            )
-
-        for page in pagify(final):
-            embed = discord.Embed(
-                title="All Offline Users", description=page, color=discord.Color.dark_purple()
-            )
-            await ctx.send(embed=embed)
+        source = OfflinePageSource(itertools.chain((first,), offline))
+        await menus.MenuPages(source, clear_reactions_after=True).start(ctx)
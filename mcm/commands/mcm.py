@@ -81,7 +81,7 @@ class MCMTopLevel(MixinMeta):
             )
         self.db.configs[ctx.guild.id] = GuildSettings()
         await ctx.tick()
-        await self.save()
+        await self.save(ctx.guild.id)
 
     @mcm.command(name="showsettings", aliases=["ss"])
     @commands.mod()
@@ -34,12 +34,16 @@ class Base(BaseModel):
             return super().model_validate(obj, *args, **kwargs)
         return super().parse_obj(obj, *args, **kwargs)
 
+    def storage_key(self) -> typing.Optional[int]:
+        """The guild this model is persisted under, None means the whole DB."""
+        return None
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         if exc_type is None:
-            await self.cog.save()
+            await self.cog.save(self.storage_key())
         else:
             from ..main import log
 
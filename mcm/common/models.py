@@ -53,6 +53,12 @@ class MemberData(Base):
     registered_by: typing.Optional[int] = None
     leave_date: typing.Optional[datetime.datetime] = None
 
+    # set by `GuildSettings` so a save from `async with member:` only writes its guild
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    def storage_key(self) -> typing.Optional[int]:
+        return self._guild_id
+
 
 class GuildSettings(Base):
     logchannel: typing.Optional[int] = None
@@ -74,15 +80,34 @@ class GuildSettings(Base):
         default_factory=RegistrationConfig
     )
 
+    # set by `DB` so a save from `async with conf:` only writes this guild
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    def storage_key(self) -> typing.Optional[int]:
+        return self._guild_id
+
+    def bind(self, guild_id: int):
+        self._guild_id = guild_id
+        for member in self.members.values():
+            member._guild_id = guild_id
+
     def get_member(self, member: discord.Member | int):
         mid = member if isinstance(member, int) else member.id
-        return self.members.setdefault(mid, MemberData())
+        memdata = self.members.setdefault(mid, MemberData())
+        memdata._guild_id = self._guild_id
+        return memdata
 
 
 class DB(Base):
     configs: dict[int, GuildSettings] = {}
 
+    def model_post_init(self, __context: typing.Any) -> None:
+        for gid, conf in self.configs.items():
+            conf.bind(gid)
+
     def get_conf(self, guild: discord.Guild | int) -> GuildSettings:
         gid = guild if isinstance(guild, int) else guild.id
         conf = self.configs.setdefault(gid, GuildSettings())
+        if conf.storage_key() != gid:
+            conf.bind(gid)
         return conf
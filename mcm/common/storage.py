@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import typing
+
+from redbot.core import Config
+
+if typing.TYPE_CHECKING:
+    from .models import DB
+
+log = logging.getLogger("red.craycogs.mcm.storage")
+
+
+class GuildStorage:
+    """Debounced, per-guild persistence for the pydantic `DB` model.
+
+    Instead of dumping the whole `DB` on every change, callers mark the guilds
+    they touched as dirty and only those `GuildSettings` are serialized and
+    written under `db.configs.<guild_id>` once the debounce delay has passed.
+    Marks that land while a flush is running are picked up by the same flush,
+    so the last mutation is always persisted."""
+
+    def __init__(
+        self,
+        config: Config,
+        get_db: typing.Callable[[], "DB"],
+        delay: float = 2.0,
+    ):
+        self.config = config
+        self.get_db = get_db
+        self.delay = delay
+        self._dirty: set[int] = set()
+        self._full = False
+        self._task: typing.Optional[asyncio.Task[None]] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> bool:
+        return self._full or bool(self._dirty)
+
+    def mark_dirty(self, guild_id: typing.Optional[int] = None) -> asyncio.Task[None]:
+        """Schedule a write for `guild_id`, or for the entire DB if it's None."""
+        if guild_id is None:
+            self._full = True
+        else:
+            self._dirty.add(guild_id)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+        return self._task
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write everything that is currently marked dirty."""
+        async with self._lock:
+            while self.pending:
+                dirty, self._dirty = self._dirty, set()
+                full, self._full = self._full, False
+                db = self.get_db()
+                try:
+                    if full:
+                        dump = await asyncio.to_thread(db.model_dump, mode="json")
+                        await self.config.db.set(dump)
+                        continue
+
+                    for guild_id in dirty:
+                        conf = db.configs.get(guild_id)
+                        if conf is None:
+                            await self.config.db.clear_raw("configs", str(guild_id))
+                            continue
+                        dump = await asyncio.to_thread(conf.model_dump, mode="json")
+                        await self.config.db.set_raw(
+                            "configs", str(guild_id), value=dump
+                        )
+                except Exception as e:
+                    log.exception("Failed to save config", exc_info=e)
+
+    async def close(self) -> None:
+        """Skip the pending debounce and flush immediately."""
+        if self._task is not None and not self._task.done():
+            if self._lock.locked():
+                # a flush is already writing, let it finish instead of cutting it off
+                await self._task
+            else:
+                self._task.cancel()
+        await self.flush()
@@ -11,6 +11,7 @@ from tabulate import tabulate
 from .abc import CompositeMetaClass
 from .commands import Commands
 from .common.models import DB
+from .common.storage import GuildStorage
 from .common.utils import union_dicts
 from .listeners import Listeners
 from .views import (
@@ -47,7 +48,7 @@ class MissionChiefMetrics(
         self.config.register_global(db={}, version=1)
 
         self.db: DB = DB()
-        self.saving: asyncio.Future[t.Literal[True]] | t.Literal[False] = False
+        self.storage = GuildStorage(self.config, lambda: self.db)
 
         self.bot.add_dynamic_items(
             AcceptRegistration,
@@ -80,7 +81,7 @@ class MissionChiefMetrics(
             RejectWithBanRegistration,
             ViewStats,
         )
-        await self.save()
+        await self.storage.close()
 
     async def cog_load(self) -> None:
         asyncio.create_task(self.initialize())
@@ -95,35 +96,11 @@ class MissionChiefMetrics(
         self.db = await asyncio.to_thread(DB.model_validate, data)
         log.info("Config loaded")
 
-    async def save(self) -> None:
-        if self.saving:
-            log.debug("%s", self.saving)
-            if self.saving.done() and (exc := self.saving.exception()):
-                log.exception(
-                    "Failed to save config before so not saving again to avoid data corruption",
-                    exc_info=exc,
-                )
-                return
-
-            elif not self.saving.done():
-                try:
-                    log.debug("Awaiting saving previous instance")
-                    await self.saving
-
-                except Exception as e:
-                    log.exception("Failed to save config", exc_info=e)
-        try:
-            log.debug("Creating new future")
-            self.saving = self.bot.loop.create_future()
-            log.debug("Future: %s", self.saving)
-            dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-            await self.config.db.set(dump)
-            log.debug("Saved config")
-            self.saving.set_result(True)
-            log.debug("Set result to True")
-        except Exception as e:
-            log.exception("Failed to save config", exc_info=e)
-            self.saving.set_exception(e)
+    async def save(self, guild_id: t.Optional[int] = None) -> None:
+        """Mark `guild_id` (or the whole DB when None) as dirty.
+
+        Writes are debounced and coalesced by `GuildStorage`."""
+        self.storage.mark_dirty(guild_id)
 
     async def migrate_to_v2(self):
         config = Config.get_conf(self, identifier=1234567890)
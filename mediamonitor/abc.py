@@ -1,14 +1,17 @@
 from abc import ABC, ABCMeta, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from discord.ext.commands.cog import CogMeta
 
 if TYPE_CHECKING:
     import multiprocessing.pool
+    import re
 
     from redbot.core.bot import Red
 
+    from .common.expiryindex import ViolationExpiryIndex
     from .common.models import DB
+    from .common.storage import GuildStorage
 
 
 class CompositeMetaClass(CogMeta, ABCMeta):
@@ -21,8 +24,11 @@ class MixinMeta(ABC):
     def __init__(self, *_args):
         self.bot: Red
         self.db: DB
+        self.storage: GuildStorage
+        self.expiry_index: ViolationExpiryIndex
         self.re_pool: multiprocessing.pool.Pool
+        self.regex_cache: dict[int, tuple[str, re.Pattern]]
 
     @abstractmethod
-    def save(self) -> None:
+    def save(self, guild_id: Optional[int] = None) -> None:
         pass
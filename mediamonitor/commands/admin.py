@@ -64,6 +64,7 @@ class Admin(MixinMeta):
 
         async with self.db.get_conf(ctx.guild) as guild_settings:
             guild_settings.filename_regex = regex
+        self.regex_cache.pop(ctx.guild.id, None)
         await ctx.tick()
 
     @mediamonitor.command(name="filesizelimit", alias=["sizelim", "fslimit"])
@@ -205,6 +206,7 @@ class Admin(MixinMeta):
                 return
         async with self.db.get_conf(ctx.guild) as guild_settings:
             guild_settings.violation_expiration_seconds = time.total_seconds()
+        self.expiry_index.wakeup.set()
         await ctx.tick()
 
     @mediamonitor.command(name="removeviolation", aliases=["rmvio", "remvio", "delvio"])
@@ -151,12 +151,16 @@ class Base(BaseModel):
             **dumps_kwargs,
         )
 
+    def storage_key(self) -> int | None:
+        """The guild this model is persisted under, None means the whole DB."""
+        return None
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         if exc_type is None:
-            await self.cog.save()
+            self.cog.save(self.storage_key())
         else:
             from ..main import log
 
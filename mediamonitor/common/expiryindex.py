@@ -0,0 +1,66 @@
+import asyncio
+import heapq
+import typing
+
+if typing.TYPE_CHECKING:
+    from .models import DB, GuildSettings, Violation
+
+
+class ViolationExpiryIndex:
+    """Per-guild min-heaps of `(timestamp, user_id, violation_id)`.
+
+    A guild's expiration duration is the same for every violation, so ordering by
+    timestamp is ordering by expiry and changing the duration never needs a rebuild.
+    Violations removed by commands are left in the heap and skipped when popped."""
+
+    def __init__(self):
+        self._heaps: dict[int, list[tuple[float, int, str]]] = {}
+        self.wakeup = asyncio.Event()
+
+    def build(self, db: "DB") -> None:
+        heaps = {}
+        for guild_id, conf in db.configs.items():
+            heap = [
+                (violation.timestamp, user_id, violation_id)
+                for user_id, user_data in conf.members.items()
+                for violation_id, violation in user_data.violations.items()
+            ]
+            if heap:
+                heapq.heapify(heap)
+                heaps[guild_id] = heap
+        self._heaps = heaps
+
+    def push(self, guild_id: int, user_id: int, violation: "Violation") -> None:
+        heap = self._heaps.setdefault(guild_id, [])
+        heapq.heappush(heap, (violation.timestamp, user_id, violation.id))
+        if len(heap) == 1:
+            # the expiry task may be sleeping with nothing to wait for in this guild
+            self.wakeup.set()
+
+    def next_expiry(self, guild_id: int, expiration_seconds: int) -> float | None:
+        heap = self._heaps.get(guild_id)
+        if not heap or expiration_seconds <= 0:
+            return None
+        return heap[0][0] + expiration_seconds
+
+    def pop_due(
+        self, guild_id: int, conf: "GuildSettings", now: float
+    ) -> dict[int, list[str]]:
+        """Pop every entry of a guild that is due at `now`, returning `{user_id: [violation_id]}`."""
+        heap = self._heaps.get(guild_id)
+        expiration = conf.violation_expiration_seconds
+        due: dict[int, list[str]] = {}
+        if not heap or expiration <= 0:
+            return due
+
+        cutoff = now - expiration
+        while heap and heap[0][0] <= cutoff:
+            timestamp, user_id, violation_id = heapq.heappop(heap)
+            user_data = conf.members.get(user_id)
+            violation = user_data and user_data.violations.get(violation_id)
+            if violation and violation.timestamp == timestamp:
+                due.setdefault(user_id, []).append(violation_id)
+
+        if not heap:
+            del self._heaps[guild_id]
+        return due
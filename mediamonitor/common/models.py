@@ -59,6 +59,12 @@ class GuildSettings(Base):
     violation_expiration_seconds: int = 0
     members: dict[int, UserData] = pydantic.Field(default_factory=dict)
 
+    # set by `DB` so a save from `async with conf:` only writes this guild
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    def storage_key(self) -> typing.Optional[int]:
+        return self._guild_id
+
     def is_enabled(self):
         return (
             (
@@ -78,6 +84,12 @@ class GuildSettings(Base):
 class DB(Base):
     configs: dict[int, GuildSettings] = {}
 
+    def model_post_init(self, __context: typing.Any) -> None:
+        for gid, conf in self.configs.items():
+            conf._guild_id = gid
+
     def get_conf(self, guild: discord.Guild | int) -> GuildSettings:
         gid = guild if isinstance(guild, int) else guild.id
-        return self.configs.setdefault(gid, GuildSettings())
+        conf = self.configs.setdefault(gid, GuildSettings())
+        conf._guild_id = gid
+        return conf
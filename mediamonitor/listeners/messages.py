@@ -1,9 +1,7 @@
 import asyncio
 import datetime
-import functools
 import importlib.util
 import logging
-import multiprocessing as mp
 import typing
 
 import discord
@@ -55,18 +53,16 @@ class MessageListeners(MixinMeta):
         #     f"Message {message.id} in guild {guild.id} by {message.author.id} has passed all pre processing checks. Processing attachments."
         # )
 
-        attachments = message.attachments
-        for attachment in attachments:
-            violated, violation_type = await self.attachment_violates_rules(
-                message.guild, message.author, conf, attachment
+        violations = await self.attachments_violate_rules(
+            message.guild, message.author, conf, message.attachments
+        )
+        for attachment, violation_type in violations:
+            self.bot.dispatch(
+                "mediamonitor_violation",
+                message,
+                attachment,
+                violation_type,
             )
-            if violated is True:
-                self.bot.dispatch(
-                    "mediamonitor_violation",
-                    message,
-                    attachment,
-                    violation_type,
-                )
 
         # else:
         # log.debug(
@@ -167,54 +163,76 @@ class MessageListeners(MixinMeta):
             action_taken=action_taken,
         )
 
-    async def attachment_violates_rules(
+    async def attachments_violate_rules(
         self,
         guild: discord.Guild,
         author: discord.Member,
         conf: GuildSettings,
-        attachment: discord.Attachment,
-    ) -> typing.Union[
+        attachments: typing.Sequence[discord.Attachment],
+    ) -> typing.List[
         typing.Tuple[
-            bool, typing.Literal["", "filesize", "filetype", "filename"]
-        ],
+            discord.Attachment, typing.Literal["filesize", "filetype", "filename"]
+        ]
     ]:
-        """Check if an attachment violates the guild's media monitoring rules.
+        """Check a message's attachments against the guild's media monitoring rules.
 
-        Returns True if the attachment violates any of the rules, False otherwise.
+        Returns the violating attachments along with the rule each one broke, in the
+        order they were attached. All filenames that still need a regex check are
+        sent to the regex pool in a single call.
         """
-        if (
-            conf.file_size_limit_bytes > 0
-            and attachment.size > conf.file_size_limit_bytes
-        ):
-            # log.debug(
-            #     f"Attachment {attachment.id} in guild {guild.id} by {author.id} violates file size limit. {attachment.size=} > {conf.file_size_limit_bytes=}"
-            # )
-            return True, "filesize"
-
-        if conf.blacklisted_file_types:
-            filetype = attachment.filename.split(".")[-1].lower()
-            if filetype in conf.blacklisted_file_types:
-                # log.debug(
-                #     f"Attachment {attachment.id} in guild {guild.id} by {author.id} violates file type blacklist. {filetype=} in {conf.blacklisted_file_types=}"
-                # )
-                return True, "filetype"
-
-        if conf.filename_regex:
-            pattern = re.compile(conf.filename_regex)
-            safe, matches = await self.safe_regex_search(
-                guild, author, pattern, attachment.filename
+        violations: dict[
+            int, typing.Literal["filesize", "filetype", "filename"]
+        ] = {}
+        to_search: list[int] = []
+        for index, attachment in enumerate(attachments):
+            if (
+                conf.file_size_limit_bytes > 0
+                and attachment.size > conf.file_size_limit_bytes
+            ):
+                violations[index] = "filesize"
+                continue
+
+            if conf.blacklisted_file_types:
+                filetype = attachment.filename.split(".")[-1].lower()
+                if filetype in conf.blacklisted_file_types:
+                    violations[index] = "filetype"
+                    continue
+
+            to_search.append(index)
+
+        if conf.filename_regex and to_search:
+            pattern = self.get_filename_pattern(guild.id, conf.filename_regex)
+            safe, results = await self.safe_regex_search(
+                guild,
+                author,
+                pattern,
+                [attachments[index].filename for index in to_search],
             )
-            if safe and matches:
-                # log.debug(
-                #     f"Attachment {attachment.id} in guild {guild.id} by {author.id} violates filename regex. {attachment.filename=} matches {conf.filename_regex=}"
-                # )
-                return True, "filename"
+            if safe:
+                for index, matches in zip(to_search, results):
+                    if matches:
+                        violations[index] = "filename"
 
-            elif not safe:
+            else:
                 async with conf:
                     conf.filename_regex = ""
+                self.regex_cache.pop(guild.id, None)
 
-        return False, ""
+        return [
+            (attachment, violations[index])
+            for index, attachment in enumerate(attachments)
+            if index in violations
+        ]
+
+    def get_filename_pattern(self, guild_id: int, regex: str) -> re.Pattern:
+        """Get the compiled filename pattern for a guild, compiling it only when it changed."""
+        cached = self.regex_cache.get(guild_id)
+        if cached is not None and cached[0] == regex:
+            return cached[1]
+
+        pattern = re.compile(regex)
+        self.regex_cache[guild_id] = (regex, pattern)
+        return pattern
 
     # shamelessly stolen from TrustyJaid's ReTrigger cog
     async def safe_regex_search(
@@ -222,25 +240,39 @@ class MessageListeners(MixinMeta):
         guild: discord.Guild,
         author: discord.Member,
         regex: re.Pattern,
-        filename: str,
-    ) -> typing.Tuple[bool, list]:
+        filenames: typing.List[str],
+    ) -> typing.Tuple[bool, typing.List[list]]:
         """
         Mostly safe regex search to prevent reDOS from user defined regex patterns
 
-        This works by running the regex pattern inside a process pool defined at the
-        cog level and then checking that process in the default executor to keep
-        things asynchronous. If the process takes too long to complete we log a
-        warning and remove the trigger from trying to run again.
+        This works by running the regex pattern against every filename inside a process
+        pool defined at the cog level in a single call. The pool's callbacks resolve an
+        asyncio future so no executor thread is held while waiting. If the process takes
+        too long to complete we log a warning and remove the regex from trying to run again.
         """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[typing.List[list]] = loop.create_future()
+
+        def _set_result(result: typing.List[list]):
+            if not future.done():
+                future.set_result(result)
+
+        def _set_exception(exc: BaseException):
+            if not future.done():
+                future.set_exception(exc)
+
         try:
-            process = self.re_pool.apply_async(regex.findall, (filename,))
-            task = functools.partial(process.get, timeout=self.regex_timeout)
-            loop = asyncio.get_running_loop()
-            new_task = loop.run_in_executor(None, task)
-            search = await asyncio.wait_for(
-                new_task, timeout=self.regex_timeout + 5
+            # the bound `findall` pickles as the pattern plus a method name, so the pool's
+            # workers never have to import this cog whatever the start method is
+            self.re_pool.map_async(
+                regex.findall,
+                filenames,
+                chunksize=len(filenames),
+                callback=lambda r: loop.call_soon_threadsafe(_set_result, r),
+                error_callback=lambda e: loop.call_soon_threadsafe(_set_exception, e),
             )
-        except mp.TimeoutError:
+            search = await asyncio.wait_for(future, timeout=self.regex_timeout)
+        except asyncio.TimeoutError:
             log.warning(
                 "Filename Regex process timeout in guild %s (%s) Author %s Removing the regex",
                 guild.name,
@@ -249,14 +281,6 @@ class MessageListeners(MixinMeta):
             )
             return (False, [])
             # we certainly don't want to be performing multiple triggers if this happens
-        except asyncio.TimeoutError:
-            log.warning(
-                "Filename Regex asyncio timeout in guild %s (%s) Author %s Removing the regex",
-                guild.name,
-                guild.id,
-                author.id,
-            )
-            return (False, [])
         except ValueError:
             return (False, [])
         except Exception as exc:
@@ -267,7 +291,7 @@ class MessageListeners(MixinMeta):
                 author.id,
                 exc_info=exc,
             )
-            return (True, [])
+            return (True, [[] for _ in filenames])
         else:
             return (True, search)
 
@@ -320,6 +344,7 @@ class MessageListeners(MixinMeta):
                 log_message_url=logmsg.jump_url if logmsg else None,
             )
             conf.get_member(message.author.id).violations[vio.id] = vio
+        self.expiry_index.push(message.guild.id, message.author.id, vio)
 
     async def create_violation_embed(
         self,
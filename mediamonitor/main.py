@@ -1,4 +1,5 @@
 import asyncio
+import importlib.util
 import logging
 import typing as t
 from multiprocessing.pool import Pool
@@ -9,10 +10,17 @@ from redbot.core.bot import Red
 from .abc import CompositeMetaClass
 from .commands import Commands
 from .common import Base
+from .common.expiryindex import ViolationExpiryIndex
 from .common.models import DB
+from .common.storage import GuildStorage
 from .listeners import Listeners
 from .tasks import TaskLoops
 
+if importlib.util.find_spec("regex"):
+    import regex as re
+else:
+    import re
+
 log = logging.getLogger("red.mediamonitor")
 RequestType = t.Literal["discord_deleted_user", "owner", "user", "user_strict"]
 
@@ -49,10 +57,13 @@ class MediaMonitor(
         self.config = Config.get_conf(self, 117, force_registration=True)
         self.config.register_global(db={})
         self.db: DB = DB()
-        self.saving = False
+        self.storage = GuildStorage(self.config, lambda: self.db)
+        self.expiry_index = ViolationExpiryIndex()
         self.re_pool = Pool()
         self.expire_violations_task = self.expire_violations.start()
         self.regex_timeout = 10.0  # seconds
+        # guild id -> (regex source, compiled pattern)
+        self.regex_cache: dict[int, tuple[str, re.Pattern]] = {}
 
     def format_help_for_context(self, ctx: commands.Context):
         helpcmd = super().format_help_for_context(ctx)
@@ -70,6 +81,7 @@ class MediaMonitor(
 
     async def cog_unload(self) -> None:
         self.expire_violations_task.cancel()
+        await self.storage.close()
         self.re_pool.close()
         loop = asyncio.get_running_loop()
         loop.run_in_executor(None, self.re_pool.join)
@@ -79,19 +91,13 @@ class MediaMonitor(
         data = await self.config.db()
         Base.cog = self
         self.db = await asyncio.to_thread(DB.model_validate, data)
+        await asyncio.to_thread(self.expiry_index.build, self.db)
+        self.expiry_index.wakeup.set()
         log.info("Config loaded")
 
-    def save(self):
-        async def _save():
-            if self.saving:
-                return
-            try:
-                self.saving = True
-                dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-                await self.config.db.set(dump)
-            except Exception as e:
-                log.exception("Failed to save config", exc_info=e)
-            finally:
-                self.saving = False
-
-        return asyncio.create_task(_save())
+    def save(self, guild_id: t.Optional[int] = None) -> asyncio.Task[None]:
+        """Mark `guild_id` (or the whole DB when None) as dirty.
+
+        Writes are debounced and coalesced by `GuildStorage`, the returned task
+        completes once the pending flush has been written."""
+        return self.storage.mark_dirty(guild_id)
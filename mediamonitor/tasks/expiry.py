@@ -1,8 +1,8 @@
-import datetime
+import asyncio
 import logging
+import time
 import typing
 
-import discord
 from discord.ext import tasks
 
 from ..abc import MixinMeta
@@ -12,58 +12,62 @@ if typing.TYPE_CHECKING:
 
 log = logging.getLogger("red.mediamonitor.expiry")
 
+UNAVAILABLE_RETRY = 60  # seconds before expiring violations of an unavailable guild is retried
+
 
 class ExpireViolations(MixinMeta):
     """Task loop to expire user violations after a set duration."""
 
-    @tasks.loop(minutes=30)
+    @tasks.loop()
     async def expire_violations(self):
-        """Loop to expire user violations after a set duration."""
+        """Loop to expire user violations after a set duration.
+
+        Each iteration only pops the violations that are due from the expiry index,
+        then sleeps until the next one is due or until the index is woken up
+        because a violation was added or an expiration duration changed."""
         log.debug("Running expire_violations task loop.")
-        for guild_id, guild_conf in self.db.configs.items():
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                log.debug(f"Guild with ID {guild_id} not found, skipping expiry check.")
-                continue
+        index = self.expiry_index
+        index.wakeup.clear()
+        now = time.time()
+        next_due: typing.Optional[float] = None
 
+        for guild_id, guild_conf in self.db.configs.items():
             if guild_conf.violation_expiration_seconds == 0:
-                log.debug(
-                    f"Guild {guild_id} has violation expiration disabled, skipping."
-                )
                 continue
 
-            now_dt = discord.utils.utcnow()
-
-            to_remove: dict[int, list[str]] = {}
-
-            for user_id, user_data in guild_conf.members.items():
-                expired_violations = list[str]()
-                for violation, data in user_data.violations.items():
-                    expiry = datetime.timedelta(
-                        seconds=data.timestamp + guild_conf.violation_expiration_seconds
-                    )
-                    expiration_dt = (
-                        datetime.datetime.fromtimestamp(
-                            data.timestamp, tz=datetime.timezone.utc
-                        )
-                        + expiry
-                    )
-                    if now_dt >= expiration_dt:
-                        expired_violations.append(violation)
+            expiry = index.next_expiry(
+                guild_id, guild_conf.violation_expiration_seconds
+            )
+            if not self.bot.get_guild(guild_id):
+                log.debug(f"Guild with ID {guild_id} not found, skipping expiry check.")
+                if expiry is not None:
+                    # the guild may only be unavailable for now, check it again later
+                    expiry = max(expiry, now + UNAVAILABLE_RETRY)
+                    if next_due is None or expiry < next_due:
+                        next_due = expiry
+                continue
 
-                if expired_violations:
-                    log.debug(
-                        f"Expired violations for user {user_id}: {expired_violations}"
-                    )
-                    to_remove[user_id] = expired_violations
+            to_remove = index.pop_due(guild_id, guild_conf, now)
+            if to_remove:
+                log.debug(f"Expired violations in guild {guild_id}: {to_remove}")
+                async with guild_conf:
+                    for user_id, violations in to_remove.items():
+                        user_data = guild_conf.get_member(user_id)
+                        for violation in violations:
+                            user_data.violations.pop(violation, None)
 
-            async with guild_conf:
-                for user_id, violations in to_remove.items():
-                    user_data = guild_conf.get_member(user_id)
-                    for violation in violations:
-                        user_data.violations.pop(violation, None)
+            expiry = index.next_expiry(
+                guild_id, guild_conf.violation_expiration_seconds
+            )
+            if expiry is not None and (next_due is None or expiry < next_due):
+                next_due = expiry
 
-        log.debug("Completed expire_violations task loop.")
+        timeout = None if next_due is None else max(next_due - time.time(), 0)
+        log.debug(f"Completed expire_violations task loop, next run in {timeout}s.")
+        try:
+            await asyncio.wait_for(index.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
     @expire_violations.before_loop
     async def before_expire_violations(self):
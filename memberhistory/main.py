@@ -1,18 +1,18 @@
+import asyncio
 import datetime
 import io
 import operator
-import shutil
 import urllib.parse
 import discord
 from redbot.core.bot import Red
 from redbot.core import commands, Config
 from redbot.core.utils import chat_formatting as cf
-import pathlib
 from redbot.core.data_manager import cog_data_path
 import aiofiles
 import typing
 import urllib
 import logging
+from .store import AssetRecord, AssetStore
 from .views import Paginator
 from redbot.vendored.discord.ext import menus
 from redbot.core.utils.views import ConfirmView
@@ -46,13 +46,8 @@ class PageSource(menus.PageSource):
         super().__init__()
 
     async def prepare(self):
-        self.avs = self.cog.path_util.get_all_user_x(
-            self.user.guild, self.user, self.attr
-        )
-        self.avs.sort(
-            key=lambda x: datetime.datetime.fromtimestamp(
-                int(x.stem.split("_")[0]), tz=datetime.timezone.utc
-            ),
+        self.avs = await asyncio.to_thread(
+            self.cog.store.get_user_assets, self.user.guild.id, self.user.id, self.attr
         )
 
     async def get_page(self, page_number: int):
@@ -65,7 +60,7 @@ class PageSource(menus.PageSource):
     async def format_page(
         self,
         menu: Paginator,
-        page: typing.Optional[pathlib.Path],
+        page: typing.Optional[AssetRecord],
     ):
         if self.get_max_pages() > 0 and not page:
             return f"This page does not exist. Please scroll back to a page between 1 and {self.get_max_pages()}"
@@ -95,9 +90,9 @@ class PageSource(menus.PageSource):
             else:
                 embed.description += " and no current one found."
             return embed
-        filename = f"{self.attr_qname[self.attr].replace(' ', '_')}_{menu.current_page}{page.suffix}"
-        timestamp = int(page.stem.split("_")[0])
-        async with aiofiles.open(page, "rb") as f:
+        filename = f"{self.attr_qname[self.attr].replace(' ', '_')}_{menu.current_page}{page.ext}"
+        timestamp = page.timestamp
+        async with aiofiles.open(page.path, "rb") as f:
             f = discord.File(io.BytesIO(await f.read()), filename=filename)
         embed = discord.Embed(
             title=f"Past {self.attr_qname[self.attr]}s of {self.user.display_name}",
@@ -110,104 +105,6 @@ class PageSource(menus.PageSource):
         return {"file": f, "embed": embed, "content": None}
 
 
-class PathUtil:
-    _global = ["avatar_global", "avatar_deco"]
-
-    def __init__(self, cog: "MemberHistory"):
-        self.cog = cog
-        self.base = cog_data_path(cog) / "history"
-
-    def get_total_size(self, path: pathlib.Path):
-        return sum(f.stat().st_size for f in path.glob("**/*") if f.is_file())
-
-    def get_global(self):
-        return self.base / "global"
-
-    def get_guild(self, guild: typing.Union[discord.Guild, int]):
-        if isinstance(guild, discord.Guild):
-            guild = guild.id
-        path = self.base / str(guild)
-
-        path.mkdir(parents=True, exist_ok=True)
-        return path
-
-    def get_user(
-        self,
-        guild: typing.Union[discord.Guild, int],
-        user: typing.Union[discord.Member, discord.User, int],
-        attr: typing.Optional[
-            typing.Literal["avatar_global", "avatar_guild", "avatar_deco", "banner"]
-        ] = None,
-    ):
-        if isinstance(user, (discord.User, discord.Member)):
-            user = user.id
-        path = self.get_guild(guild) if attr not in self._global else self.get_global()
-        if attr:
-            path = path / attr / str(user)
-        path.mkdir(parents=True, exist_ok=True)
-        return path
-
-    def get_all_user_x(
-        self,
-        guild: typing.Union[discord.Guild, int],
-        user: typing.Union[discord.Member, discord.User, int],
-        attr: typing.Literal["avatar_global", "avatar_guild", "banner", "avatar_deco"],
-    ):
-        user_data = self.get_user(guild, user, attr)
-        return [*filter(lambda x: x.is_file(), user_data.iterdir())]
-
-    def get_all_files_stored(self):
-        return [*self.base.glob("**/*.[!json]*")]
-
-    def get_all_files_stored_guild(self, guild: typing.Union[discord.Guild, int]):
-        return [*self.get_guild(guild).glob("**/*.[!json]*")]
-
-    def delete_all_files(
-        self,
-        user: typing.Optional[typing.Union[discord.Member, discord.User, int]] = None,
-    ):
-        if not user:
-            return shutil.rmtree(self.base)
-
-        if isinstance(user, (discord.User, discord.Member)):
-            user = user.id
-
-        files = self.get_user_all_files(user)
-        common_parents = set(map(lambda x: x.parent, files))
-        # all the parents will be dirs with their children being the files so it's safe to delete them
-        for parent in common_parents:
-            if parent.is_dir() and parent.name == str(user):  # just being cautious
-                shutil.rmtree(parent)
-
-    def get_user_all_files(self, user: typing.Union[discord.Member, discord.User, int]):
-        return [*self.base.glob(f"**/{getattr(user, 'id', user)}/*")]
-
-    def get_all_users_folder(
-        self, guild: typing.Optional[typing.Union[discord.Guild, int]] = None
-    ):
-        if not guild:
-            all_files = self.get_all_files_stored()
-            return [*{*map(lambda x: x.parent, all_files)}]
-
-        if isinstance(guild, discord.Guild):
-            guild = guild.id
-
-        all_guild_files = self.get_all_files_stored_guild(guild)
-        return [*{*map(lambda x: x.parent, all_guild_files)}]
-
-    def get_file_from_hash(
-        self,
-        guild: typing.Union[discord.Guild, int],
-        user: typing.Union[discord.Member, discord.User],
-        hash: str,
-        attr: typing.Optional[
-            typing.Literal["avatar_global", "avatar_guild", "avatar_deco", "banner"]
-        ] = None,
-    ):
-        p = self.get_user(guild, user, attr)
-        return next(p.rglob(f"*_{hash}.*"), None)
-
-
 TIMEDELTA_CONV = commands.get_timedelta_converter(minimum=datetime.timedelta(days=1))
 
 
@@ -221,11 +118,36 @@ class MemberHistory(commands.Cog):
         self.config.register_global(
             ttl=datetime.timedelta(days=30).total_seconds(), ignorelist=[]
         )
-        self.path_util = PathUtil(self)
+        self.store: AssetStore
+        # snapshots of the toggles and ignore lists so presence events never await config
+        self.enabled_guilds: set[int] = set()
+        self.global_ignorelist: set[int] = set()
+        self.guild_ignorelists: dict[int, set[int]] = {}
         self.cleanup_task = self.cleanup.start()
 
+    async def cog_load(self):
+        # opening the index may upgrade it and backfill usage totals, keep that off the loop
+        self.store = await asyncio.to_thread(
+            AssetStore, cog_data_path(self) / "history"
+        )
+        await asyncio.to_thread(self.store.migrate_legacy)
+        await self.build_cache()
+
+    async def build_cache(self):
+        all_guilds = await self.config.all_guilds()
+        self.enabled_guilds = {
+            guild_id for guild_id, data in all_guilds.items() if data["toggle"]
+        }
+        self.guild_ignorelists = {
+            guild_id: set(data["ignorelist"])
+            for guild_id, data in all_guilds.items()
+            if data["ignorelist"]
+        }
+        self.global_ignorelist = set(await self.config.ignorelist())
+
     def cog_unload(self):
         self.cleanup_task.cancel()
+        self.store.close()
 
     @typing.overload
     def get_user_or_role(
@@ -263,17 +185,21 @@ class MemberHistory(commands.Cog):
         file: discord.Asset,
         attr: typing.Literal["avatar_global", "avatar_guild", "banner", "avatar_deco"],
     ):
-        if sim_path := self.path_util.get_file_from_hash(guild, user, file.key, attr):
+        guild_id = getattr(guild, "id", guild)
+        timestamp = int(datetime.datetime.now().timestamp())
+        if digest := await asyncio.to_thread(self.store.digest_for_key, file.key):
             log.debug(
-                "A file of %s with a similar hash key (%s) already exists for %s in %s at %s",
+                "%s %s of %s is already stored as %s, not downloading it again",
                 attr,
                 file.key,
                 user.display_name,
-                guild,
-                sim_path,
+                digest,
             )
-        path = self.path_util.get_user(guild, user, attr)
-        filename = f"{int(datetime.datetime.now().timestamp())}_{file.key.replace('_', '')}{urllib.parse.urlparse(file.url).path[-4:]}"
+            await asyncio.to_thread(
+                self.store.add_record, guild_id, user.id, attr, timestamp, digest
+            )
+            return
+
         try:
             binary = await file.read()
 
@@ -288,62 +214,49 @@ class MemberHistory(commands.Cog):
             )
             return
 
-        else:
-            try:
-                async with aiofiles.open(path / filename, "wb") as f:
-                    await f.write(binary)
-
-            except Exception as e:
-                log.exception(
-                    "Failed to save %s for %s in %s due to %s",
-                    attr,
-                    user.display_name,
-                    guild,
-                    e.__class__.__name__,
-                    exc_info=e,
-                )
-                (path / filename).unlink()
-                return
+        ext = urllib.parse.urlparse(file.url).path[-4:]
+        try:
+            digest = await asyncio.to_thread(self.store.add_blob, binary, ext)
+            await asyncio.to_thread(
+                self.store.add_record,
+                guild_id,
+                user.id,
+                attr,
+                timestamp,
+                digest,
+                file.key,
+            )
 
-            log.debug(
-                "Saved %s for %s in %s at %s",
+        except Exception as e:
+            log.exception(
+                "Failed to save %s for %s in %s due to %s",
                 attr,
                 user.display_name,
                 guild,
-                path / filename,
+                e.__class__.__name__,
+                exc_info=e,
             )
+            return
+
+        log.debug(
+            "Saved %s for %s in %s as %s",
+            attr,
+            user.display_name,
+            guild,
+            digest,
+        )
 
     @tasks.loop(
         time=datetime.time(hour=0, minute=0, second=0, tzinfo=datetime.timezone.utc)
     )
     async def cleanup(self):
         log.debug("Running cleanup task.")
-        all_files = self.path_util.get_all_files_stored()
-        file_timestamps = map(
-            lambda x: (
-                x,
-                datetime.datetime.fromtimestamp(
-                    int(x.stem.split("_")[0]), tz=datetime.timezone.utc
-                ),
-            ),
-            all_files,
-        )
-        ttl = datetime.timedelta(seconds=await self.config.ttl())
-        now = datetime.datetime.now(datetime.timezone.utc)
-        filtered = filter(lambda x: (now - x[1]) >= ttl, file_timestamps)
-        index = 0
-        for index, (file, timestamp) in enumerate(filtered, 1):
-            file.unlink()
-            log.debug("Deleted %s because it was older than the set TTL.", file)
-            log.debug(
-                "Created at: %s, Now: %s, Difference: %s",
-                timestamp,
-                now,
-                now - timestamp,
-            )
+        ttl = await self.config.ttl()
+        cutoff = int(datetime.datetime.now(datetime.timezone.utc).timestamp() - ttl)
+        deleted = await asyncio.to_thread(self.store.delete_older_than, cutoff)
 
-        if index != 0:
-            log.debug("Deleted %s files.", index)
+        if deleted:
+            log.debug("Deleted %s records older than the set TTL.", deleted)
 
         else:
             log.debug("No files to delete.")
@@ -353,31 +266,24 @@ class MemberHistory(commands.Cog):
         if before.bot:
             return
 
-        ignorelist = await self.config.ignorelist()
-
-        if before.id in ignorelist:
+        if before.id in self.global_ignorelist:
             log.debug(f"User {before.display_name} is in the ignore list.")
             return
 
-        log.debug(f"User update detected for {before}")
-        mutual = after.mutual_guilds
-        if not mutual:
-            log.debug(f"No mutual guilds found for {before}")
-            return
-        mutuals_ids: list[int] = [*map(operator.attrgetter("id"), mutual)]
-        all_guilds = await self.config.all_guilds()
         gid = next(
-            filter(
-                lambda x: x in all_guilds
-                and all_guilds.get(x, {}).get("toggle", False),
-                mutuals_ids,
+            (
+                guild_id
+                for guild_id in self.enabled_guilds
+                if (guild := self.bot.get_guild(guild_id))
+                and guild.get_member(before.id)
             ),
             None,
         )
         if not gid:
-            log.debug(f"No guilds with member history enabled found for {before}")
             return
 
+        log.debug(f"User update detected for {before}")
+
         if before.avatar_decoration != after.avatar_decoration:
             log.debug(
                 f"Avatar decoration changed for {before}\n%s\n%s",
@@ -409,22 +315,15 @@ class MemberHistory(commands.Cog):
         if before.bot:
             return
 
-        if not await self.config.guild(before.guild).toggle():
+        if before.guild.id not in self.enabled_guilds:
             return
 
-        ignorelist = (
-            await self.config.guild(before.guild).ignorelist()
-            + await self.config.ignorelist()
-        )
-
-        if before.id in ignorelist:
+        guild_ignorelist = self.guild_ignorelists.get(before.guild.id, set())
+        if before.id in self.global_ignorelist or before.id in guild_ignorelist:
             log.debug(f"Member {before.display_name} is in the ignore list.")
             return
 
-        if any(
-            after.get_role(role)
-            for role in await self.config.guild(before.guild).ignorelist()
-        ):
+        if guild_ignorelist and any(after.get_role(role) for role in guild_ignorelist):
             log.debug(
                 f"Member {before.display_name} has a role that is in the ignore list."
             )
@@ -462,6 +361,10 @@ class MemberHistory(commands.Cog):
         Toggle the current state of member history."""
         toggle = await self.config.guild(ctx.guild).toggle()
         await self.config.guild(ctx.guild).toggle.set(not toggle)
+        if toggle:
+            self.enabled_guilds.discard(ctx.guild.id)
+        else:
+            self.enabled_guilds.add(ctx.guild.id)
         await ctx.send(
             f"Member history is now {not toggle and 'enabled' or 'disabled'}. This means that the bot will no{not toggle and 'w' or 't'} store server member avatars and banners when they change."
         )
@@ -498,7 +401,7 @@ class MemberHistory(commands.Cog):
 
         if not view.result:
             return await ctx.send("Operation cancelled.")
-        self.path_util.delete_all_files()
+        await asyncio.to_thread(self.store.delete_all)
         await ctx.send("All stored files have been purged.")
 
     @memberhistory.command(name="purgeuser")
@@ -520,7 +423,7 @@ class MemberHistory(commands.Cog):
             return await ctx.send(
                 "Operation cancelled.", allowed_mentions=discord.AllowedMentions.none()
             )
-        self.path_util.delete_all_files(user)
+        await asyncio.to_thread(self.store.delete_user, user.id)
         await ctx.send(f"All stored files for {user.mention} have been purged.")
 
     @memberhistory.group()
@@ -583,6 +486,7 @@ class MemberHistory(commands.Cog):
             if user_or_role.id in ignorelist:
                 return await ctx.send("User or role is already in the ignore list.")
             ignorelist.append(user_or_role.id)
+        self.guild_ignorelists.setdefault(ctx.guild.id, set()).add(user_or_role.id)
         await ctx.send(f"Added {user_or_role.name} to the ignore list.")
 
     @ignore.command(name="globally", aliases=["global"])
@@ -595,6 +499,7 @@ class MemberHistory(commands.Cog):
             if user.id in ignorelist:
                 return await ctx.send("User is already in the ignore list.")
             ignorelist.append(user.id)
+        self.global_ignorelist.add(user.id)
         await ctx.send(f"Added {user.name} to the global ignore list.")
 
     @memberhistory.group("unignore")
@@ -618,6 +523,7 @@ class MemberHistory(commands.Cog):
             if user_or_role.id not in ignorelist:
                 return await ctx.send("User or role is not in the ignore list.")
             ignorelist.remove(user_or_role.id)
+        self.guild_ignorelists.get(ctx.guild.id, set()).discard(user_or_role.id)
         await ctx.send(f"Removed {user_or_role.name} from the ignore list.")
 
     @unignore.command(name="globally", aliases=["global"])
@@ -630,6 +536,7 @@ class MemberHistory(commands.Cog):
             if user.id not in ignorelist:
                 return await ctx.send("User is not in the ignore list.")
             ignorelist.remove(user.id)
+        self.global_ignorelist.discard(user.id)
         await ctx.send(f"Removed {user.name} from the global ignore list.")
 
     @memberhistory.command(name="showsettings", aliases=["ss"])
@@ -638,10 +545,8 @@ class MemberHistory(commands.Cog):
         """
         See the configured settings and additional data about MemberHistory.
         """
-        total_files = self.path_util.get_all_files_stored()
-        all_files = self.path_util.get_all_files_stored_guild(ctx.guild)
-        total_guild = len(all_files)
-        total_all = len(total_files)
+        total_guild = await asyncio.to_thread(self.store.count, ctx.guild.id)
+        total_all = await asyncio.to_thread(self.store.count)
         is_owner = await self.bot.is_owner(ctx.author)
         conf = await self.config.guild(ctx.guild).all()
         embed = discord.Embed(
@@ -683,7 +588,7 @@ class MemberHistory(commands.Cog):
             value=(
                 "*This only includes the size of guild specific avatars and banners.*\n"
                 + self.format_storage(
-                    self.path_util.get_total_size(self.path_util.get_guild(ctx.guild))
+                    await asyncio.to_thread(self.store.get_total_size, ctx.guild.id)
                 )
             ),
             inline=False,
@@ -703,7 +608,7 @@ class MemberHistory(commands.Cog):
                 value=(
                     "*This includes the size of all stored files.*\n"
                     + self.format_storage(
-                        self.path_util.get_total_size(self.path_util.base)
+                        await asyncio.to_thread(self.store.get_total_size)
                     )
                 ),
             )
@@ -716,7 +621,7 @@ class MemberHistory(commands.Cog):
         """
         Get a list of all users with stored files.
         """
-        all_users = self.path_util.get_all_users_folder()
+        all_users = await asyncio.to_thread(self.store.get_users)
         if not all_users:
             return await ctx.send("No users with stored files found.")
 
@@ -726,14 +631,14 @@ class MemberHistory(commands.Cog):
         )
         color = await ctx.embed_color()
         format_page: typing.Callable[
-            [Paginator, typing.List[pathlib.Path]],
+            [Paginator, typing.List[typing.Tuple[int, int]]],
             typing.Coroutine[None, None, discord.Embed],
         ] = lambda menu, page: discord.utils.maybe_coroutine(
             lambda x: discord.Embed(
                 title="Users with stored files",
                 description="\n".join(
-                    f"- <@{x.name}> ({x.name})\n  - Total files stored: {len([*x.iterdir()])}"  # iterdir because the folder cannot have sub folders
-                    for i, x in enumerate(page)
+                    f"- <@{user_id}> ({user_id})\n  - Total files stored: {count}"
+                    for user_id, count in page
                 ),
                 color=color,
             ),
@@ -0,0 +1,358 @@
+import contextlib
+import dataclasses
+import hashlib
+import logging
+import pathlib
+import shutil
+import sqlite3
+import threading
+import typing
+
+log = logging.getLogger("red.bounty.MemberHistory.store")
+
+AttrType = typing.Literal["avatar_global", "avatar_guild", "banner", "avatar_deco"]
+
+GLOBAL_ATTRS = ("avatar_global", "avatar_deco")
+# records of global attributes aren't tied to the guild they were seen in
+GLOBAL_SCOPE = 0
+# usage row holding the size and count of the unique files actually on disk
+DISK_SCOPE = -1
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS asset_keys (
+    asset_key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    guild INTEGER NOT NULL,
+    user INTEGER NOT NULL,
+    attr TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild, user, attr, timestamp, digest)
+);
+CREATE INDEX IF NOT EXISTS records_user ON records (user);
+CREATE INDEX IF NOT EXISTS records_digest ON records (digest);
+CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp);
+CREATE TABLE IF NOT EXISTS usage (
+    scope INTEGER PRIMARY KEY,
+    files INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS asset_keys_digest ON asset_keys (digest);
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class AssetRecord:
+    guild: int
+    user: int
+    attr: str
+    timestamp: int
+    digest: str
+    ext: str
+    path: pathlib.Path
+
+
+class AssetStore:
+    """
+    Content addressed storage for member avatars, banners and decorations.
+
+    Every unique file is written once to `blobs/<digest[:2]>/<digest><ext>`. A sqlite
+    index maps `(guild, user, attr, timestamp)` to the digest of the file that was set
+    at that time, and discord asset keys to digests so an asset that was already
+    downloaded once is never fetched again.
+
+    The `usage` table keeps running file counts and sizes per guild (what its records
+    reference) and for the disk as a whole, so storage totals never touch the
+    filesystem, and the timestamp index lets the TTL cleanup visit only expired records.
+
+    All methods are blocking, the cog calls them through `asyncio.to_thread`.
+    """
+
+    def __init__(self, base: pathlib.Path):
+        self.base = base
+        self.blobs = base / "blobs"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(base / "index.sqlite3", check_same_thread=False)
+        with self._lock, self._db:
+            self._migrate_schema()
+
+    def _migrate_schema(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        tables = {
+            row[0]
+            for row in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        if "records" in tables:
+            # version 1 had no sizes on records and no usage table
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(records)")}
+            if "size" not in columns:
+                self._db.execute(
+                    "ALTER TABLE records ADD COLUMN size INTEGER NOT NULL DEFAULT 0"
+                )
+        self._db.executescript(SCHEMA)
+        self._db.execute(
+            "UPDATE records SET size = "
+            "(SELECT size FROM blobs WHERE blobs.digest = records.digest) "
+            "WHERE size = 0"
+        )
+        self._rebuild_usage()
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _rebuild_usage(self):
+        self._db.execute("DELETE FROM usage")
+        self._db.execute(
+            "INSERT INTO usage (scope, files, bytes) "
+            "SELECT guild, COUNT(*), COALESCE(SUM(size), 0) FROM records GROUP BY guild"
+        )
+        self._db.execute(
+            "INSERT INTO usage (scope, files, bytes) "
+            "SELECT ?, COUNT(*), COALESCE(SUM(size), 0) FROM blobs",
+            (DISK_SCOPE,),
+        )
+
+    def _add_usage(self, scope: int, files: int, size: int):
+        self._db.execute(
+            "INSERT INTO usage (scope, files, bytes) VALUES (?, ?, ?) "
+            "ON CONFLICT (scope) DO UPDATE SET "
+            "files = files + excluded.files, bytes = bytes + excluded.bytes",
+            (scope, files, size),
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def scope(guild_id: int, attr: str) -> int:
+        return GLOBAL_SCOPE if attr in GLOBAL_ATTRS else guild_id
+
+    def blob_path(self, digest: str, ext: str) -> pathlib.Path:
+        return self.blobs / digest[:2] / f"{digest}{ext}"
+
+    def _record(self, row: typing.Tuple[int, int, str, int, str, str]) -> AssetRecord:
+        guild, user, attr, timestamp, digest, ext = row
+        return AssetRecord(
+            guild, user, attr, timestamp, digest, ext, self.blob_path(digest, ext)
+        )
+
+    def digest_for_key(self, asset_key: str) -> typing.Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM asset_keys WHERE asset_key = ?", (asset_key,)
+            ).fetchone()
+        return row and row[0]
+
+    def add_blob(self, data: bytes, ext: str) -> str:
+        """Store `data` if no identical file exists yet and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            exists = self._db.execute(
+                "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+        if exists:
+            return digest
+
+        path = self.blob_path(digest, ext)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        with self._lock, self._db:
+            if self._db.execute(
+                "INSERT OR IGNORE INTO blobs (digest, ext, size) VALUES (?, ?, ?)",
+                (digest, ext, len(data)),
+            ).rowcount:
+                self._add_usage(DISK_SCOPE, 1, len(data))
+        return digest
+
+    def add_record(
+        self,
+        guild_id: int,
+        user_id: int,
+        attr: AttrType,
+        timestamp: int,
+        digest: str,
+        asset_key: typing.Optional[str] = None,
+    ):
+        with self._lock, self._db:
+            if asset_key:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO asset_keys (asset_key, digest) VALUES (?, ?)",
+                    (asset_key, digest),
+                )
+            row = self._db.execute(
+                "SELECT size FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            size = row[0] if row else 0
+            scope = self.scope(guild_id, attr)
+            if self._db.execute(
+                "INSERT OR IGNORE INTO records (guild, user, attr, timestamp, digest, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (scope, user_id, attr, timestamp, digest, size),
+            ).rowcount:
+                self._add_usage(scope, 1, size)
+
+    def get_user_assets(
+        self, guild_id: int, user_id: int, attr: AttrType
+    ) -> typing.List[AssetRecord]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.guild, r.user, r.attr, r.timestamp, r.digest, b.ext "
+                "FROM records r JOIN blobs b ON b.digest = r.digest "
+                "WHERE r.guild = ? AND r.user = ? AND r.attr = ? ORDER BY r.timestamp",
+                (self.scope(guild_id, attr), user_id, attr),
+            ).fetchall()
+        return [*map(self._record, rows)]
+
+    def get_usage(self, guild_id: typing.Optional[int] = None) -> typing.Tuple[int, int]:
+        """
+        `(files, bytes)` referenced by a guild's records, or actually stored on disk.
+
+        Identical files are only stored once, so the disk total can be smaller than the
+        sum of every guild's usage.
+        """
+        scope = DISK_SCOPE if guild_id is None else guild_id
+        with self._lock:
+            row = self._db.execute(
+                "SELECT files, bytes FROM usage WHERE scope = ?", (scope,)
+            ).fetchone()
+        return row or (0, 0)
+
+    def count(self, guild_id: typing.Optional[int] = None) -> int:
+        if guild_id is not None:
+            return self.get_usage(guild_id)[0]
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(files), 0) FROM usage WHERE scope != ?",
+                (DISK_SCOPE,),
+            ).fetchone()
+        return row[0]
+
+    def get_users(self) -> typing.List[typing.Tuple[int, int]]:
+        """Every user with stored files along with how many records they have."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT user, COUNT(*) FROM records GROUP BY user ORDER BY user"
+            ).fetchall()
+
+    def get_total_size(self, guild_id: typing.Optional[int] = None) -> int:
+        """Size of the files referenced by a guild's records, or of every stored file."""
+        return self.get_usage(guild_id)[1]
+
+    def _release_unreferenced(self, digests: typing.Iterable[str]) -> int:
+        """Delete the blobs of `digests` that no record points to anymore."""
+        removed = 0
+        for digest in set(digests):
+            with self._lock, self._db:
+                if self._db.execute(
+                    "SELECT 1 FROM records WHERE digest = ? LIMIT 1", (digest,)
+                ).fetchone():
+                    continue
+                row = self._db.execute(
+                    "SELECT ext, size FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone()
+                if not row:
+                    continue
+                self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self._db.execute("DELETE FROM asset_keys WHERE digest = ?", (digest,))
+                self._add_usage(DISK_SCOPE, -1, -row[1])
+            self.blob_path(digest, row[0]).unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def _delete_records(self, where: str, params: tuple) -> int:
+        """Delete the matching records, keep the usage totals in sync and drop orphaned blobs."""
+        with self._lock, self._db:
+            rows = self._db.execute(
+                f"SELECT guild, digest, size FROM records WHERE {where}", params
+            ).fetchall()
+            if not rows:
+                return 0
+            self._db.execute(f"DELETE FROM records WHERE {where}", params)
+            freed: dict[int, list[int]] = {}
+            for guild, _, size in rows:
+                totals = freed.setdefault(guild, [0, 0])
+                totals[0] -= 1
+                totals[1] -= size
+            for guild, (files, size) in freed.items():
+                self._add_usage(guild, files, size)
+        self._release_unreferenced(digest for _, digest, _ in rows)
+        return len(rows)
+
+    def delete_older_than(self, cutoff: int) -> int:
+        """Delete every record created before `cutoff` and the blobs only they used.
+
+        This goes through the timestamp index, so only the expired records are visited."""
+        return self._delete_records("timestamp < ?", (cutoff,))
+
+    def delete_user(self, user_id: int) -> int:
+        return self._delete_records("user = ?", (user_id,))
+
+    def delete_all(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM records")
+            self._db.execute("DELETE FROM asset_keys")
+            self._db.execute("DELETE FROM blobs")
+            self._db.execute("DELETE FROM usage")
+        shutil.rmtree(self.blobs, ignore_errors=True)
+        self.blobs.mkdir(parents=True, exist_ok=True)
+
+    def migrate_legacy(self) -> int:
+        """
+        Import files from the old `<guild|global>/<attr>/<user>/<timestamp>_<key><ext>` layout.
+
+        Each file is moved into the blob store (or dropped if an identical blob exists)
+        and the emptied folders are removed. Files that can't be migrated are left where
+        they are, along with the folders holding them.
+        """
+        migrated = 0
+        legacy_roots = [
+            path
+            for path in self.base.iterdir()
+            if path.is_dir() and (path.name == "global" or path.name.isdigit())
+        ]
+        for root in legacy_roots:
+            guild_id = GLOBAL_SCOPE if root.name == "global" else int(root.name)
+            for file in root.glob("*/*/*"):
+                if not file.is_file():
+                    continue
+                attr, user = file.parent.parent.name, file.parent.name
+                timestamp, _, key = file.stem.partition("_")
+                try:
+                    digest = self.add_blob(file.read_bytes(), file.suffix)
+                    self.add_record(
+                        guild_id, int(user), attr, int(timestamp), digest, key or None
+                    )
+                except (OSError, ValueError, sqlite3.Error) as e:
+                    log.warning("Could not migrate %s: %s", file, e)
+                    continue
+                file.unlink()
+                migrated += 1
+            # deepest folders first, so a folder is only removed once its children are gone
+            for folder in sorted(
+                (path for path in root.rglob("*") if path.is_dir()),
+                key=lambda path: len(path.parts),
+                reverse=True,
+            ):
+                with contextlib.suppress(OSError):
+                    folder.rmdir()
+            with contextlib.suppress(OSError):
+                root.rmdir()
+
+        if migrated:
+            log.info("Migrated %s member history files to the blob store.", migrated)
+        return migrated
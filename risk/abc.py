@@ -1,12 +1,14 @@
 from abc import ABC, ABCMeta, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from discord.ext.commands.cog import CogMeta
 
 if TYPE_CHECKING:
     from redbot.core.bot import Red
 
+    from .common.map_generator import RiskMapGenerator
     from .common.models import DB
+    from .common.storage import GuildStorage
     from .views.riskviews.game import GameView
 
 
@@ -20,8 +22,10 @@ class MixinMeta(ABC):
     def __init__(self, *_args):
         self.bot: Red
         self.db: DB
+        self.storage: GuildStorage
         self.cache: dict[int, GameView]
+        self.map_generator: Optional[RiskMapGenerator]
 
     @abstractmethod
-    def save(self) -> None:
+    def save(self, guild_id: Optional[int] = None) -> None:
         pass
@@ -44,7 +44,7 @@ class User(MixinMeta):
 
             view.update_acc_to_state()
 
-            file = await state.generate_risk_board_image(ctx)
+            file = await view.renderer.render()
             view.message = await ctx.send(
                 content=f"{state.turn_player.mention} it's your turn",
                 file=file,
@@ -71,6 +71,15 @@ class User(MixinMeta):
         else:
             await ctx.send("No game in progress.")
 
+    @risk.command(name="renderstats")
+    async def risk_renderstats(self, ctx: commands.Context):
+        """See how the board of the game in this channel has been rendered."""
+        if ctx.channel.id not in self.cache:
+            await ctx.send("No game in progress.")
+            return
+
+        await ctx.send(self.cache[ctx.channel.id].renderer.format_stats())
+
     @risk.command(name="endgame")
     async def risk_endgame(self, ctx: commands.Context):
         """End the game."""
@@ -0,0 +1,101 @@
+import dataclasses
+import itertools
+import random
+import typing
+from collections import Counter
+from fractions import Fraction
+
+
+def _round_outcomes(
+    attacker_dice: int, defender_dice: int
+) -> tuple[tuple[tuple[int, int], ...], tuple[float, ...]]:
+    """Every `(attacker_lost, defender_lost)` result of one roll and its probability."""
+    counts = Counter[tuple[int, int]]()
+    for roll in itertools.product(range(1, 7), repeat=attacker_dice + defender_dice):
+        attacker_rolls = sorted(roll[:attacker_dice], reverse=True)
+        defender_rolls = sorted(roll[attacker_dice:], reverse=True)
+        alost = dlost = 0
+        for aroll, droll in zip(attacker_rolls, defender_rolls):
+            if aroll > droll:
+                dlost += 1
+            else:
+                alost += 1
+        counts[alost, dlost] += 1
+
+    total = 6 ** (attacker_dice + defender_dice)
+    outcomes = tuple(sorted(counts))
+    return outcomes, tuple(float(Fraction(counts[o], total)) for o in outcomes)
+
+
+# the odds of a single roll only depend on the number of dice, so they are enumerated once
+ROUND_OUTCOMES = {
+    (adice, ddice): _round_outcomes(adice, ddice)
+    for adice in range(1, 4)
+    for ddice in range(1, 3)
+}
+
+
+def dice_for(attackers: int, defenders: int) -> tuple[int, int]:
+    """The most dice each side can roll, one army always has to stay behind to attack."""
+    return min(3, attackers - 1), min(2, defenders)
+
+
+@dataclasses.dataclass
+class BlitzResult:
+    attackers_left: int
+    defenders_left: int
+    attacker_lost: int
+    defender_lost: int
+    rounds: int
+
+    @property
+    def captured(self) -> bool:
+        return self.defenders_left == 0
+
+
+def blitz(
+    attackers: int,
+    defenders: int,
+    *,
+    stop_at: int = 1,
+    rng: typing.Optional[random.Random] = None,
+) -> BlitzResult:
+    """Roll with the most dice on both sides until the defender is wiped out or the
+    attacking territory drops to `stop_at` armies.
+
+    Each round is a single weighted draw from `ROUND_OUTCOMES` rather than a roll per die."""
+    stop_at = max(stop_at, 1)
+    choices = (rng or random).choices
+    a, d = attackers, defenders
+    rounds = 0
+    while d > 0 and a > stop_at:
+        outcomes, weights = ROUND_OUTCOMES[dice_for(a, d)]
+        alost, dlost = choices(outcomes, weights)[0]
+        a -= alost
+        d -= dlost
+        rounds += 1
+    return BlitzResult(a, d, attackers - a, defenders - d, rounds)
+
+
+def win_probability(attackers: int, defenders: int, *, stop_at: int = 1) -> float:
+    """The exact chance that `blitz` with the same arguments captures the territory."""
+    stop_at = max(stop_at, 1)
+    if defenders <= 0:
+        return 1.0
+    if attackers <= stop_at:
+        return 0.0
+
+    # chance[a][d] is the chance of capturing with a attackers left against d defenders
+    chance: list[list[float]] = [[0.0] * (defenders + 1) for _ in range(attackers + 1)]
+    for a in range(attackers + 1):
+        chance[a][0] = 1.0
+        if a <= stop_at:
+            continue
+        for d in range(1, defenders + 1):
+            outcomes, weights = ROUND_OUTCOMES[dice_for(a, d)]
+            chance[a][d] = sum(
+                weight * chance[max(a - alost, 0)][d - dlost]
+                for (alost, dlost), weight in zip(outcomes, weights)
+            )
+    return chance[attackers][defenders]
+
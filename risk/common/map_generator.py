@@ -1,10 +1,87 @@
+import hashlib
 import io
+import logging
 import pathlib
+import typing
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+log = logging.getLogger("red.craycogs.risk.map_generator")
 
 
 class RiskMapGenerator:
+    """Renders the RISK board from a base image decoded once.
+
+    Every territory's flood fill region is computed when the generator is created
+    and stored in a single label image, where each pixel holds the index of the
+    territory it belongs to (0 for none). Coloring the board is then a palette lookup
+    on that image and one paste onto the base layer, instead of a flood fill per territory.
+    """
+
+    FILL_THRESHOLD = 30
+
+    def __init__(
+        self,
+        base: Image.Image,
+        labels: Image.Image,
+        territory_indexes: dict[tuple[int, int], int],
+    ):
+        self.base = base
+        self.labels = labels
+        self.territory_indexes = territory_indexes
+        self.region_mask = labels.point(lambda v: 255 if v else 0, mode="L")
+        self.font = ImageFont.load_default(size=50)
+        self._text_sizes: dict[str, tuple[int, int]] = {}
+
+    @classmethod
+    def load(
+        cls,
+        clear_image_path: pathlib.Path,
+        territory_coords: typing.Iterable[tuple[int, int]],
+        cache_dir: typing.Optional[pathlib.Path] = None,
+    ) -> "RiskMapGenerator":
+        """Decode the base image and precompute every territory's region. This is blocking.
+
+        Computing the regions takes a flood fill per territory, so the label image is
+        saved in `cache_dir` and reused as long as the base image and coordinates match."""
+        territory_coords = list(territory_coords)
+        territory_indexes = {
+            coords: index for index, coords in enumerate(territory_coords, start=1)
+        }
+        with Image.open(clear_image_path) as image:
+            base = image.convert("RGBA")
+
+        cache_file = None
+        if cache_dir is not None:
+            key = hashlib.sha1(clear_image_path.read_bytes())
+            key.update(repr(territory_coords).encode())
+            cache_file = cache_dir / f"risk_labels_{key.hexdigest()[:16]}.png"
+            if cache_file.exists():
+                try:
+                    with Image.open(cache_file) as cached:
+                        labels = cached.convert("L")
+                except OSError:
+                    log.warning("Failed to read cached territory labels, rebuilding.")
+                else:
+                    if labels.size == base.size:
+                        return cls(base, labels, territory_indexes)
+
+        labels = Image.new("L", base.size, 0)
+        for coords, index in territory_indexes.items():
+            filled = base.copy()
+            ImageDraw.floodfill(
+                filled, coords, (0, 0, 0, 0), thresh=cls.FILL_THRESHOLD
+            )
+            # the pixels changed by the fill are exactly the territory's region
+            mask = ImageChops.difference(filled, base).convert("L")
+            labels.paste(index, mask=mask.point(lambda v: 255 if v else 0))
+
+        if cache_file is not None:
+            for old in cache_dir.glob("risk_labels_*.png"):
+                old.unlink(missing_ok=True)
+            labels.save(cache_file, format="PNG")
+        return cls(base, labels, territory_indexes)
+
     @staticmethod
     def get_text_color(background_color: tuple[int, int, int, int]):
         """Returns black or white text color based on the brightness of the background."""
@@ -12,35 +89,43 @@ class RiskMapGenerator:
         brightness = (r * 299 + g * 587 + b * 114) / 1000
         return (0, 0, 0) if brightness > 128 else (255, 255, 255)
 
-    @staticmethod
+    def get_text_size(self, draw: ImageDraw.ImageDraw, text: str) -> tuple[int, int]:
+        if (size := self._text_sizes.get(text)) is None:
+            left, top, right, bottom = draw.textbbox((0, 0), text, font=self.font)
+            size = self._text_sizes[text] = (right - left, bottom - top)
+        return size
+
     def color_territories(
-        clear_image_path: pathlib.Path,
+        self,
         territory_colors: dict[tuple[int, int], tuple[int, int, int, int]],
         territory_armies: dict[tuple[int, int], str],
     ):
         """Colors the given territories on the RISK map and overlays army counts with contrast-aware text."""
-        image = Image.open(clear_image_path).convert("RGBA")
-        draw = ImageDraw.Draw(image)
-        font = ImageFont.load_default(size=50)
-
+        palette = [0] * 768
         for coords, color in territory_colors.items():
-            ImageDraw.floodfill(image, coords, (*color[:3], 255), thresh=30)
+            index = self.territory_indexes[coords]
+            palette[index * 3 : index * 3 + 3] = color[:3]
+
+        colored = self.labels.copy()
+        colored.putpalette(palette)
+        image = self.base.copy()
+        image.paste(colored.convert("RGB"), mask=self.region_mask)
+        draw = ImageDraw.Draw(image)
 
         # Overlay army counts
         for (x, y), armies in territory_armies.items():
-            text = armies
-            text_size = draw.textbbox((0, 0), text, font=font)
-            text_x, text_y = text_size[2] - text_size[0], text_size[3] - text_size[1]
+            text_x, text_y = self.get_text_size(draw, armies)
 
             adjusted_x = x - text_x // 2
             adjusted_y = y - text_y // 2
 
-            background_color = image.getpixel((x, y))
-            text_color = RiskMapGenerator.get_text_color(background_color)
+            background_color = territory_colors.get((x, y)) or image.getpixel((x, y))
+            text_color = self.get_text_color(background_color)
 
-            draw.text((adjusted_x, adjusted_y), text, fill=text_color, font=font)
+            draw.text((adjusted_x, adjusted_y), armies, fill=text_color, font=self.font)
 
         file = io.BytesIO()
-        image.save(file, format="PNG")
+        # the board is large, favour encoding speed over file size
+        image.save(file, format="PNG", compress_level=1)
         file.seek(0)
         return file
@@ -15,11 +15,23 @@ class GuildSettings(Base):
     cog: typing.ClassVar[typing.Optional["Risk"]]
     saves: dict[int, RiskState] = pydantic.Field(default_factory=dict)
 
+    # set by `DB` so a save from `async with conf:` only writes this guild
+    _guild_id: typing.Optional[int] = pydantic.PrivateAttr(default=None)
+
+    def storage_key(self) -> typing.Optional[int]:
+        return self._guild_id
+
 
 class DB(Base):
     configs: dict[int, GuildSettings] = {}
     turn_phase_timeout: int = 60
 
+    def model_post_init(self, __context: typing.Any) -> None:
+        for gid, conf in self.configs.items():
+            conf._guild_id = gid
+
     def get_conf(self, guild: discord.Guild | int) -> GuildSettings:
         gid = guild if isinstance(guild, int) else guild.id
-        return self.configs.setdefault(gid, GuildSettings())
+        conf = self.configs.setdefault(gid, GuildSettings())
+        conf._guild_id = gid
+        return conf
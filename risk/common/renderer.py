@@ -0,0 +1,100 @@
+import asyncio
+import collections
+import io
+import logging
+import time
+import typing
+
+import discord
+
+if typing.TYPE_CHECKING:
+    from risk.views.riskviews.game import GameView
+
+log = logging.getLogger("red.craycogs.risk.renderer")
+
+
+class BoardRenderer:
+    """Coalesces board updates for a single game.
+
+    At most one board update runs at a time. Requests made while one is running
+    replace each other, so only the latest is shown once the current one finishes.
+    The last rendered PNG is kept and reused while the board state is unchanged."""
+
+    def __init__(self, view: "GameView"):
+        self.view = view
+        self._pending: typing.Optional[discord.Interaction] = None
+        self._task: typing.Optional[asyncio.Task[None]] = None
+        self._last: typing.Optional[tuple[tuple, bytes]] = None
+        self._shown_through: typing.Optional[discord.Interaction] = None
+
+        self.requests = 0
+        self.updates = 0
+        self.renders = 0
+        self.reused = 0
+        self.latencies: collections.deque[float] = collections.deque(maxlen=50)
+
+    def request(self, inter: discord.Interaction):
+        """Schedule a board update, answered through the latest requested interaction."""
+        self.requests += 1
+        self._pending = inter
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def clear_pending(self):
+        self._pending = None
+
+    async def _run(self):
+        while (inter := self._pending) is not None:
+            self._pending = None
+            try:
+                if inter is self._shown_through:
+                    # that interaction's response was already replaced by the board message
+                    await self._refresh_message()
+                else:
+                    await self.view.show_updated_board(inter)
+                    self._shown_through = inter
+            except Exception:
+                log.exception("Failed to update the board")
+            else:
+                self.updates += 1
+
+    async def _refresh_message(self):
+        self.view.update_acc_to_state()
+        if self._last is not None and self._last[0] == self._board_key():
+            await self.view.message.edit(view=self.view)
+        else:
+            file = await self.render()
+            await self.view.message.edit(attachments=[file], view=self.view)
+
+    def _board_key(self, layers=None) -> tuple:
+        layers = layers or self.view.state.board_layers()
+        return tuple(tuple(sorted(layer.items())) for layer in layers)
+
+    async def render(self) -> discord.File:
+        state = self.view.state
+        layers = state.board_layers()
+        key = self._board_key(layers)
+        if self._last is not None and self._last[0] == key:
+            self.reused += 1
+            data = self._last[1]
+        else:
+            start = time.perf_counter()
+            data = (await state.render_board(self.view.cog, layers)).getvalue()
+            self.latencies.append(time.perf_counter() - start)
+            self.renders += 1
+            self._last = (key, data)
+        return discord.File(io.BytesIO(data), filename="risk_board.png")
+
+    def format_stats(self) -> str:
+        latencies = self.latencies
+        lines = [
+            f"Board updates requested: {self.requests}",
+            f"Board updates shown: {self.updates} ({self.requests - self.updates} coalesced)",
+            f"Renders: {self.renders} (reused {self.reused} times)",
+        ]
+        if latencies:
+            lines.append(
+                f"Render time: avg {sum(latencies) / len(latencies) * 1000:.0f}ms, "
+                f"max {max(latencies) * 1000:.0f}ms (last {len(latencies)})"
+            )
+        return "\n".join(lines)
@@ -1,6 +1,7 @@
 import asyncio
 import enum
 import functools
+import io
 import itertools
 import random
 import typing
@@ -9,12 +10,15 @@ import discord
 import pydantic
 from redbot.core import commands
 from redbot.core.bot import Red
-from redbot.core.data_manager import bundled_data_path
+from redbot.core.data_manager import bundled_data_path, cog_data_path
 
 from risk.common.map_generator import RiskMapGenerator
 
 from . import Base
 
+if typing.TYPE_CHECKING:
+    from risk.main import Risk
+
 T = typing.TypeVar("T")
 
 color_names = {
@@ -333,15 +337,12 @@ class RiskState(Base):
         self.turn_territories_captured = 0
         self.turn_attacks_completed = 0
 
-    async def generate_risk_board_image(
-        self, inter: discord.Interaction[Red] | commands.Context
-    ):
-        cog = (
-            inter.cog
-            if isinstance(inter, commands.Context)
-            else inter.client.get_cog("Risk")
-        )
-
+    def board_layers(
+        self,
+    ) -> tuple[
+        dict[tuple[int, int], tuple[int, int, int]], dict[tuple[int, int], str]
+    ]:
+        """The territory colors and army labels drawn on the board."""
         territory_armies = {
             coords[terr]: str(self.players[turn].captured_territories[terr])
             if turn is not None
@@ -355,16 +356,25 @@ class RiskState(Base):
             else (128, 128, 128)
             for terr, turn in self.territories.items()
         }
+        return territory_colors, territory_armies
 
-        image = await asyncio.to_thread(
-            RiskMapGenerator.color_territories,
-            clear_image_path=bundled_data_path(cog) / "risk_board.png",
+    async def render_board(self, cog: "Risk", layers=None) -> io.BytesIO:
+        territory_colors, territory_armies = layers or self.board_layers()
+
+        if cog.map_generator is None:
+            cog.map_generator = await asyncio.to_thread(
+                RiskMapGenerator.load,
+                bundled_data_path(cog) / "risk_board.png",
+                coords.values(),
+                cog_data_path(cog),
+            )
+
+        return await asyncio.to_thread(
+            cog.map_generator.color_territories,
             territory_colors=territory_colors,
             territory_armies=territory_armies,
         )
 
-        return discord.File(image, filename="risk_board.png")
-
 
 territory_adjacency = {
     # North America
@@ -4,10 +4,14 @@ import typing as t
 
 from redbot.core import Config, commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import bundled_data_path, cog_data_path
 
 from .abc import CompositeMetaClass
 from .commands import Commands
+from .common.map_generator import RiskMapGenerator
 from .common.models import DB, GuildSettings
+from .common.riskmodels import coords
+from .common.storage import GuildStorage
 from .listeners import Listeners
 from .tasks import TaskLoops
 
@@ -33,7 +37,8 @@ class Risk(
         self.config = Config.get_conf(self, 117, force_registration=True)
         self.config.register_global(db={})
         self.db: DB = DB()
-        self.saving = False
+        self.storage = GuildStorage(self.config, lambda: self.db)
+        self.map_generator: t.Optional[RiskMapGenerator] = None
 
     def format_help_for_context(self, ctx: commands.Context):
         helpcmd = super().format_help_for_context(ctx)
@@ -52,6 +57,7 @@ class Risk(
     async def cog_unload(self):
         for view in self.cache.values():
             view.stop()
+        await self.storage.close()
 
     async def initialize(self) -> None:
         await self.bot.wait_until_red_ready()
@@ -59,19 +65,17 @@ class Risk(
         GuildSettings.cog = self
         self.db = await asyncio.to_thread(DB.model_validate, data)
         self.cache = {}
+        self.map_generator = await asyncio.to_thread(
+            RiskMapGenerator.load,
+            bundled_data_path(self) / "risk_board.png",
+            coords.values(),
+            cog_data_path(self),
+        )
         log.info("Config loaded")
 
-    def save(self) -> None:
-        async def _save():
-            if self.saving:
-                return
-            try:
-                self.saving = True
-                dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-                await self.config.db.set(dump)
-            except Exception as e:
-                log.exception("Failed to save config", exc_info=e)
-            finally:
-                self.saving = False
+    def save(self, guild_id: t.Optional[int] = None) -> asyncio.Task[None]:
+        """Mark `guild_id` (or the whole DB when None) as dirty.
 
-        asyncio.create_task(_save())
+        Writes are debounced and coalesced by `GuildStorage`, the returned task
+        completes once the pending flush has been written."""
+        return self.storage.mark_dirty(guild_id)
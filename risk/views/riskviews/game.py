@@ -8,8 +8,11 @@ from redbot.core import commands
 from redbot.core.data_manager import bundled_data_path
 from redbot.core.utils.views import ConfirmView
 
+from risk.common.renderer import BoardRenderer
+from risk.common.battle import blitz, win_probability
 from risk.common.riskmodels import (
     Continent,
+    Player,
     RiskState,
     Territory,
     TurnPhase,
@@ -34,7 +37,11 @@ class GameView(discord.ui.View):
         super().__init__(timeout=None)
         self.update_acc_to_state()
         self.current_sip_votes = 0
-        self.edit_task: asyncio.Task[None] | None = None
+        self.renderer = BoardRenderer(self)
+
+    def stop(self):
+        self.renderer.clear_pending()
+        super().stop()
 
     def disable_except_essentials(self):
         disable_items(self)
@@ -52,6 +59,7 @@ class GameView(discord.ui.View):
         elif self.state.turn_phase is TurnPhase.ATTACK:
             if self.state.turn_attacks_completed < 3:
                 self.attack.disabled = False
+                self.blitz.disabled = False
 
         else:
             phase_button: discord.ui.Button = None
@@ -118,9 +126,7 @@ class GameView(discord.ui.View):
         await interaction.response.edit_message(view=self)
         if len(self.state.turn_player.cards) < 3:
             self.state.turn_phase_completed = True
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+            self.renderer.request(interaction)
             return await interaction.followup.send(
                 "You do not have enough cards to form a set to trade", ephemeral=True
             )
@@ -132,9 +138,7 @@ class GameView(discord.ui.View):
             "Select 3 cards to trade", view=view, epehemral=True
         )
         await view.wait()
-        if self.edit_task is not None and self.edit_task.done() is False:
-            self.edit_task.cancel()
-        self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+        self.renderer.request(interaction)
 
     @discord.ui.button(label="Place armies", style=discord.ButtonStyle.primary, row=1)
     async def place_armies(
@@ -146,9 +150,7 @@ class GameView(discord.ui.View):
         await interaction.response.edit_message(view=self)
         if self.state.turn_player.armies == 0:
             self.state.turn_phase_completed = True
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+            self.renderer.request(interaction)
             return await interaction.followup.send(
                 "You have no armies to place", ephemeral=True
             )
@@ -157,9 +159,7 @@ class GameView(discord.ui.View):
             self.state.turn_phase is TurnPhase.INITIAL_ARMY_PLACEMENT
             and self.state.turn_phase_completed
         ):
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+            self.renderer.request(interaction)
             return await interaction.followup.send(
                 "You have already placed your armies for this turn.", ephemeral=True
             )
@@ -227,11 +227,7 @@ class GameView(discord.ui.View):
                 await interaction.followup.send(
                     "Why you take so long to respond bro?", ephemeral=True
                 )
-                if self.edit_task is not None and self.edit_task.done() is False:
-                    self.edit_task.cancel()
-                self.edit_task = asyncio.create_task(
-                    self.show_updated_board(interaction)
-                )
+                self.renderer.request(interaction)
                 return
 
             armies = aview.result
@@ -247,9 +243,7 @@ class GameView(discord.ui.View):
         await msg.delete(delay=ALERT_MESSAGE_DELETE_DELAY)
         self.state.turn_phase_completed = True
         print(f"Updating board for {interaction.user.display_name}")
-        if self.edit_task is not None and self.edit_task.done() is False:
-            self.edit_task.cancel()
-        self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+        self.renderer.request(interaction)
 
     @discord.ui.button(label="Attack", style=discord.ButtonStyle.primary, row=1)
     async def attack(
@@ -262,9 +256,18 @@ class GameView(discord.ui.View):
 
         await self.attack_logic(interaction)
 
-        if self.edit_task is not None and self.edit_task.done() is False:
-            self.edit_task.cancel()
-        self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+        self.renderer.request(interaction)
+
+    @discord.ui.button(label="Blitz", style=discord.ButtonStyle.primary, row=1)
+    async def blitz(
+        self,
+        interaction: discord.Interaction,
+        button: discord.ui.Button,
+    ):
+        self.disable_except_essentials()
+        await interaction.response.edit_message(view=self)
+
+        await self.blitz_logic(interaction)
 
     @discord.ui.button(
         label="Fortify (Move armies)", style=discord.ButtonStyle.blurple, row=1
@@ -320,9 +323,7 @@ class GameView(discord.ui.View):
         ]
 
         if not options:
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+            self.renderer.request(interaction)
             return await interaction.followup.send(
                 f"There are no territories accessible from {_from.name.replace('_', ' ').title()}",
                 ephemeral=True,
@@ -349,9 +350,7 @@ class GameView(discord.ui.View):
             ephemeral=True,
         )
         if await view.wait():
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+            self.renderer.request(interaction)
             await interaction.followup.send(
                 "Why you take so long to respond bro?", ephemeral=True
             )
@@ -367,9 +366,7 @@ class GameView(discord.ui.View):
         )
         await msg.delete(delay=ALERT_MESSAGE_DELETE_DELAY)
 
-        if self.edit_task is not None and self.edit_task.done() is False:
-            self.edit_task.cancel()
-        self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+        self.renderer.request(interaction)
 
     @discord.ui.button(
         label="Skip Phase",
@@ -392,10 +389,8 @@ class GameView(discord.ui.View):
 
         if self.state.turn_phase is TurnPhase.ARMY_CALCULATION:
             await self.army_calculation_phase(interaction)
-        if self.edit_task is not None and self.edit_task.done() is False:
-            self.edit_task.cancel()
         self.state.turn_phase_completed = False
-        self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+        self.renderer.request(interaction)
 
     async def end_turn_logic(self, interaction: discord.Interaction | None = None):
         if self.state.turn_phase is TurnPhase.INITIAL_ARMY_PLACEMENT:
@@ -576,9 +571,7 @@ class GameView(discord.ui.View):
             if self.state.turn_phase is TurnPhase.ARMY_CALCULATION:
                 await self.army_calculation_phase(interaction)
             await interaction.response.edit_message(view=self)
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(interaction))
+            self.renderer.request(interaction)
 
     async def send_select(self, view: SelectView, inter: discord.Interaction):
         view.message = await inter.followup.send(
@@ -587,9 +580,7 @@ class GameView(discord.ui.View):
 
         timed_out = await view.wait()
         if timed_out:
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+            self.renderer.request(inter)
             await inter.followup.send(
                 "You took too long to respond. Please try again.", ephemeral=True
             )
@@ -603,7 +594,7 @@ class GameView(discord.ui.View):
             view=None,
             attachments=[],
         )
-        file = await self.state.generate_risk_board_image(inter)
+        file = await self.renderer.render()
         await inter.delete_original_response()
         self.update_acc_to_state()
         # for child in self.children:
@@ -617,7 +608,9 @@ class GameView(discord.ui.View):
             wait=True,
         )
 
-    async def attack_logic(self, inter: discord.Interaction):
+    async def select_attack_territories(
+        self, inter: discord.Interaction
+    ) -> tuple[Territory, Territory] | None:
         options = [
             discord.SelectOption(
                 label=f"{territory.name.replace('_', ' ').title()} - {territory.continent.name.replace('_', ' ').title()}",
@@ -629,9 +622,7 @@ class GameView(discord.ui.View):
         ]
 
         if not options:
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+            self.renderer.request(inter)
             return await inter.followup.send(
                 "You need to have at least 2 armies on a territory to attack",
                 ephemeral=True,
@@ -664,9 +655,7 @@ class GameView(discord.ui.View):
         ]
 
         if not options:
-            if self.edit_task is not None and self.edit_task.done() is False:
-                self.edit_task.cancel()
-            self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+            self.renderer.request(inter)
             return await inter.followup.send(
                 f"There are no attackable territories accessible from {_from.name.replace('_', ' ').title()}",
                 ephemeral=True,
@@ -683,7 +672,14 @@ class GameView(discord.ui.View):
             return
 
         to = Territory._value2member_map_[int(result.pop().value)]
+        return _from, to
 
+    async def attack_logic(self, inter: discord.Interaction):
+        territories = await self.select_attack_territories(inter)
+        if territories is None:
+            return
+
+        _from, to = territories
         defender_turn = self.state.territories[to]
         assert defender_turn is not None
 
@@ -711,7 +707,7 @@ class GameView(discord.ui.View):
                     attachments=[],
                 )
                 self.update_acc_to_state()
-                file = await self.state.generate_risk_board_image(inter)
+                file = await self.renderer.render()
                 await inter.edit_original_response(attachments=[file], view=self)
                 return await inter.followup.send(
                     "Why you take so long to respond bro?", ephemeral=True
@@ -739,7 +735,7 @@ class GameView(discord.ui.View):
                     attachments=[],
                 )
                 self.update_acc_to_state()
-                file = await self.state.generate_risk_board_image(inter)
+                file = await self.renderer.render()
                 await inter.edit_original_response(file=file, view=self)
                 return await inter.followup.send(
                     "Why you take so long to respond bro?", ephemeral=True
@@ -763,8 +759,6 @@ class GameView(discord.ui.View):
         alost = 0
         dlost = 0
 
-        captured = False
-
         for aroll, droll in zip(attacker_rolls, defender_rolls):
             if aroll > droll:
                 defender.captured_territories[to] -= 1
@@ -783,6 +777,76 @@ class GameView(discord.ui.View):
         else:
             message += f"{attacker.mention} lost {alost} armies meanwhile {defender.mention} lost {dlost} armies\n"
 
+        await self.finish_attack(inter, attacker, defender, _from, to, message)
+
+    async def blitz_logic(self, inter: discord.Interaction):
+        territories = await self.select_attack_territories(inter)
+        if territories is None:
+            return
+
+        _from, to = territories
+        defender_turn = self.state.territories[to]
+        assert defender_turn is not None
+
+        defender = self.state.players[defender_turn]
+        attacker = self.state.turn_player
+        attacking = attacker.captured_territories[_from]
+        defending = defender.captured_territories[to]
+        _from_name = _from.name.replace("_", " ").title()
+        to_name = to.name.replace("_", " ").title()
+
+        rng = range(1, min(26, attacking))
+        if len(rng) == 1:
+            stop_at = 1
+
+        else:
+            view = NumberedButtonsView(rng, allowed_to_interact=[attacker.id])
+            await inter.followup.send(
+                f"Select the amount of armies to keep on {_from_name}, the blitz stops once it drops to this many",
+                view=view,
+                ephemeral=True,
+            )
+            if await view.wait():
+                self.renderer.request(inter)
+                return await inter.followup.send(
+                    "Why you take so long to respond bro?", ephemeral=True
+                )
+
+            stop_at = view.result
+
+        chance = win_probability(attacking, defending, stop_at=stop_at)
+        view = ConfirmView(inter.user)
+        view.message = await inter.followup.send(
+            f"Blitzing {to_name} ({defending} armies) from {_from_name} ({attacking} armies) "
+            f"has a {chance:.1%} chance to capture it. Do you want to continue?",
+            ephemeral=True,
+            view=view,
+            wait=True,
+        )
+        if await view.wait() or not view.result:
+            self.renderer.request(inter)
+            return
+
+        result = blitz(attacking, defending, stop_at=stop_at)
+        attacker.captured_territories[_from] = result.attackers_left
+        defender.captured_territories[to] = result.defenders_left
+
+        message = (
+            f"{attacker.mention} blitzed {to_name} from {_from_name} in {result.rounds} rolls\n"
+            f"{attacker.mention} lost {result.attacker_lost} armies meanwhile {defender.mention} lost {result.defender_lost} armies\n"
+        )
+        await self.finish_attack(inter, attacker, defender, _from, to, message)
+
+    async def finish_attack(
+        self,
+        inter: discord.Interaction,
+        attacker: Player,
+        defender: Player,
+        _from: Territory,
+        to: Territory,
+        message: str,
+    ):
+        captured = False
         if defender.captured_territories[to] == 0:
             captured = True
             self.state.territories[to] = self.state.turn
@@ -813,7 +877,7 @@ class GameView(discord.ui.View):
             return
 
         if captured:
-            rng = range(1, attacker.captured_territories[_from])
+            rng = range(1, min(26, attacker.captured_territories[_from]))
             if len(rng) == 1:
                 move_armies = 1
 
@@ -825,9 +889,7 @@ class GameView(discord.ui.View):
                     ephemeral=True,
                 )
                 if await view.wait():
-                    if self.edit_task is not None and self.edit_task.done() is False:
-                        self.edit_task.cancel()
-                    self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+                    self.renderer.request(inter)
                     return await inter.followup.send(
                         "Why you take so long to respond bro?", ephemeral=True
                     )
@@ -848,6 +910,4 @@ class GameView(discord.ui.View):
 
         self.state.turn_attacks_completed += 1
         self.state.turn_phase_completed = True
-        if self.edit_task is not None and self.edit_task.done() is False:
-            self.edit_task.cancel()
-        self.edit_task = asyncio.create_task(self.show_updated_board(inter))
+        self.renderer.request(inter)
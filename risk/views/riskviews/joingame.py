@@ -192,7 +192,7 @@ class JoinGame(discord.ui.View):
 
         view.update_acc_to_state()
 
-        file = await self.state.generate_risk_board_image(interaction)
+        file = await view.renderer.render()
 
         view.message = await interaction.followup.send(
             f"{players[0].mention} has the first turn.\n\nThey have {players[0].armies} armies remaining.",
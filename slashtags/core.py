@@ -25,14 +25,18 @@ SOFTWARE.
 
 import asyncio
 import contextlib
+import hashlib
+import json
 import logging
+import time
 from collections import defaultdict
 from functools import partial
-from typing import TYPE_CHECKING, Coroutine, Dict, Optional
+from typing import TYPE_CHECKING, Coroutine, Dict, Optional, Set
 
 import aiohttp
 import discord
 import TagScriptEngine as tse
+from discord.ext import tasks
 from redbot.core import commands
 from redbot.core.bot import Red
 from redbot.core.config import Config
@@ -47,6 +51,9 @@ from .views import ConfirmationView
 
 log = logging.getLogger("red.phenom4n4n.slashtags")
 
+SYNC_CONCURRENCY = 5
+SYNC_PROGRESS_INTERVAL = 50
+
 
 class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass):
     """
@@ -79,13 +86,14 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             identifier=70342502093747959723475890,
             force_registration=True,
         )
-        default_guild = {"tags": {}}
+        default_guild = {"tags": {}, "sync_hash": None}
         default_global = {
             "application_id": None,
             "eval_command": None,
             "tags": {},
             "error_dispatching": True,
             "testing_enabled": False,
+            "tag_timeout": 0,
         }
         self.config.register_guild(**default_guild)
         self.config.register_global(**default_global)
@@ -93,6 +101,10 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         self.command_cache: Dict[int, ApplicationCommand] = {}
         self.guild_tag_cache: Dict[int, Dict[int, SlashTag]] = defaultdict(dict)
         self.global_tag_cache: Dict[int, SlashTag] = {}
+        self.last_sync_stats: Optional[dict] = None
+        # tags whose use count changed since the last flush, by guild ID (None for global tags)
+        self.dirty_uses: Dict[Optional[int], Set[int]] = defaultdict(set)
+        self.flush_uses_lock = asyncio.Lock()
 
         self.load_task = self.create_task(self.initialize_task())
 
@@ -135,6 +147,9 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         self.bot.tree.sync = self.old_sync
 
         self.load_task.cancel()
+        self.flush_uses_loop.cancel()
+        await self.flush_tag_uses()
+        self.tag_executor.shutdown(wait=False, cancel_futures=True)
 
         for command in self.command_cache.copy().values():
             command.remove_from_cache()
@@ -144,10 +159,45 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
         self.eval_command = data["eval_command"]
         self.error_dispatching = data["error_dispatching"]
         self.testing_enabled = data["testing_enabled"]
+        self.tag_timeout = data["tag_timeout"]
         self.monkeypatch_redtree_sync()
+        self.flush_uses_loop.start()
         if app_id := data["application_id"] or self.bot.application_id:
             self.application_id = app_id
 
+    def mark_tag_used(self, tag: SlashTag):
+        """Queue a tag's use count to be written on the next flush."""
+        if tag._real_tag:
+            self.dirty_uses[tag.guild_id].add(tag.id)
+
+    async def flush_tag_uses(self):
+        """Write every pending use count, with one config write per guild."""
+        async with self.flush_uses_lock:
+            dirty, self.dirty_uses = self.dirty_uses, defaultdict(set)
+            for guild_id, tag_ids in dirty.items():
+                cache = (
+                    self.guild_tag_cache[guild_id] if guild_id else self.global_tag_cache
+                )
+                group = self.config.guild_from_id(guild_id) if guild_id else self.config
+                try:
+                    async with group.tags() as t:
+                        for tag_id in tag_ids:
+                            tag = cache.get(tag_id)
+                            data = t.get(str(tag_id))
+                            if tag is not None and data is not None:
+                                data["uses"] = tag.uses
+                except Exception as error:
+                    self.dirty_uses[guild_id].update(tag_ids)
+                    log.exception(
+                        "Failed to save slash tag uses for guild %s",
+                        guild_id,
+                        exc_info=error,
+                    )
+
+    @tasks.loop(minutes=1)
+    async def flush_uses_loop(self):
+        await self.flush_tag_uses()
+
     async def _sync(
         self, *args, guild: Optional[discord.abc.Snowflake] = None, **kwargs
     ):
@@ -189,72 +239,135 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             cached,
         )
 
-    async def cache_and_sync_guild_tags(self, guild_data: Optional[dict] = None):
-        if TYPE_CHECKING:
-            from discord.types.command import ApplicationCommand as APTD
-
+    def guild_sync_hash(self, tags: Dict[int, SlashTag]) -> str:
+        """Hash the command payloads a guild should have, along with the IDs they were last synced as."""
+        payload = sorted(
+            ((tag.id or 0, tag.command.to_request()) for tag in tags.values()),
+            key=lambda x: (x[1]["type"], x[1]["name"]),
+        )
+        data = json.dumps([self.application_id, payload], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    async def cache_and_sync_guild_tags(
+        self, guild_data: Optional[dict] = None, *, force: bool = False
+    ) -> dict:
+        """
+        Cache every guild's slash tags and push the guilds whose tags changed to discord.
+
+        A guild is skipped when its stored `sync_hash` matches its tags, pass `force=True`
+        to sync every given guild regardless, e.g. when its commands were deleted on
+        discord's side."""
         guilds_data = guild_data or await self.config.all_guilds()
-        for guild_id, guild_data in guilds_data.items():
-            guild = self.bot.get_guild(guild_id)
-            if not guild or not guild_data["tags"]:
+        start = time.perf_counter()
+        stats = {"synced": 0, "skipped": 0, "failed": 0, "total": 0}
+        semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+        jobs = []
+        for guild_id, data in guilds_data.items():
+            if not data["tags"] or not self.bot.get_guild(guild_id):
                 continue
-            all_commands = dict[int, SlashTag](
-                (
-                    (
-                        x,
-                        SlashTag.from_dict(
-                            self, guild_data["tags"][str(x)], guild_id=guild_id
-                        ),
-                    )
-                    for x in map(int, guild_data["tags"].keys())
-                )
-            )
-            commands_synced = dict[int, "APTD"](
-                (
-                    (int(x["id"]), x)
-                    for x in await self.bot.http.get_guild_commands(
-                        self.application_id, guild_id
-                    )
-                )
-            )
+            tags = {
+                int(tag_id): SlashTag.from_dict(self, tag_data, guild_id=guild_id)
+                for tag_id, tag_data in data["tags"].items()
+            }
+            sync_hash = self.guild_sync_hash(tags)
+            if not force and sync_hash == data.get("sync_hash"):
+                # nothing changed since the last successful sync, only cache the tags
+                for tag in tags.values():
+                    tag.add_to_cache()
+                stats["skipped"] += 1
+                continue
+            jobs.append(self._sync_guild_tags(guild_id, tags, semaphore))
 
-            commands_not_synced = dict[int, SlashTag](
-                filter(
-                    lambda x: commands_synced.pop(x[0], False)
-                    and all_commands.pop(x[0], False),
-                    all_commands.copy().items(),
+        stats["total"] = stats["skipped"] + len(jobs)
+        log.info(
+            "Syncing slash tags: %d guilds up to date, %d guilds to sync",
+            stats["skipped"],
+            len(jobs),
+        )
+        for done, result in enumerate(asyncio.as_completed(jobs), start=1):
+            try:
+                await result
+            except Exception as error:
+                stats["failed"] += 1
+                log.exception("Failed to sync slash tags for a guild.", exc_info=error)
+            else:
+                stats["synced"] += 1
+            if done % SYNC_PROGRESS_INTERVAL == 0:
+                log.info(
+                    "Slash tag sync progress: %d/%d guilds (%.1fs)",
+                    done,
+                    len(jobs),
+                    time.perf_counter() - start,
                 )
-            )
 
-            if not commands_synced and not commands_not_synced:
-                log.info("No slash tags to sync in guild %s", guild_id)
-                continue
+        stats["elapsed"] = time.perf_counter() - start
+        self.last_sync_stats = stats
+        log.info(
+            "Completed syncing slash tags in %.2fs: %d synced, %d skipped, %d failed",
+            stats["elapsed"],
+            stats["synced"],
+            stats["skipped"],
+            stats["failed"],
+        )
+        return stats
 
+    async def _sync_guild_tags(
+        self, guild_id: int, tags: Dict[int, SlashTag], semaphore: asyncio.Semaphore
+    ):
+        if TYPE_CHECKING:
+            from discord.types.command import ApplicationCommand as APTD
+
+        async with semaphore:
+            remote: list["APTD"] = await self.bot.http.get_guild_commands(
+                self.application_id, guild_id
+            )
+            # commands that aren't tags are kept as they are
+            other_commands = [x for x in remote if int(x["id"]) not in tags]
+            # discord.py's HTTP client waits out rate limits per route bucket,
+            # the semaphore only keeps the number of guilds in flight bounded
             synced = await self.bot.http.bulk_upsert_guild_commands(
                 self.application_id,
                 guild_id,
-                [*(x.command.to_request() for x in commands_not_synced.values())]
-                + [*commands_synced.values()],
+                [x.command.to_request() for x in tags.values()] + other_commands,
             )
 
-            for com in synced:
-                tag = discord.utils.get(
-                    [*commands_not_synced.values()],
-                    name=com["name"],
-                    type=discord.AppCommandType(com["type"]),
-                )
-                if not tag:
-                    log.debug("tag not found: %s", com)
-                    continue
-                tag.command._parse_response_data(com)
-                await tag.initialize()
-
-            log.info(
-                "Completed caching slash tags for guild %s: %d commands (non tags) and %d tags were synced",
-                guild_id,
-                len(commands_synced),
-                len(commands_not_synced),
-            )
+        by_key = {(tag.name, tag.type): tag for tag in tags.values()}
+        moved: Dict[int, SlashTag] = {}
+        for com in synced:
+            tag = by_key.get((com["name"], discord.AppCommandType(com["type"])))
+            if not tag:
+                continue
+            old_id = tag.id
+            tag.command._parse_response_data(com)
+            if tag.id != old_id:
+                moved[old_id] = tag
+                stale = self.guild_tag_cache[guild_id].get(old_id)
+                if stale is not None and stale is not tag:
+                    # cached under the old ID by an earlier sync
+                    stale.remove_from_cache()
+            tag.add_to_cache()
+
+        if moved:
+            # re-key tags that were recreated with a new ID in a single write
+            async with self.config.guild_from_id(guild_id).tags() as t:
+                for old_id, tag in moved.items():
+                    t.pop(str(old_id), None)
+                    t[str(tag.id)] = tag.to_dict()
+
+        await self.config.guild_from_id(guild_id).sync_hash.set(
+            self.guild_sync_hash({tag.id: tag for tag in tags.values()})
+        )
+        log.debug(
+            "Completed syncing slash tags for guild %s: %d commands (non tags) and %d tags were synced",
+            guild_id,
+            len(other_commands),
+            len(tags),
+        )
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        # discord drops the guild's commands, so they have to be pushed again if it re-adds the bot
+        await self.config.guild(guild).sync_hash.clear()
 
     @commands.Cog.listener()
     async def on_slash_commands_synced(
@@ -374,8 +487,19 @@ class SlashTags(Commands, Processor, commands.Cog, metaclass=CompositeMetaClass)
             return
         msg = await ctx.send(f"Restoring {len(slashtags)} slash tag{s}...")
         async with ctx.typing():
-            for tag in slashtags.copy().values():
-                await tag.restore()
+            if guild is None:
+                for tag in slashtags.copy().values():
+                    await tag.restore()
+            else:
+                # the stored hash may match even though discord lost the commands
+                stats = await self.cache_and_sync_guild_tags(
+                    {guild.id: await self.config.guild(guild).all()}, force=True
+                )
+                if stats["failed"]:
+                    await self.delete_quietly(msg)
+                    return await ctx.send(
+                        "Restoring slash tags failed, check your logs for more information."
+                    )
         await self.delete_quietly(msg)
         s = "s" if len(slashtags) > 1 else ""
         await ctx.send(f"Restored {len(slashtags)} slash tag{s}.")
@@ -51,3 +51,7 @@ class WhitelistCheckFailure(RequireCheckFailure):
 
 class BlacklistCheckFailure(RequireCheckFailure):
     """Raised when a user is in a blacklisted channel or has a blacklisted role."""
+
+
+class TagTimeout(SlashTagException):
+    """Raised when a tag takes longer than the configured time budget to process."""
@@ -0,0 +1,167 @@
+"""
+MIT License
+
+Copyright (c) 2020-present phenom4n4n
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import TagScriptEngine as tse
+from TagScriptEngine.interpreter import Node, build_node_tree
+
+log = logging.getLogger("red.phenom4n4n.slashtags.interpreter")
+
+Coordinates = Tuple[Tuple[int, int], ...]
+
+
+class NodeTreeCache:
+    """
+    LRU cache of the bracket coordinates TagScriptEngine finds in a tagscript.
+
+    Entries are keyed by tag and hold the hash of the tagscript they were built
+    from, so a tag whose tagscript changed is parsed again even if it wasn't invalidated.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Hashable, Tuple[int, Coordinates]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # tags can be processed from the worker pool
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, key: Hashable, tagscript: str) -> Coordinates:
+        script_hash = hash(tagscript)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == script_hash:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        coordinates = tuple(node.coordinates for node in build_node_tree(tagscript))
+        with self._lock:
+            self._cache[key] = (script_hash, coordinates)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return coordinates
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+class CachedInterpreter(tse.Interpreter):
+    """
+    An Interpreter that reuses the node tree of tagscripts processed with a `cache_key`.
+
+    The verbs themselves are still parsed while solving, since blocks can rewrite the text
+    that follows them.
+    """
+
+    def __init__(self, blocks: List[tse.Block], *, cache_size: int = 512):
+        super().__init__(blocks)
+        self.node_cache = NodeTreeCache(cache_size)
+
+    def process(
+        self,
+        message: str,
+        seed_variables: Optional[Dict[str, tse.Adapter]] = None,
+        *,
+        cache_key: Optional[Hashable] = None,
+        charlimit: Optional[int] = None,
+        dot_parameter: bool = False,
+        **kwargs: Any,
+    ) -> tse.Response:
+        if cache_key is None:
+            return super().process(
+                message,
+                seed_variables,
+                charlimit=charlimit,
+                dot_parameter=dot_parameter,
+                **kwargs,
+            )
+
+        response = tse.Response(variables=seed_variables, extra_kwargs=kwargs)
+        # nodes are mutated while solving, so each run gets fresh ones
+        node_ordered_list = [
+            Node(coordinates) for coordinates in self.node_cache.get(cache_key, message)
+        ]
+        try:
+            output = self._solve(
+                message,
+                node_ordered_list,
+                response,
+                charlimit=charlimit,
+                dot_parameter=dot_parameter,
+            )
+        except tse.TagScriptError:
+            raise
+        except Exception as error:
+            raise tse.ProcessError(error, response, self) from error
+        return self._return_response(response, output)
+
+
+class ExecutionHistogram:
+    """Tag execution times in milliseconds, bucketed by upper bound."""
+
+    BUCKETS = (1, 5, 10, 50, 100, 500, 1000)
+
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def average(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+
+    def add(self, milliseconds: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, milliseconds)] += 1
+        self.total += milliseconds
+        if milliseconds > self.max:
+            self.max = milliseconds
+
+    def format_buckets(self) -> str:
+        labels = [f"≤{bound}" for bound in self.BUCKETS] + [f">{self.BUCKETS[-1]}"]
+        return " ".join(
+            f"{label}:{count}" for label, count in zip(labels, self.counts) if count
+        )
@@ -775,7 +775,13 @@ class Commands(MixinMeta):
             f"Application ID: **{self.application_id}**",
             f"Eval command: {eval_command}",
             f"Test cog loaded: {testing_enabled}",
+            f"Tag time budget: {f'**{self.tag_timeout}s**' if self.tag_timeout else '❎'}",
         ]
+        if stats := self.last_sync_stats:
+            description.append(
+                f"Last sync: **{stats['synced']}** synced, **{stats['skipped']}** unchanged, "
+                f"**{stats['failed']}** failed in {stats['elapsed']:.2f}s"
+            )
         embed = discord.Embed(
             color=0xC9C9C9,
             title="SlashTags Settings",
@@ -783,6 +789,70 @@ class Commands(MixinMeta):
         )
         await ctx.send(embed=embed)
 
+    @slashtagset.command("timings")
+    async def slashtagset_timings(self, ctx: commands.Context):
+        """
+        View the slowest slash tags by execution time since the cog was loaded.
+
+        Times only cover TagScript processing, not sending the response.
+        """
+        tags = self.global_tag_cache.copy()
+        for guild_tags in self.guild_tag_cache.values():
+            tags.update(guild_tags)
+        timings = [
+            (tag, histogram)
+            for tag_id, histogram in self.tag_timings.copy().items()
+            if (tag := tags.get(tag_id)) and histogram.count
+        ]
+        if not timings:
+            return await ctx.send("No slash tags have been run yet.")
+        timings.sort(
+            key=lambda x: (self.tag_timeouts[x[0].id], x[1].max), reverse=True
+        )
+        cache = self.engine.node_cache
+        e = discord.Embed(title="Slash Tag Timings", color=await ctx.embed_color())
+        e.set_footer(
+            text=f"Parse cache: {len(cache)}/{cache.maxsize} tags | {cache.hits} hits, {cache.misses} misses"
+        )
+        embeds = []
+        for chunk in chunks(timings, 10):
+            data = [
+                (
+                    tag.name,
+                    h.count,
+                    f"{h.average:.2f}",
+                    f"{h.max:.2f}",
+                    self.tag_timeouts[tag.id],
+                )
+                for tag, h in chunk
+            ]
+            headers = ("Tag", "Runs", "Avg ms", "Max ms", "Timeouts")
+            lines = [box(tabulate(data, headers=headers), "prolog")]
+            lines.extend(f"`{tag.name}` {h.format_buckets()}" for tag, h in chunk)
+            embed = e.copy()
+            embed.description = "\n".join(lines)
+            embeds.append(embed)
+        await menu(ctx, embeds)
+
+    @slashtagset.command("timeout")
+    async def slashtagset_timeout(self, ctx: commands.Context, seconds: float = 0):
+        """
+        Set a time budget for processing slash tags.
+
+        With a budget set, tags are processed in a worker pool instead of on the bot's event loop,
+        and a tag that runs over the budget gets an error response.
+        Use `0` to process tags inline without a budget.
+        """
+        if seconds < 0:
+            return await ctx.send("The time budget can't be negative.")
+        await self.config.tag_timeout.set(seconds)
+        self.tag_timeout = seconds
+        if seconds:
+            message = f"Slash tags will now be processed with a {seconds}s time budget."
+        else:
+            message = "Slash tags will now be processed inline without a time budget."
+        await ctx.send(message)
+
     @slashtagset.command("appid")
     async def slashtagset_appid(self, ctx: commands.Context, id: int = None):
         """
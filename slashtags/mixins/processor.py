@@ -25,9 +25,12 @@ SOFTWARE.
 
 import asyncio
 import logging
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
 from functools import partial
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 import discord
 import TagScriptEngine as tse
@@ -36,7 +39,8 @@ from discord.ext.commands.context import Typing, DeferTyping
 
 from ..abc import MixinMeta
 from ..blocks import HideBlock, ReactBlock
-from ..errors import RequireCheckFailure
+from ..errors import RequireCheckFailure, TagTimeout
+from ..interpreter import CachedInterpreter, ExecutionHistogram
 from ..models import InteractionWrapper
 from ..objects import FakeMessage, SlashTag, ApplicationCommand
 from ..utils import dev_check, TemporaryAttributes
@@ -46,6 +50,8 @@ RS = commands.Requires
 
 log = logging.getLogger("red.phenom4n4n.slashtags.processor")
 
+TAG_WORKERS = 4
+
 
 class Processor(MixinMeta):
     OPTION_ADAPTERS = {
@@ -86,7 +92,16 @@ class Processor(MixinMeta):
             tse.CooldownBlock(),
         ]
         slash_blocks = [HideBlock(), ReactBlock()]
-        self.engine = tse.Interpreter(tse_blocks + slash_blocks)
+        self.engine = CachedInterpreter(tse_blocks + slash_blocks)
+        self.tag_timings: Dict[int, ExecutionHistogram] = defaultdict(
+            ExecutionHistogram
+        )
+        # a budget of 0 processes tags inline on the event loop
+        self.tag_timeout: float = 0
+        self.tag_timeouts: Counter = Counter()
+        self.tag_executor = ThreadPoolExecutor(
+            max_workers=TAG_WORKERS, thread_name_prefix="slashtags"
+        )
 
         self.role_converter = commands.RoleConverter()
         self.channel_converter = commands.TextChannelConverter()
@@ -162,8 +177,14 @@ class Processor(MixinMeta):
         seed_variables = await self.handle_seed_variables(
             interaction, seed_variables or {}
         )
-        output = tag.run(self.engine, seed_variables=seed_variables, **kwargs)
-        await tag.update_config()
+        try:
+            output = await self.run_tag(tag, seed_variables, **kwargs)
+        except TagTimeout:
+            await interaction.send(
+                "This slash tag took too long to run.", ephemeral=True
+            )
+            return
+        self.mark_tag_used(tag)
         content = output.body[:2000] if output.body else None
         actions = output.actions
 
@@ -199,6 +220,43 @@ class Processor(MixinMeta):
             except discord.NotFound:
                 pass
 
+    def _timed_run(self, tag: SlashTag, seed_variables: dict, kwargs: dict):
+        start = time.perf_counter()
+        try:
+            return tag.run(self.engine, seed_variables=seed_variables, **kwargs)
+        finally:
+            self.tag_timings[tag.id].add((time.perf_counter() - start) * 1000)
+
+    async def run_tag(
+        self, tag: SlashTag, seed_variables: dict, **kwargs
+    ) -> tse.Response:
+        """
+        Process a tag, in the worker pool if a time budget is set.
+
+        Worker threads can't be interrupted, so a tag over budget keeps its worker
+        until it finishes, but the interaction is answered as soon as the budget runs out.
+        """
+        budget = self.tag_timeout
+        if not budget:
+            return self._timed_run(tag, seed_variables, kwargs)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.tag_executor, self._timed_run, tag, seed_variables, kwargs
+        )
+        try:
+            return await asyncio.wait_for(future, budget)
+        except asyncio.TimeoutError:
+            self.tag_timeouts[tag.id] += 1
+            log.warning(
+                "Slash tag %r (%s) in guild %s exceeded its %ss time budget",
+                tag.name,
+                tag.id,
+                tag.guild_id,
+                budget,
+            )
+            raise TagTimeout(tag) from None
+
     async def react_to_list(
         self, ctx: commands.Context, message: discord.Message, args: List[str]
     ):
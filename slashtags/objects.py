@@ -36,6 +36,7 @@ from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import box, pagify
 
 from .errors import SlashTagException
+from .interpreter import CachedInterpreter
 from .models import InteractionWrapper
 
 if TYPE_CHECKING:
@@ -550,6 +551,8 @@ class SlashTag:
     ) -> tse.Response:
         self.uses += 1
         seed_variables.update(uses=tse.IntAdapter(self.uses))
+        if self.id and isinstance(interpreter, CachedInterpreter):
+            kwargs["cache_key"] = self.id
         return interpreter.process(self.tagscript, seed_variables, **kwargs)
 
     async def update_config(self):
@@ -596,6 +599,8 @@ class SlashTag:
             except discord.NotFound:
                 pass
         self.remove_from_cache()
+        self.cog.engine.node_cache.invalidate(self.id)
+        self.cog.tag_timings.pop(self.id, None)
         async with self.config_path.tags() as t:
             t.pop(str(self.id), None)
         return f"{self.name_prefix} `{self}` deleted."
@@ -670,6 +675,7 @@ class SlashTag:
     async def edit_tagscript(self, tagscript: str) -> str:
         old_tagscript = self.tagscript
         self.tagscript = tagscript
+        self.cog.engine.node_cache.invalidate(self.id)
         await self.update_config()
         return f"{self.name_prefix} `{self}`'s tagscript has been edited from {len(old_tagscript)} to {len(tagscript)} characters."
 
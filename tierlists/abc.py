@@ -1,4 +1,5 @@
 from abc import ABC, ABCMeta, abstractmethod
+from typing import Optional
 
 from discord.ext.commands.cog import CogMeta
 from redbot.core.bot import Red
@@ -18,5 +19,5 @@ class MixinMeta(ABC):
         self.db: DB
 
     @abstractmethod
-    async def save(self):
+    async def save(self, guild_id: Optional[int] = None) -> None:
         raise NotImplementedError
@@ -43,7 +43,7 @@ class Admin(MixinMeta):
             pass
 
         conf.percentiles[tier] = value
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(f"Percentile for {tier} set to {value}")
 
     @tierlistset.command(name="setmaxvotes", aliases=["setmv"])
@@ -62,7 +62,7 @@ class Admin(MixinMeta):
             conf.max_upvotes_per_user = value
         elif vote_type == "downvotes":
             conf.max_downvotes_per_user = value
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(f"Max {vote_type} per user set to {value}")
 
     @tierlistset.command(name="showsettings", aliases=["ss", "show", "settings"])
@@ -118,7 +118,7 @@ class Admin(MixinMeta):
             msg = await channel.send(embed=embed, view=view)
             await msg.pin(reason="Tierlist category voting embed")
             cat.message = msg.id
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(
             f"A category with the name {name} {'already exists' if not created else 'has been created'}\n"
             f"Description: {cat.description or 'No description set'}\n"
@@ -135,7 +135,8 @@ class Admin(MixinMeta):
         conf = self.db.get_conf(ctx.guild)
         cat = conf.get_category(name)
         deleted = conf.del_category(name)
-        if deleted and await self.save():
+        if deleted:
+            await self.save(ctx.guild.id)
             if cat.message:
                 channel = typing.cast(
                     GuildMessageable, ctx.guild.get_channel(cat.channel)
@@ -185,7 +186,7 @@ class Admin(MixinMeta):
             await msg.pin(reason="Tierlist category voting embed")
 
         cat.message = msg.id
-        await self.save()
+        await self.save(ctx.guild.id)
 
         return await ctx.send("Message updated")
 
@@ -228,7 +229,7 @@ class Admin(MixinMeta):
         )
         await msg.pin(reason="Tierlist category voting embed")
         cat.message = msg.id
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(
             f"Channel set to {channel.mention}. Message: {msg.jump_url}"
         )
@@ -247,7 +248,7 @@ class Admin(MixinMeta):
         if not cat:
             return await ctx.send("Category not found")
         cat.description = description
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(f"Description set to {description}")
 
     @tlset_cat_edit.command(name="name", aliases=["rename"])
@@ -270,7 +271,7 @@ class Admin(MixinMeta):
         cat.name = new_name
         conf.del_category(name)
         conf.add_category(new_name, cat.description, cat.choices)
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(f"Name set to {new_name}")
 
     @tlset_category.group(
@@ -298,7 +299,7 @@ class Admin(MixinMeta):
             return await ctx.send(f"Option {option} already exists.")
 
         else:
-            await self.save()
+            await self.save(ctx.guild.id)
             return await ctx.send(
                 f"Option {option} added. Ask an admin to run the command `[p]tlset cat updatemessage {category}` to update the voting message with the new choices once you're done adding choices."
             )
@@ -320,7 +321,7 @@ class Admin(MixinMeta):
             return await ctx.send("Invalid option number")
         option = options[option - 1]
         cat.remove_option(option)
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(
             f"Option {option} removed. Don't forget to run the command `[p]tlset cat updatemessage {category}` to update the voting message with the new choices once you're done editing choices."
         )
@@ -338,7 +339,7 @@ class Admin(MixinMeta):
         added, option = cat.add_option(option, force=True)
         if not added:
             return await ctx.send(f"Option {option} already exists")
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(
             f"Option {option} added. Don't forget to run the command `[p]tlset cat updatemessage {category}` to update the voting message with the new choices once you're done adding choices."
         )
@@ -352,7 +353,7 @@ class Admin(MixinMeta):
         if not cat:
             return await ctx.send("Category not found")
         cat.choices = {}
-        await self.save()
+        await self.save(ctx.guild.id)
         return await ctx.send(
             f"Options cleared from {category}. Don't forget to run the command `[p]tlset cat updatemessage {category}` to update the voting message with the new choices once you're done editing choices."
         )
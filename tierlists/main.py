@@ -8,6 +8,7 @@ from redbot.core.bot import Red
 from .abc import CompositeMetaClass
 from .commands import Commands
 from .common.models import DB
+from .common.storage import GuildStorage
 from .views import VoteSelect
 
 log = logging.getLogger("red.bounty.tierlists")
@@ -27,7 +28,7 @@ class TierLists(Commands, commands.Cog, metaclass=CompositeMetaClass):
         self.config.register_global(db={})
 
         self.db: DB = DB()
-        self.saving = False
+        self.storage = GuildStorage(self.config, lambda: self.db)
 
     def format_help_for_context(self, ctx: commands.Context):
         helpcmd = super().format_help_for_context(ctx)
@@ -44,19 +45,13 @@ class TierLists(Commands, commands.Cog, metaclass=CompositeMetaClass):
         self.bot.add_dynamic_items(VoteSelect)
         log.info("Config loaded")
 
-    async def save(self) -> None:
-        if self.saving or not self.db:
-            return
-        try:
-            self.saving = True
-            dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-            await self.config.db.set(dump)
-        except Exception as e:
-            log.exception("Failed to save config", exc_info=e)
-        finally:
-            self.saving = False
+    async def save(self, guild_id: t.Optional[int] = None) -> None:
+        """Mark `guild_id` (or the whole DB when None) as dirty.
+
+        Writes are debounced and coalesced by `GuildStorage`."""
+        self.storage.mark_dirty(guild_id)
 
     async def cog_unload(self):
-        await self.save()
+        await self.storage.close()
         self.bot.remove_dynamic_items(VoteSelect)
         log.info("Config saved")
@@ -85,7 +85,7 @@ class VoteSelect(DynamicItem[Select], template=r"VoteSelect:cat:(?P<category>\w+
                         ephemeral=True,
                     )
                 choice.votes[user.id] = vote
-                await cog.save()
+                await cog.save(interaction.guild.id)
                 await interaction.message.edit(
                     embed=cat.get_voting_embed(conf.percentiles)
                 )
@@ -95,7 +95,7 @@ class VoteSelect(DynamicItem[Select], template=r"VoteSelect:cat:(?P<category>\w+
                 )
 
             del choice.votes[user.id]
-            await cog.save()
+            await cog.save(interaction.guild.id)
             await interaction.message.edit(embed=cat.get_voting_embed(conf.percentiles))
             return await interaction.followup.send("Vote removed.", ephemeral=True)
 
@@ -138,7 +138,7 @@ class VoteSelect(DynamicItem[Select], template=r"VoteSelect:cat:(?P<category>\w+
             )
 
         choice.votes[user.id] = view.result and "upvote" or "downvote"
-        await cog.save()
+        await cog.save(interaction.guild.id)
         await interaction.message.edit(embed=cat.get_voting_embed(conf.percentiles))
         return await interaction.followup.send(
             f"Upvoted `{choice.name}`.", ephemeral=True
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Literal
+from typing import Dict, List, Literal, Optional
 
 import discord
 from redbot.core.bot import Red
@@ -79,6 +79,21 @@ class TimedRole:
 
         return to_return
 
+    def due_at(self, member: discord.Member) -> Optional[datetime]:
+        """
+        Returns the time this timedrole becomes due for the member, `None` if they haven't joined yet."""
+        # joined_at can be None if the user is lurking aka viewing server from discovery
+        return member.joined_at + self.delay if member.joined_at else None
+
+    def applies_to(self, member: discord.Member, now: datetime, check_bots: bool) -> bool:
+        """
+        Whether this timedrole is due for the member, regardless of whether they have the role."""
+        if self._required and not any(member.get_role(x) for x in self._required):
+            return False
+        if member.bot and not check_bots:
+            return False
+        return (due := self.due_at(member)) is not None and now >= due
+
     async def filter_members_without_role(self) -> List[discord.Member]:
         """
         Returns a list of `discord.Member` objects that do not have this timedrole."""
@@ -86,53 +101,25 @@ class TimedRole:
             return []
 
         guild = self.guild
-        members = guild.members
-
         check_bots = await self.cog.config.guild(guild).check_bots()
+        now = datetime.now(tz=timezone.utc)
 
-        def check(x: discord.Member):
-            conditions = {
-                "has_role": not x.get_role(self.id),
-                "has_required_roles": (
-                    (set(x.roles) & set(self.required)) if self._required else True
-                ),
-                "has_joined_>_delay": (datetime.now(tz=timezone.utc) - x.joined_at) >= self.delay
-                if x.joined_at
-                else False,
-                "check_if_bot": (
-                    True if x.bot and check_bots else False if x.bot and not check_bots else True
-                ),
-            }
-            log.debug(f"without_role_conditions for {x.name}({x.id}) {conditions}")
-            return all(conditions.values())
-
-        return list(filter(check, members))  # private method usage, i know. But this is faster.
+        return [
+            x
+            for x in guild.members
+            if not x.get_role(self.id) and self.applies_to(x, now, check_bots)
+        ]
 
     async def filter_members_with_role(self) -> List[discord.Member]:
         """
         Returns a list of `discord.Member` objects that have this timedrole."""
         guild = self.guild
-        members = guild.members
-
         check_bots = await self.cog.config.guild(guild).check_bots()
+        now = datetime.now(tz=timezone.utc)
 
-        def check(x: discord.Member):
-            conditions = {
-                "has_role": x.get_role(self.id) is not None,
-                "has_required_roles": (
-                    (set(x.roles) & set(self.required)) if self._required else True
-                ),
-                "has_joined_>_delay": (datetime.now(tz=timezone.utc) - x.joined_at) >= self.delay
-                if x.joined_at
-                else False,
-                "check_if_bot": (
-                    True if x.bot and check_bots else False if x.bot and not check_bots else True
-                ),
-            }
-            log.debug(f"with_role_conditions for {x.name}({x.id}) {conditions}")
-            return all(conditions.values())
-
-        return list(filter(check, members))
+        return [
+            x for x in guild.members if x.get_role(self.id) and self.applies_to(x, now, check_bots)
+        ]
 
     # async def handle_role(self):
     #     members = await self.filter_members_without_role() if self.mode == "add" else await self.filter_memebrs_with_role()
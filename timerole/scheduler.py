@@ -0,0 +1,72 @@
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Tuple
+
+Key = Tuple[int, int]  # (guild_id, member_id)
+
+
+class MemberSchedule:
+    """
+    A time ordered queue of members waiting for one of their timeroles to become due.
+
+    Every member has at most one due time, scheduling them again replaces it.
+    Replaced heap entries are left in place and skipped once they reach the top,
+    the heap is rebuilt once they outnumber the live ones."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, Key]] = []
+        self._due: Dict[Key, float] = {}
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, guild_id: int, member_id: int, when: float):
+        key = (guild_id, member_id)
+        if self._due.get(key) == when:
+            return
+        self._due[key] = when
+        heapq.heappush(self._heap, (when, key))
+        self._compact()
+        self._changed.set()
+
+    def discard(self, guild_id: int, member_id: int):
+        self._due.pop((guild_id, member_id), None)
+        self._compact()
+
+    def discard_guild(self, guild_id: int):
+        for key in [key for key in self._due if key[0] == guild_id]:
+            del self._due[key]
+        self._compact()
+
+    def _compact(self):
+        # rescheduling a whole guild leaves an entry per member behind, which would
+        # otherwise stay in the heap until their old due time
+        if len(self._heap) > 2 * len(self._due):
+            self._heap = [(when, key) for key, when in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> List[Key]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, key = heapq.heappop(self._heap)
+            if self._due.get(key) == when:
+                del self._due[key]
+                due.append(key)
+        return due
+
+    async def next_batch(self) -> List[Key]:
+        """Wait until at least one member is due, then unschedule and return every due member."""
+        while True:
+            self._changed.clear()
+            if due := self._pop_due(time.time()):
+                return due
+
+            while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)  # drop replaced entries so the timeout is accurate
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
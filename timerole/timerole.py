@@ -6,12 +6,11 @@ All credits go to bobloy and I do not assume ownership of the cog."""
 import asyncio
 import logging
 import re
+import time
 from datetime import datetime, timezone
-from itertools import zip_longest
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 import discord
-from discord.ext import tasks
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import box, humanize_list, humanize_timedelta, pagify
@@ -19,6 +18,8 @@ from redbot.core.utils.menus import DEFAULT_CONTROLS, menu
 from tabulate import tabulate
 
 from .obj import TimedRole
+from .scheduler import MemberSchedule
+from .worker import RoleWorker
 
 log = logging.getLogger("red.cTm.timerole")
 
@@ -57,12 +58,20 @@ class TimeRole(commands.Cog):
         self.bot = bot
 
         self.cache: Dict[int, List[TimedRole]] = {}
-        self.role_task = self.role_loop.start()
+        # the ids of roles that have been added to each member, by guild and member id
+        self.already_added: Dict[int, Dict[int, Set[int]]] = {}
+        self.schedule = MemberSchedule()
+        self.worker = RoleWorker(self)
+        self.role_task = asyncio.create_task(self.run_schedule())
 
         self.config = Config.get_conf(self, 25, True)
-        self.config.register_global(loop_every=60 * 60)
         self.config.register_guild(
-            remove_roles={}, add_roles={}, announce_channel=None, check_bots=False, reapply=False
+            remove_roles={},
+            add_roles={},
+            announce_channel=None,
+            check_bots=False,
+            reapply=False,
+            pending_members=[],
         )
         self.config.register_member(already_added=[])
         # config will be structure like this:
@@ -73,6 +82,7 @@ class TimeRole(commands.Cog):
         #          "announce_channel": 123, # channel_id to announce in
         #          "check_bots": False # whether to remove roles from bots
         #          "reapply": False # whether to reapply roles to members that have somehow lost it
+        #          "pending_members": [123] # members whose roles were still being updated
         #      }
         #    member_id:
         #      {alread_added: [123, 234, 567] # list of roles that have been added to this member already.
@@ -107,203 +117,277 @@ class TimeRole(commands.Cog):
 
     def cog_unload(self) -> None:
         log.debug("Unloading TimedRoles...")
-        self.role_loop.cancel()
+        self.role_task.cancel()
+        self.worker.cancel()
         asyncio.create_task(self.to_config())
 
-    @tasks.loop(hours=1)
-    async def role_loop(self):
-        if not self.cache:
+    async def initialize(self):
+        await self.bot.wait_until_red_ready()
+
+        all_guilds = await self.config.all_guilds()
+
+        if not all_guilds:
+            log.debug("No guilds configured for timeroles.")
+
+        for guild_id, guild_data in all_guilds.items():
+            log.debug(f"Caching timerole for {guild_id=}")
+            log.debug(f"{guild_data=}")
+            self.cache[guild_id] = TimedRole.multiple_from_config(
+                self.bot, guild_id, "add", guild_data["add_roles"]
+            ) + TimedRole.multiple_from_config(
+                self.bot, guild_id, "remove", guild_data["remove_roles"]
+            )
+            log.debug(f"{self.cache[guild_id]=}")
+
+        log.debug("Cache initialized with %s guilds", len(self.cache))
+
+        for guild_id, members in (await self.config.all_members()).items():
+            self.already_added[guild_id] = {
+                member_id: set(data["already_added"])
+                for member_id, data in members.items()
+                if data.get("already_added")
+            }
+
+        for guild_id, guild_data in all_guilds.items():
+            if guild_data.get("pending_members"):
+                # resume the updates that were in progress before the restart
+                self.worker.enqueue(guild_id, guild_data["pending_members"])
+
+        for guild_id in self.cache:
+            self.reschedule_guild(guild_id)
+
+        log.debug("TimedRoles loaded. %s members scheduled.", len(self.schedule))
+
+    def schedule_member(self, member: discord.Member, now: Optional[float] = None):
+        """
+        Schedule a member for the earliest of their timeroles, right away if one is already due."""
+        if not (rules := self.cache.get(member.guild.id)) or not member.joined_at:
             return
 
-        log.debug("Running role_loop...")
-        log.debug("======================================================")
+        now = now or time.time()
+        when = min(rule.due_at(member).timestamp() for rule in rules)
+        self.schedule.schedule(member.guild.id, member.id, max(when, now))
 
-        for all_roles in self.cache.copy().values():
-            log.debug(f"{all_roles=}")
-            announce_message = ""
-
-            members_to_edit: Dict[discord.Member, List[discord.Role]] = {}
-            # the members whose roles need to be added/removed
-
-            to_add = list(filter(lambda x: x.mode == "add", all_roles))
-            # the timedroles that are to be added
-
-            log.debug(f"{to_add=}")
-
-            to_remove = list(filter(lambda x: x.mode == "remove", all_roles))
-            # the timedroles that are to be removed
-
-            log.debug(f"{to_remove=}")
-
-            for add_role, remove_role in zip_longest(to_add, to_remove, fillvalue=None):
-                # zipping to decrease the use of multiple loops for each list.
-                log.debug(f"{add_role=} {remove_role=}")
-
-                if add_role:  # can be none due to zip_longest
-                    if not add_role.role:  # incase the role has been deleted
-                        log.debug(f"Removing add_role due to role being deleted {add_role.id=}")
-                        self.cache[add_role.guild_id].remove(
-                            add_role
-                        )  # delete it from cache, config will reflect later.
-
-                    else:
-                        filtered_members = await add_role.filter_members_without_role()
-                        log.debug(
-                            f"filtered_members for add_role {add_role.id}:\n{filtered_members=}"
-                        )
-                        reapply = await self.config.guild_from_id(add_role.guild_id).reapply()
-                        to_update = {
-                            member: members_to_edit.get(member, member.roles) + [add_role.role]
-                            for member in filtered_members
-                            if (
-                                (
-                                    add_role.id
-                                    not in await self.config.member(member).already_added()
-                                )
-                                or (reapply is True)
-                            )
-                            # check if the role was already added to the member, if it was, check if reapply is enabled else dont add.
-                            and member.joined_at
-                            is not None  # This can be none if the user is lurking aka viewing server from discovery
-                            and (
-                                not (datetime.now(tz=timezone.utc) - member.joined_at)
-                                >= rr[0].delay
-                                if (rr := list(filter(lambda x: x.id == add_role.id, to_remove)))
-                                != []
-                                else True
-                            )
-                            # check if the role is not to be removed too, if it is, dont add.
-                        }
-                        log.debug(f"to_update for add_role {add_role.id}:\n{to_update=}")
-                        members_to_edit.update(to_update)
-                        # update the members to edit dict with the members that need to be added the role
-                        # if the role has not been added to the member already or if reapply is enabled
-
-                if remove_role:  # can be none due to zip_longest
-                    if not remove_role.role:  # incase the role has been deleted
-                        self.cache[remove_role.guild_id].remove(
-                            remove_role
-                        )  # delete it from cache, config will reflect later.
-
-                    else:
-                        filtered_members = await remove_role.filter_members_with_role()
-                        log.debug(
-                            f"filtered_members for remove_role {remove_role.id}:\n{filtered_members=}"
-                        )
-                        to_update = {
-                            # filtering out the remove_role from the members roles
-                            member: list(
-                                filter(
-                                    lambda x: x.id != remove_role.id,
-                                    members_to_edit.get(member, member.roles),
-                                )
-                            )
-                            for member in filtered_members
-                        }
-                        log.debug(f"to_update for remove_role {remove_role.id}:\n{to_update=}")
-                        members_to_edit.update(to_update)
-                        # update the members to edit dict with the members that need to be removed the role
-
-            log.debug(f"{members_to_edit=}")
-
-            for member, roles in members_to_edit.items():
-                org_roles = member.roles
-                # The original roles of the member.
-
-                if org_roles == roles:
-                    # this condition could be true incase the same role is added for both adding
-                    # and removing in a certain interval
-                    log.debug(f"Nothing to update for member {member.id}. Continuing...")
-                    continue
-
-                update_roles_for_member = (
-                    set(roles)
-                    .difference(org_roles)
-                    .difference(await self.config.member(member).already_added())
-                )
-                # the newly added roles for the member
-                # this is a set of Role objects, which are:
-                # 1. Not present in the member's roles
-                # 2. Not already added to the member once before
-
-                async with self.config.member(member).already_added() as already_added:
-                    already_added.extend(
-                        (r.id for r in update_roles_for_member if r.id not in already_added)
-                    )
-                    log.debug(f"{member.id=} {already_added=}")
-                    # add the role object ids to the already_added list in config
+    def schedule_next(self, member: discord.Member, rules: List[TimedRole], now: datetime):
+        """
+        Schedule a member that was just checked for their next timerole that isn't due yet."""
+        upcoming = [due for rule in rules if (due := rule.due_at(member)) and due > now]
+        if upcoming:
+            self.schedule.schedule(member.guild.id, member.id, min(upcoming).timestamp())
+
+    def reschedule_guild(self, guild_id: int):
+        """
+        Schedule every member of a guild again, after its timeroles or settings changed."""
+        self.schedule.discard_guild(guild_id)
+        if not (guild := self.bot.get_guild(guild_id)):
+            return
 
+        now = time.time()
+        for member in guild.members:
+            self.schedule_member(member, now)
+
+    async def run_schedule(self):
+        await self.initialize()
+
+        while True:
+            by_guild: Dict[int, List[int]] = {}
+            for guild_id, member_id in await self.schedule.next_batch():
+                by_guild.setdefault(guild_id, []).append(member_id)
+
+            for guild_id, member_ids in by_guild.items():
                 try:
-                    await member.edit(roles=roles, reason="Updating TimedRoles.")
-                    # completely edit the member with the new roles.
-                except discord.Forbidden:
-                    log.error(
-                        f"Missing Permissions to edit {member.id} in guild {member.guild.id}"
-                    )
-                    announce_message += f"I do not have valid permissions to manage the roles of {member.mention}.\n\n"
+                    await self.process_members(guild_id, member_ids)
                 except Exception as e:
-                    log.exception("Exception when editing member: ", exc_info=e)
-                else:
-                    log.debug(f"Roles have been updated for {member.id=}")
-                    roles_that_were_added = set(roles).difference(org_roles)
-                    roles_that_were_removed = set(org_roles).difference(roles)
+                    log.exception(f"Failed to update timeroles in {guild_id=}", exc_info=e)
+
+    def roles_for(
+        self,
+        member: discord.Member,
+        rules: List[TimedRole],
+        now: datetime,
+        check_bots: bool,
+        reapply: bool,
+    ) -> Optional[List[discord.Role]]:
+        """
+        Returns the roles the member should have after applying every due timerole,
+        or `None` if nothing changes."""
+        already_added = self.already_added.get(member.guild.id, {}).get(member.id, ())
+        to_remove = {x.id: x for x in rules if x.mode == "remove"}
+        roles = member.roles
+
+        for add_role in rules:
+            if add_role.mode != "add" or member.get_role(add_role.id):
+                continue
 
-                    announce_message += f"**{member.mention}'s roles have been updated: **"
+            if not add_role.applies_to(member, now, check_bots):
+                continue
 
-                    if roles_that_were_added:
-                        announce_message += f"\n**Added:** {humanize_list([r.mention for r in roles_that_were_added])}"
+            if add_role.id in already_added and not reapply:
+                # the role was already added to the member once and reapply is disabled
+                continue
 
-                    if roles_that_were_removed:
-                        announce_message += f"\n**Removed:** {humanize_list([r.mention for r in roles_that_were_removed])}"
+            if (rr := to_remove.get(add_role.id)) and now - member.joined_at >= rr.delay:
+                # the role is to be removed too, dont add.
+                continue
 
-                    announce_message += "\n\n"
+            roles = roles + [add_role.role]
 
-            if announce_message and (
-                chan_id := await self.config.guild(member.guild).announce_channel()
+        for remove_role in to_remove.values():
+            if member.get_role(remove_role.id) and remove_role.applies_to(
+                member, now, check_bots
             ):
-                chan = member.guild.get_channel(chan_id)
-                if chan:
-                    embeds = [
-                        discord.Embed(title="TimeRole Updates!", description=page)
-                        for page in pagify(announce_message, delims=["\n\n"], page_length=2000)
-                    ]
+                # filtering out the remove_role from the members roles
+                roles = [x for x in roles if x.id != remove_role.id]
 
-                    for embed in embeds:
-                        await chan.send(embed=embed)
+        if set(roles) == set(member.roles):
+            # this condition could be true incase the same role is added for both adding
+            # and removing in a certain interval
+            return None
 
-                else:
-                    await self.config.guild(member.guild).announce_channel.set(None)
+        return roles
 
-        await self.to_config()
+    async def update_member(
+        self, member: discord.Member, roles: List[discord.Role]
+    ) -> Tuple[bool, str]:
+        """
+        Edit the member's roles.
 
-    @role_loop.before_loop
-    async def before_loop(self):
-        await self.bot.wait_until_red_ready()
+        Returns whether the roles were edited and the announcement for it."""
+        org_roles = member.roles
+        # The original roles of the member.
 
-        all_guilds = await self.config.all_guilds()
+        added_ids = {r.id for r in set(roles).difference(org_roles)}
+        already_added = self.already_added.setdefault(member.guild.id, {}).setdefault(
+            member.id, set()
+        )
+        if not added_ids <= already_added:
+            # add the role ids to the already_added list in config
+            already_added |= added_ids
+            await self.config.member(member).already_added.set(list(already_added))
+            log.debug(f"{member.id=} {already_added=}")
+
+        try:
+            await member.edit(roles=roles, reason="Updating TimedRoles.")
+            # completely edit the member with the new roles.
+        except discord.Forbidden:
+            log.error(f"Missing Permissions to edit {member.id} in guild {member.guild.id}")
+            return (
+                False,
+                f"I do not have valid permissions to manage the roles of {member.mention}.\n\n",
+            )
+        except Exception as e:
+            log.exception("Exception when editing member: ", exc_info=e)
+            return False, ""
 
-        if not all_guilds:
-            log.debug("No guilds configured for timeroles.")
-            return self
+        log.debug(f"Roles have been updated for {member.id=}")
+        roles_that_were_added = set(roles).difference(org_roles)
+        roles_that_were_removed = set(org_roles).difference(roles)
 
-        for guild_id, guild_data in all_guilds.items():
-            log.debug(f"Caching timerole for {guild_id=}")
-            log.debug(f"{guild_data=}")
-            self.cache[guild_id] = TimedRole.multiple_from_config(
-                self.bot, guild_id, "add", guild_data["add_roles"]
-            ) + TimedRole.multiple_from_config(
-                self.bot, guild_id, "remove", guild_data["remove_roles"]
+        announce_message = f"**{member.mention}'s roles have been updated: **"
+
+        if roles_that_were_added:
+            announce_message += (
+                f"\n**Added:** {humanize_list([r.mention for r in roles_that_were_added])}"
             )
-            log.debug(f"{self.cache[guild_id]=}")
 
-        log.debug("Cache initialized with %s guilds", len(self.cache))
+        if roles_that_were_removed:
+            announce_message += (
+                f"\n**Removed:** {humanize_list([r.mention for r in roles_that_were_removed])}"
+            )
 
-        delay = await self.config.loop_every()
-        self.role_loop.change_interval(seconds=delay)
+        return True, announce_message + "\n\n"
 
-        log.debug("Role loop interval set to %s seconds", delay)
+    async def apply_member(self, guild_id: int, member_id: int) -> Tuple[bool, str]:
+        """
+        Apply the member's due timeroles, checked again since they were queued.
+
+        Returns whether the member's roles were edited and the announcement for it, if any."""
+        guild = self.bot.get_guild(guild_id)
+        if not guild or not (rules := self.cache.get(guild_id)):
+            return False, ""
+        if not (member := guild.get_member(member_id)):
+            return False, ""
+
+        guild_data = await self.config.guild(guild).all()
+        roles = self.roles_for(
+            member,
+            [x for x in rules if x.role],
+            datetime.now(tz=timezone.utc),
+            guild_data["check_bots"],
+            guild_data["reapply"],
+        )
+        if roles is None:
+            return False, ""
+        return await self.update_member(member, roles)
 
-        log.debug("TimedRoles loaded. role_task started.")
+    async def announce(self, guild_id: int, announce_message: str):
+        guild = self.bot.get_guild(guild_id)
+        if not guild or not (chan_id := await self.config.guild(guild).announce_channel()):
+            return
+
+        chan = guild.get_channel(chan_id)
+        if chan:
+            embeds = [
+                discord.Embed(title="TimeRole Updates!", description=page)
+                for page in pagify(announce_message, delims=["\n\n"], page_length=2000)
+            ]
+
+            for embed in embeds:
+                await chan.send(embed=embed)
+
+        else:
+            await self.config.guild(guild).announce_channel.set(None)
+
+    async def process_members(self, guild_id: int, member_ids: List[int]) -> int:
+        """
+        Queue the members whose roles need updating and schedule their next timeroles.
+
+        Returns the number of members queued."""
+        guild = self.bot.get_guild(guild_id)
+        rules = self.cache.get(guild_id)
+        if not guild or not rules:
+            return 0
+
+        if deleted := [x for x in rules if not x.role]:  # incase the role has been deleted
+            log.debug(f"Removing timeroles due to roles being deleted {deleted=}")
+            for x in deleted:
+                rules.remove(x)
+            await self.to_config()
+
+        guild_data = await self.config.guild(guild).all()
+        now = datetime.now(tz=timezone.utc)
+        to_update = []
+
+        for index, member_id in enumerate(member_ids, start=1):
+            if not (member := guild.get_member(member_id)):
+                continue
+
+            if (
+                self.roles_for(member, rules, now, guild_data["check_bots"], guild_data["reapply"])
+                is not None
+            ):
+                to_update.append(member_id)
+
+            self.schedule_next(member, rules, now)
+
+            if index % 1000 == 0:
+                await asyncio.sleep(0)  # large batches are checked right after startup
+
+        return self.worker.enqueue(guild_id, to_update) if to_update else 0
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.schedule_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            # required roles may have been gained, or an added role lost
+            self.schedule_member(after)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.schedule.discard(member.guild.id, member.id)
 
     @commands.group(name="timerole", invoke_without_command=True)
     async def timerole(self, ctx: commands.Context):
@@ -316,8 +400,11 @@ class TimeRole(commands.Cog):
     async def timerole_force(self, ctx: commands.Context):
         async with ctx.typing():
             await ctx.send("Force checking roles in all registered guilds...")
-            await self.role_loop()
-            await ctx.send("Done.")
+            queued = 0
+            for guild_id in list(self.cache):
+                if guild := ctx.bot.get_guild(guild_id):
+                    queued += await self.process_members(guild_id, [m.id for m in guild.members])
+            await ctx.send(f"Done. {queued} members have been queued for role updates.")
 
     @timerole.group(name="addrole", invoke_without_command=True)
     async def timerole_addrole(
@@ -372,6 +459,8 @@ class TimeRole(commands.Cog):
         tr = TimedRole(ctx.bot, ctx.guild.id, role.id, time, [r.id for r in required_roles], "add")
 
         self.cache.setdefault(ctx.guild.id, []).append(tr)
+        await self.to_config()
+        self.reschedule_guild(ctx.guild.id)
 
         return await ctx.send(
             f"New TimeRole added! {role.mention} to be assigned **{humanize_timedelta(timedelta=tr.delay)}** after member join."
@@ -390,6 +479,8 @@ class TimeRole(commands.Cog):
             return await ctx.send("I couldn't find that timerole.")
 
         self.cache.get(ctx.guild.id).remove(found[0])
+        await self.to_config()
+        self.reschedule_guild(ctx.guild.id)
 
         return await ctx.send("That timerole has been removed and shall no longer be added.")
 
@@ -448,6 +539,8 @@ class TimeRole(commands.Cog):
         )
 
         self.cache.setdefault(ctx.guild.id, []).append(tr)
+        await self.to_config()
+        self.reschedule_guild(ctx.guild.id)
 
         return await ctx.send(
             f"New TimeRole added! {role.mention} to be removed **{humanize_timedelta(timedelta=tr.delay)}** after member join."
@@ -466,6 +559,8 @@ class TimeRole(commands.Cog):
             return await ctx.send("I couldn't find that timerole.")
 
         self.cache.get(ctx.guild.id).remove(found[0])
+        await self.to_config()
+        self.reschedule_guild(ctx.guild.id)
 
         return await ctx.send(
             "That timerole has been removed and shall no longer be removed from users."
@@ -489,6 +584,7 @@ class TimeRole(commands.Cog):
         """
 
         await self.config.guild(ctx.guild).reapply.set(status)
+        self.reschedule_guild(ctx.guild.id)
 
         return await ctx.send(
             f"Adding timeroles will be {'reapplied' if status else 'no longer reapplied'}."
@@ -500,22 +596,12 @@ class TimeRole(commands.Cog):
         Set whether timeroles should be applied to bots."""
 
         await self.config.guild(ctx.guild).check_bots.set(status)
+        self.reschedule_guild(ctx.guild.id)
 
         return await ctx.send(
             f"Adding timeroles will be {'checked' if status else 'no longer checked'} for bots."
         )
 
-    @timerole.command(name="setdelay", aliases=["delay"])
-    @commands.is_owner()
-    async def timerole_setdelay(self, ctx: commands.Context, delay: TimeConverter):
-        """
-        Set the delay between each role loop.
-
-        This is in seconds. Default is 3600 (1 hour)."""
-        await self.config.loop_every.set(delay)
-        self.role_loop.change_interval(seconds=delay)
-        return await ctx.send(f"Delay between role checking set to {delay} seconds.")
-
     @timerole.command(name="showsettings", aliases=["settings", "ss", "show"])
     async def timerole_showsettings(self, ctx: commands.Context):
         """
@@ -531,13 +617,20 @@ class TimeRole(commands.Cog):
 
         check_bots = humanize_bool(await self.config.guild(ctx.guild).check_bots())
 
-        delay = humanize_timedelta(seconds=await self.config.loop_every())
+        queue = self.worker.queue_for(ctx.guild.id)
 
         data = [
             ("Announcement Channel", chan_str),
             ("Reapply", reapply),
             ("Check Bots", check_bots),
-        ] + ([("Delay", delay)] if ctx.author.id in ctx.bot.owner_ids else [])
+            ("Members Queued", len(queue.pending)),
+            ("Members Updated", queue.edited),
+            ("Throughput", f"{queue.members_per_minute():.1f} edits/minute"),
+        ] + (
+            [("Members Scheduled", len(self.schedule))]
+            if ctx.author.id in ctx.bot.owner_ids
+            else []
+        )
 
         headers = ["Setting", "Value"]
 
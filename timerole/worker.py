@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .timerole import TimeRole
+
+log = logging.getLogger("red.cTm.timerole.worker")
+
+EDIT_CONCURRENCY = 4  # guilds whose members are edited at the same time
+CHECKPOINT_INTERVAL = 30  # seconds between saves of a guild's queue
+ANNOUNCE_LENGTH = 2000  # announcements are sent once they fill an embed
+ANNOUNCE_INTERVAL = 30  # or once they are this many seconds old
+THROUGHPUT_WINDOW = 10 * 60
+
+
+class GuildQueue:
+    def __init__(self):
+        # member ids in the order they were queued, a dict is used as an ordered set
+        self.pending: Dict[int, None] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.announcements: List[str] = []
+        self.announce_length = 0
+        self.announce_started = 0.0
+        self.edited = 0
+        # when the recent edits were made, only the last `THROUGHPUT_WINDOW` is kept
+        self.finished: Deque[float] = deque()
+
+    def _prune(self, now: float):
+        while self.finished and self.finished[0] < now - THROUGHPUT_WINDOW:
+            self.finished.popleft()
+
+    def record_edit(self):
+        now = time.monotonic()
+        self.edited += 1
+        self.finished.append(now)
+        self._prune(now)
+
+    def members_per_minute(self) -> float:
+        now = time.monotonic()
+        self._prune(now)
+        if not self.finished:
+            return 0.0
+        return len(self.finished) / max(now - self.finished[0], 60) * 60
+
+
+class RoleWorker:
+    """
+    Applies timerole changes to members, one member at a time per guild.
+
+    Member edits share a rate limit bucket per guild, so each guild has a single
+    consumer and at most `EDIT_CONCURRENCY` guilds are edited at once. The queue of
+    each guild is saved every `CHECKPOINT_INTERVAL` seconds so a restart resumes it,
+    and announcements are sent in batches while the queue is worked through."""
+
+    def __init__(self, cog: "TimeRole"):
+        self.cog = cog
+        self.guilds: Dict[int, GuildQueue] = {}
+        self.semaphore = asyncio.Semaphore(EDIT_CONCURRENCY)
+
+    def queue_for(self, guild_id: int) -> GuildQueue:
+        return self.guilds.setdefault(guild_id, GuildQueue())
+
+    def enqueue(self, guild_id: int, member_ids: Iterable[int]) -> int:
+        queue = self.queue_for(guild_id)
+        before = len(queue.pending)
+        queue.pending.update(dict.fromkeys(member_ids))
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.create_task(self._run(guild_id, queue))
+        return len(queue.pending) - before
+
+    def cancel(self):
+        for queue in self.guilds.values():
+            if queue.task:
+                queue.task.cancel()
+
+    async def _checkpoint(self, guild_id: int, queue: GuildQueue):
+        await self.cog.config.guild_from_id(guild_id).pending_members.set(list(queue.pending))
+
+    async def _flush_announcements(self, guild_id: int, queue: GuildQueue):
+        if not queue.announcements:
+            return
+        message = "".join(queue.announcements)
+        queue.announcements.clear()
+        queue.announce_length = 0
+        try:
+            await self.cog.announce(guild_id, message)
+        except Exception as e:
+            log.exception(f"Failed to send timerole announcements in {guild_id=}", exc_info=e)
+
+    async def _run(self, guild_id: int, queue: GuildQueue):
+        await self._checkpoint(guild_id, queue)
+        last_checkpoint = time.monotonic()
+        try:
+            while queue.pending:
+                member_id = next(iter(queue.pending))
+                async with self.semaphore:
+                    try:
+                        edited, announcement = await self.cog.apply_member(guild_id, member_id)
+                    except Exception as e:
+                        log.exception(f"Failed to update {member_id=} in {guild_id=}", exc_info=e)
+                        edited, announcement = False, ""
+                # removed only once done, so a saved queue still holds the member being edited
+                queue.pending.pop(member_id, None)
+                if edited:
+                    queue.record_edit()
+
+                if announcement:
+                    if not queue.announcements:
+                        queue.announce_started = time.monotonic()
+                    queue.announcements.append(announcement)
+                    queue.announce_length += len(announcement)
+                if queue.announce_length >= ANNOUNCE_LENGTH or (
+                    queue.announcements
+                    and time.monotonic() - queue.announce_started >= ANNOUNCE_INTERVAL
+                ):
+                    await self._flush_announcements(guild_id, queue)
+
+                if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                    await self._checkpoint(guild_id, queue)
+                    last_checkpoint = time.monotonic()
+        finally:
+            await self._flush_announcements(guild_id, queue)
+            await self._checkpoint(guild_id, queue)
+
+        if queue.pending:  # members queued while the last announcements were sent
+            queue.task = asyncio.create_task(self._run(guild_id, queue))
@@ -1,5 +1,5 @@
 from abc import ABC, ABCMeta, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from discord.ext.commands.cog import CogMeta
 
@@ -21,5 +21,5 @@ class MixinMeta(ABC):
         self.db: "DB"
 
     @abstractmethod
-    def save(self) -> None:
+    def save(self, guild_id: Optional[int] = None) -> None:
         pass
@@ -30,7 +30,7 @@ class Admin(MixinMeta):
     ):
         """Set the end of the week for the guild"""
         self.db.get_conf(ctx.guild).end_of_the_week = DAYS[day]
-        self.save()
+        self.save(ctx.guild.id)
         await ctx.send(f"End of the week set to {day}")
 
     @timeslots.group(name="selection")
@@ -86,7 +86,7 @@ class Admin(MixinMeta):
         await ctx.send(
             f"Slot selection channel set to {channel.mention}: {msg.jump_url}"
         )
-        self.save()
+        self.save(ctx.guild.id)
 
     @selection.command(name="remove", aliases=["delete", "del", "rem"])
     async def selection_remove(
@@ -122,7 +122,7 @@ class Admin(MixinMeta):
                     f"I have removed it from my memory but you will have to manually delete it {confmessage.jump_url}."
                 )
             finally:
-                self.save()
+                self.save(ctx.guild.id)
 
     @selection.command(name="forceupdate")
     async def selection_update(self, ctx: commands.Context):
@@ -176,14 +176,14 @@ class Admin(MixinMeta):
         conf.reset_timeslots()
 
         await ctx.send("All user slots have been cleared")
-        self.save()
+        self.save(ctx.guild.id)
 
     @timeslots.command(name="utcoffset")
     async def utcoffset(self, ctx: commands.Context, utcoffset: int):
         """Set the timezone for the guild"""
         conf = self.db.get_conf(ctx.guild)
         conf.utcoffset = utcoffset
-        self.save()
+        self.save(ctx.guild.id)
         await ctx.send(f"Timezone set to UTC{utcoffset:+}")
 
     @timeslots.command(name="showsettings", aliases=["settings", "ss"])
@@ -8,6 +8,7 @@ from redbot.core.bot import Red
 from .abc import CompositeMetaClass
 from .commands import Commands
 from .common.models import DB
+from .common.storage import GuildStorage
 from .listeners import Listeners
 from .tasks import TaskLoops
 from .views.updatemytimes import UpdateMyTimes
@@ -42,7 +43,7 @@ class TimeSlots(
         self.config = Config.get_conf(self, 117, force_registration=True)
         self.config.register_global(db={})
         self.db: DB = DB()
-        self.saving: asyncio.Future[t.Literal[True]] | t.Literal[False] = False
+        self.storage = GuildStorage(self.config, lambda: self.db)
         self.reset_task = self.reset_chart.start()
 
     def format_help_for_context(self, ctx: commands.Context):
@@ -69,36 +70,11 @@ class TimeSlots(
     async def cog_unload(self):
         self.bot.remove_dynamic_items(UpdateMyTimes)
         self.reset_task.cancel()
+        await self.storage.close()
 
-    def save(self) -> None:
-        async def _save():
-            if self.saving:
-                log.debug("%s", self.saving)
-                if self.saving.done() and (exc := self.saving.exception()):
-                    log.exception(
-                        "Failed to save config before so not saving again to avoid data corruption",
-                        exc_info=exc,
-                    )
-                    return
-
-                elif not self.saving.done():
-                    try:
-                        log.debug("Awaiting saving previous instance")
-                        await self.saving
-
-                    except Exception as e:
-                        log.exception("Failed to save config", exc_info=e)
-            try:
-                log.debug("Creating new future")
-                self.saving = self.bot.loop.create_future()
-                log.debug("Future: %s", self.saving)
-                dump = await asyncio.to_thread(self.db.model_dump, mode="json")
-                await self.config.db.set(dump)
-                log.debug("Saved config")
-                self.saving.set_result(True)
-                log.debug("Set result to True")
-            except Exception as e:
-                log.exception("Failed to save config", exc_info=e)
-                self.saving.set_exception(e)
-
-        asyncio.create_task(_save())
+    def save(self, guild_id: t.Optional[int] = None) -> asyncio.Task[None]:
+        """Mark `guild_id` (or the whole DB when None) as dirty.
+
+        Writes are debounced and coalesced by `GuildStorage`, the returned task
+        completes once the pending flush has been written."""
+        return self.storage.mark_dirty(guild_id)
@@ -56,7 +56,7 @@ class TaskLoops(MixinMeta, metaclass=CompositeMetaClass):
                 conf.started_on = today
 
                 log.info("TimeSlots reset for guild %s (%s)", guild.name, guild_id)
-                self.save()
+                self.save(guild_id)
                 channel = self.bot.get_channel(conf.slot_selection_channel)
                 if channel:
                     message = channel.get_partial_message(conf.slot_selection_message)
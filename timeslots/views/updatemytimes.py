@@ -113,7 +113,7 @@ class UpdateMyTimes(
             return
 
         user.reserved_times[day] = times
-        cog.save()
+        cog.save(interaction.guild.id)
 
         await interaction.edit_original_response(
             content="Please wait...\nGenerating the new timeslots chart. This may take a while.",